@@ -1,5 +1,15 @@
-"""Initialize the fastapi_redis_cache package."""
+"""Initialize the fastapi_redis_cache package.
 
+The optional backends and the host cache are only imported when first used,
+so applications that don't use them don't load `sqlite3` and `mmap`.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from fastapi_redis_cache.backends import RedisBackend
 from fastapi_redis_cache.cache import (
     cache,
     cache_one_day,
@@ -10,6 +20,29 @@ from fastapi_redis_cache.cache import (
     cache_one_year,
 )
 from fastapi_redis_cache.client import FastApiRedisCache
+from fastapi_redis_cache.codec import CompressedJsonCodec, JsonCodec
+from fastapi_redis_cache.hot_keys import HotKeyTracker
+from fastapi_redis_cache.invalidate import invalidates
+from fastapi_redis_cache.key_gen import UnstableCacheKeyWarning
+from fastapi_redis_cache.middleware import CacheMiddleware, CacheRule
+from fastapi_redis_cache.pagination import Pagination
+from fastapi_redis_cache.warm import WarmTarget, warm_cache
+
+if TYPE_CHECKING:  # pragma: no cover
+    from fastapi_redis_cache.backends import (
+        MemoryBackend,  # noqa: TCH004
+        PackedRedisBackend,  # noqa: TCH004
+        SQLiteBackend,  # noqa: TCH004
+    )
+    from fastapi_redis_cache.host_cache import HostCache  # noqa: TCH004
+
+# the module defining each name that is imported when first used.
+LAZY_IMPORTS = {
+    "HostCache": "fastapi_redis_cache.host_cache",
+    "MemoryBackend": "fastapi_redis_cache.backends",
+    "PackedRedisBackend": "fastapi_redis_cache.backends",
+    "SQLiteBackend": "fastapi_redis_cache.backends",
+}
 
 __all__ = [
     "cache",
@@ -20,4 +53,29 @@ __all__ = [
     "cache_one_week",
     "cache_one_year",
     "FastApiRedisCache",
+    "CompressedJsonCodec",
+    "JsonCodec",
+    "CacheMiddleware",
+    "CacheRule",
+    "HostCache",
+    "HotKeyTracker",
+    "invalidates",
+    "MemoryBackend",
+    "PackedRedisBackend",
+    "Pagination",
+    "RedisBackend",
+    "SQLiteBackend",
+    "UnstableCacheKeyWarning",
+    "WarmTarget",
+    "warm_cache",
 ]
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Import the names in `LAZY_IMPORTS` when they are first used."""
+    if name not in LAZY_IMPORTS:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(import_module(LAZY_IMPORTS[name]), name)
+    globals()[name] = value
+    return value
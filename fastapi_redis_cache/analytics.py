@@ -0,0 +1,318 @@
+"""Report how much memory the cached responses of each endpoint use.
+
+`scan_memory` walks the keyspace under the cache prefix in small batches (with
+`SCAN`, so Redis is never blocked for long), groups the keys by the function
+or path that cached them and by their tag, and samples the size and TTL of the
+entries. It yields the report after each batch, so a scan of a large keyspace
+can be watched as it runs, or stopped early, and `max_keys_per_second` keeps
+its load on a production server low. `scan_memory_async` does the same without
+blocking the event loop, for use in async code such as an admin route.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import math
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from anyio import to_thread
+
+from fastapi_redis_cache.backends.base import TTL_MISSING, TTL_PERSISTENT
+from fastapi_redis_cache.util import get_tag_from_key
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import AsyncIterator, Iterator
+
+    from fastapi_redis_cache.backends import Backend
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_KEYS_PER_SECOND = 1000
+DEFAULT_TOP = 10
+PERCENTILES = (50, 90, 99)
+# names starting with this are used for the cache's own bookkeeping.
+INTERNAL_KEY_PREFIX = "__"
+# the function name (or method and path) ends where the arguments begin.
+KEY_NAME_END = re.compile(r"[(?]")
+
+
+@dataclass
+class KeyGroup:
+    """The sampled sizes and TTLs of the keys of one endpoint and tag.
+
+    Args:
+        name (str): The function (`module.name`) or method and path (for the
+            middleware, e.g. `GET:/items`) that cached the entries.
+        tag (str, optional): The tag the entries were cached with.
+        top (int, optional): The number of largest entries to keep.
+    """
+
+    name: str
+    tag: str | None = None
+    top: int = DEFAULT_TOP
+    keys: int = 0
+    sizes: list[int] = field(default_factory=list)
+    ttls: list[int] = field(default_factory=list)
+    persistent: int = 0
+    # (size, key) of the largest entries sampled, as a min-heap.
+    largest: list[tuple[int, str]] = field(default_factory=list)
+
+    def add(self, key: str, size: int, ttl: int) -> None:
+        """Record the size and TTL of a sampled entry."""
+        self.sizes.append(size)
+        if ttl == TTL_PERSISTENT:
+            self.persistent += 1
+        else:
+            self.ttls.append(ttl)
+        if len(self.largest) < self.top:
+            heapq.heappush(self.largest, (size, key))
+        elif self.top:
+            heapq.heappushpop(self.largest, (size, key))
+
+    @property
+    def total_size(self) -> int:
+        """Return the estimated size of all the keys, from the sampled mean."""
+        if not self.sizes:
+            return 0
+        return round(sum(self.sizes) / len(self.sizes) * self.keys)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the report for the group, ready to be serialized as JSON."""
+        return {
+            "name": self.name,
+            "tag": self.tag,
+            "keys": self.keys,
+            "sampled": len(self.sizes),
+            "total_size": self.total_size,
+            "size": get_distribution(self.sizes),
+            "ttl": get_distribution(self.ttls),
+            "persistent": self.persistent,
+            "largest": [
+                {"key": key, "size": size}
+                for size, key in sorted(self.largest, reverse=True)
+            ],
+        }
+
+
+@dataclass
+class MemoryReport:
+    """The memory used by the cache, grouped by endpoint and tag."""
+
+    groups: dict[tuple[str, str | None], KeyGroup] = field(default_factory=dict)
+    scanned: int = 0
+    sampled: int = 0
+    elapsed: float = 0.0
+    complete: bool = False
+
+    @property
+    def total_size(self) -> int:
+        """Return the estimated size of every key scanned."""
+        return sum(group.total_size for group in self.groups.values())
+
+    def sorted_groups(self) -> list[KeyGroup]:
+        """Return the groups, using the most memory first."""
+        return sorted(
+            self.groups.values(),
+            key=lambda group: (-group.total_size, group.name, group.tag or ""),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the report, ready to be serialized as JSON."""
+        return {
+            "scanned": self.scanned,
+            "sampled": self.sampled,
+            "total_size": self.total_size,
+            "elapsed": round(self.elapsed, 3),
+            "complete": self.complete,
+            "groups": [group.to_dict() for group in self.sorted_groups()],
+        }
+
+
+class MemoryScan:
+    """The state of a scan of the cache entries, updated one batch at a time.
+
+    This is shared by `scan_memory` and `scan_memory_async`, which only differ
+    in how they wait between batches.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        backend: Backend,
+        prefix: str = "",
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_keys_per_second: float | None = DEFAULT_KEYS_PER_SECOND,
+        sample_rate: float = 1.0,
+        top: int = DEFAULT_TOP,
+    ) -> None:
+        """Start a scan of the entries in `backend`, see `scan_memory`."""
+        self.backend = backend
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.max_keys_per_second = max_keys_per_second
+        self.sample_rate = sample_rate
+        self.top = top
+        self.report = MemoryReport()
+        self.started = time.monotonic()
+
+    def batches(self) -> Iterator[list[str]]:
+        """Return an iterator over the batches of keys to scan."""
+        match = f"{glob_escape(self.prefix)}:*" if self.prefix else "*"
+        return self.backend.scan(match, self.batch_size)
+
+    def add_batch(self, batch: list[str]) -> float:
+        """Add a batch of keys to the report.
+
+        Returns:
+            `float`: The number of seconds to pause before the next batch, to
+                stay under `max_keys_per_second`.
+        """
+        report = self.report
+        keys = [key for key in batch if not is_internal_key(key, self.prefix)]
+        sampled = [key for key in keys if sample_key(self.sample_rate)]
+        inspect = self.backend.inspect
+        sizes = dict(zip(sampled, inspect(sampled))) if sampled else {}
+        for key in keys:
+            name, tag = parse_cache_key(key, self.prefix)
+            group = report.groups.get((name, tag))
+            if group is None:
+                group = report.groups[(name, tag)] = KeyGroup(
+                    name, tag, self.top
+                )
+            group.keys += 1
+            size, ttl = sizes.get(key, (0, TTL_MISSING))
+            if ttl != TTL_MISSING:
+                group.add(key, size, ttl)
+                report.sampled += 1
+        report.scanned += len(batch)
+        if not self.max_keys_per_second:
+            return 0
+        return max(
+            report.scanned / self.max_keys_per_second - self.elapsed(), 0
+        )
+
+    def elapsed(self) -> float:
+        """Return the number of seconds since the scan started."""
+        return time.monotonic() - self.started
+
+    def get_report(self, *, complete: bool = False) -> MemoryReport:
+        """Return the report so far, marking it `complete` if requested."""
+        self.report.complete = complete
+        self.report.elapsed = self.elapsed()
+        return self.report
+
+
+def scan_memory(  # noqa: PLR0913
+    backend: Backend,
+    prefix: str = "",
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_keys_per_second: float | None = DEFAULT_KEYS_PER_SECOND,
+    sample_rate: float = 1.0,
+    top: int = DEFAULT_TOP,
+) -> Iterator[MemoryReport]:
+    """Scan the cache entries, yielding the report so far after each batch.
+
+    Every key is counted, but only `sample_rate` of them are inspected for
+    their size and TTL, and the total sizes are estimated from those. Keys
+    added or deleted during the scan may or may not be included. This pauses
+    with `time.sleep` to keep to the rate limit, so use `scan_memory_async`
+    in async code instead.
+
+    Args:
+        backend (Backend): The backend storing the entries.
+        prefix (str, optional): The prefix of the cache keys. Defaults to "".
+        batch_size (int, optional): The number of keys to scan at once.
+            Defaults to 100.
+        max_keys_per_second (float, optional): The most keys to scan each
+            second, pausing between batches as needed. Defaults to 1000, or
+            None for no limit.
+        sample_rate (float, optional): The fraction of the keys to inspect.
+            Defaults to 1.0, to inspect every key.
+        top (int, optional): The number of largest entries to list for each
+            group. Defaults to 10.
+    """
+    scan = MemoryScan(
+        backend,
+        prefix,
+        batch_size=batch_size,
+        max_keys_per_second=max_keys_per_second,
+        sample_rate=sample_rate,
+        top=top,
+    )
+    for batch in scan.batches():
+        delay = scan.add_batch(batch)
+        if delay > 0:
+            time.sleep(delay)
+        yield scan.get_report()
+    yield scan.get_report(complete=True)
+
+
+async def scan_memory_async(
+    backend: Backend,
+    prefix: str = "",
+    **options: Any,  # noqa: ANN401
+) -> AsyncIterator[MemoryReport]:
+    """Scan the cache entries as `scan_memory` does, without blocking.
+
+    The backend is read in a worker thread, and the pauses between batches
+    use `asyncio.sleep`, so the event loop keeps serving requests. The
+    `options` are those of `scan_memory`.
+    """
+    scan = MemoryScan(backend, prefix, **options)
+    batches = scan.batches()
+    while True:
+        batch = await to_thread.run_sync(next, batches, None)
+        if batch is None:
+            break
+        delay = await to_thread.run_sync(scan.add_batch, batch)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        yield scan.get_report()
+    yield scan.get_report(complete=True)
+
+
+def parse_cache_key(key: str, prefix: str = "") -> tuple[str, str | None]:
+    """Return the function (or method and path) and the tag of a cache key."""
+    tag = get_tag_from_key(key)
+    if tag is not None:
+        key = key[: -len(tag) - 2]
+    if prefix and key.startswith(f"{prefix}:"):
+        key = key[len(prefix) + 1 :]
+    return (KEY_NAME_END.split(key, maxsplit=1)[0], tag)
+
+
+def is_internal_key(key: str, prefix: str = "") -> bool:
+    """Return True if `key` holds the cache's bookkeeping, not a response."""
+    if prefix:
+        key = key[len(prefix) + 1 :]
+    return key.startswith(INTERNAL_KEY_PREFIX)
+
+
+def glob_escape(value: str) -> str:
+    """Return `value` with the glob wildcards in it matching themselves."""
+    return re.sub(r"([*?\[])", r"[\1]", value)
+
+
+def sample_key(sample_rate: float) -> bool:
+    """Return True if a key should be inspected, at the `sample_rate`."""
+    return sample_rate >= 1 or random.random() < sample_rate  # noqa: S311
+
+
+def get_distribution(values: list[int]) -> dict[str, int]:
+    """Return the percentiles (by nearest rank) and the maximum of `values`."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    distribution = {
+        f"p{percentile}": ordered[
+            max(math.ceil(percentile / 100 * len(ordered)) - 1, 0)
+        ]
+        for percentile in PERCENTILES
+    }
+    distribution["max"] = ordered[-1]
+    return distribution
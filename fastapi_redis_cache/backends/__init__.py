@@ -0,0 +1,49 @@
+"""Storage backends for the cache, Redis is used by default.
+
+The other backends are only imported when first used, so applications using
+Redis don't load `sqlite3` and the rest.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from fastapi_redis_cache.backends.base import Backend
+from fastapi_redis_cache.backends.redis import RedisBackend
+
+if TYPE_CHECKING:  # pragma: no cover
+    from fastapi_redis_cache.backends.memory import (
+        MemoryBackend,  # noqa: TCH004
+    )
+    from fastapi_redis_cache.backends.packed import (
+        PackedRedisBackend,  # noqa: TCH004
+    )
+    from fastapi_redis_cache.backends.sqlite import (
+        SQLiteBackend,  # noqa: TCH004
+    )
+
+# the module defining each backend that is imported when first used.
+LAZY_IMPORTS = {
+    "MemoryBackend": "fastapi_redis_cache.backends.memory",
+    "PackedRedisBackend": "fastapi_redis_cache.backends.packed",
+    "SQLiteBackend": "fastapi_redis_cache.backends.sqlite",
+}
+
+__all__ = [
+    "Backend",
+    "MemoryBackend",
+    "PackedRedisBackend",
+    "RedisBackend",
+    "SQLiteBackend",
+]
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Import the backends in `LAZY_IMPORTS` when they are first used."""
+    if name not in LAZY_IMPORTS:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(import_module(LAZY_IMPORTS[name]), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,127 @@
+"""The protocol implemented by every storage backend."""
+
+from __future__ import annotations
+
+import struct
+from typing import TYPE_CHECKING, Protocol, Union
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Collection, Iterator, Mapping, Sequence
+
+# the TTL returned for keys that don't exist, and for keys that never expire.
+# These match the values returned by the Redis `TTL` command.
+TTL_MISSING = -2
+TTL_PERSISTENT = -1
+
+Entry = dict[str, bytes]
+
+# field name length, field value length, used to pack entries into bytes.
+FIELD_HEADER = struct.Struct("<HI")
+
+
+class Backend(Protocol):
+    """Store cache entries, their expiry times and tag membership.
+
+    Each cache entry is a set of named fields (such as the response data and
+    its ETag) stored under a key, so the small metadata fields can be read
+    without the whole response. Tags are sets of keys, stored under the tag
+    name.
+    """
+
+    def ping(self) -> bool:
+        """Return True if the backend is available."""
+
+    def get_entry(self, key: str, fields: Sequence[str]) -> tuple[int, Entry]:
+        """Return the TTL and the requested `fields` of the entry for `key`.
+
+        The TTL is `TTL_MISSING` if there is no entry, or `TTL_PERSISTENT` if
+        it never expires. Missing fields are left out of the returned entry.
+        """
+
+    def get_entries(
+        self, keys: Sequence[str], fields: Sequence[str]
+    ) -> list[tuple[int, Entry]]:
+        """Return the TTL and `fields` of each of the entries for `keys`."""
+
+    def set_entry(
+        self,
+        key: str,
+        entry: Mapping[str, Union[str, bytes]],
+        expire: int,
+        tag: str | None = None,
+    ) -> bool:
+        """Replace the entry for `key`, expiring after `expire` seconds.
+
+        If `tag` is given the key is added to that tag. Returns True if the
+        entry was stored.
+        """
+
+    def update_entry(
+        self, key: str, entry: Mapping[str, Union[str, bytes]]
+    ) -> None:
+        """Add (or replace) fields of the entry for `key`, keeping its expiry.
+
+        If there is no entry for `key` one is created that never expires.
+        """
+
+    def add_to_tag(self, tag: str, key: str) -> None:
+        """Add `key` to the keys associated with `tag`."""
+
+    def get_tag(self, tag: str) -> set[bytes]:
+        """Return the keys associated with `tag`."""
+
+    def delete(self, *keys: str) -> int:
+        """Delete the entries for `keys`, returning how many there were."""
+
+    def delete_tags(
+        self, tags: Collection[str], keys: Collection[str] = ()
+    ) -> int:
+        """Delete `tags`, the entries of their keys and the entries for `keys`.
+
+        Returns:
+            `int`: The number of entries deleted.
+        """
+
+    def scan(self, match: str, count: int) -> Iterator[list[str]]:
+        """Yield the keys of the entries matching the glob pattern `match`.
+
+        The keys are yielded in batches of about `count` keys, so a large
+        keyspace can be walked without blocking other clients for long.
+        """
+
+    def inspect(self, keys: Sequence[str]) -> list[tuple[int, int]]:
+        """Return the size in bytes and the TTL of each of the entries.
+
+        The size is the memory used if the backend can report it, otherwise
+        the total length of the entry fields. Missing entries have size 0.
+        """
+
+
+def to_bytes(value: Union[str, bytes]) -> bytes:
+    """Return an entry field `value` as bytes."""
+    return value.encode() if isinstance(value, str) else value
+
+
+def pack_entry(entry: Mapping[str, Union[str, bytes]]) -> bytes:
+    """Return the fields of `entry` packed into bytes."""
+    parts = []
+    for field, value in entry.items():
+        name = field.encode()
+        data = to_bytes(value)
+        parts += [FIELD_HEADER.pack(len(name), len(data)), name, data]
+    return b"".join(parts)
+
+
+def unpack_entry(payload: bytes) -> dict[str, bytes]:
+    """Return the fields of an entry packed by `pack_entry`."""
+    entry = {}
+    position = 0
+    view = memoryview(payload)
+    while position < len(payload):
+        name_length, data_length = FIELD_HEADER.unpack_from(payload, position)
+        position += FIELD_HEADER.size
+        name = bytes(view[position : position + name_length]).decode()
+        position += name_length
+        entry[name] = bytes(view[position : position + data_length])
+        position += data_length
+    return entry
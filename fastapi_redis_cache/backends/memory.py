@@ -0,0 +1,185 @@
+"""Store cache entries in the memory of this process."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Union
+
+from fastapi_redis_cache.backends.base import (
+    TTL_MISSING,
+    TTL_PERSISTENT,
+    Entry,
+    to_bytes,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import (
+        Collection,
+        Iterable,
+        Iterator,
+        Mapping,
+        Sequence,
+    )
+
+
+class MemoryBackend:
+    """Store cache entries in a dictionary, without any server.
+
+    Entries are only visible to this process, and are lost when it exits. This
+    suits tests, local development and single-process deployments. Expired
+    entries are removed when they are next read.
+
+    Args:
+        max_entries (int, optional): The most entries kept at once. The least
+            recently used entry is removed to make room for a new one.
+            Defaults to None, for no limit.
+    """
+
+    def __init__(self, max_entries: int | None = None) -> None:
+        """Create an empty backend."""
+        self.max_entries = max_entries
+        # key -> (expiry time, or None if it never expires, entry), least
+        # recently used first.
+        self._entries: OrderedDict[str, tuple[float | None, Entry]] = (
+            OrderedDict()
+        )
+        self._tags: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def ping(self) -> bool:
+        """Return True, the backend is always available."""
+        return True
+
+    def _get(self, key: str) -> tuple[float | None, Entry] | None:
+        """Return the expiry and entry for `key`, if it hasn't expired."""
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, _ = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return item
+
+    def get_entry(self, key: str, fields: Sequence[str]) -> tuple[int, Entry]:
+        """Return the TTL and `fields` of the entry for `key`."""
+        with self._lock:
+            item = self._get(key)
+        if item is None:
+            return (TTL_MISSING, {})
+        expires_at, stored = item
+        ttl = (
+            TTL_PERSISTENT
+            if expires_at is None
+            else round(expires_at - time.monotonic())
+        )
+        return (
+            ttl,
+            {field: stored[field] for field in fields if field in stored},
+        )
+
+    def get_entries(
+        self, keys: Sequence[str], fields: Sequence[str]
+    ) -> list[tuple[int, Entry]]:
+        """Return the TTL and `fields` of each of the entries for `keys`."""
+        return [self.get_entry(key, fields) for key in keys]
+
+    def set_entry(
+        self,
+        key: str,
+        entry: Mapping[str, Union[str, bytes]],
+        expire: int,
+        tag: str | None = None,
+    ) -> bool:
+        """Replace the entry for `key`, expiring after `expire` seconds."""
+        stored = {field: to_bytes(value) for field, value in entry.items()}
+        with self._lock:
+            self._entries[key] = (time.monotonic() + expire, stored)
+            self._entries.move_to_end(key)
+            if tag:
+                self._tags.setdefault(tag, set()).add(key)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return True
+
+    def update_entry(
+        self, key: str, entry: Mapping[str, Union[str, bytes]]
+    ) -> None:
+        """Add (or replace) fields of the entry for `key`."""
+        with self._lock:
+            expires_at, stored = self._get(key) or (None, {})
+            stored = {
+                **stored,
+                **{field: to_bytes(value) for field, value in entry.items()},
+            }
+            self._entries[key] = (expires_at, stored)
+
+    def add_to_tag(self, tag: str, key: str) -> None:
+        """Add `key` to the keys associated with `tag`."""
+        with self._lock:
+            self._tags.setdefault(tag, set()).add(key)
+
+    def get_tag(self, tag: str) -> set[bytes]:
+        """Return the keys associated with `tag`."""
+        with self._lock:
+            return {key.encode() for key in self._tags.get(tag, ())}
+
+    def delete(self, *keys: str) -> int:
+        """Delete the entries for `keys`, returning how many there were."""
+        with self._lock:
+            return self._delete(keys)
+
+    def delete_tags(
+        self, tags: Collection[str], keys: Collection[str] = ()
+    ) -> int:
+        """Delete `tags`, the entries of their keys and those for `keys`."""
+        with self._lock:
+            members = set(keys).union(
+                *(self._tags.pop(tag, set()) for tag in tags)
+            )
+            return self._delete(members)
+
+    def scan(self, match: str, count: int) -> Iterator[list[str]]:
+        """Yield the keys matching `match`, present when the scan started."""
+        with self._lock:
+            keys = [key for key in self._entries if fnmatchcase(key, match)]
+        for start in range(0, len(keys), count):
+            yield keys[start : start + count]
+
+    def inspect(self, keys: Sequence[str]) -> list[tuple[int, int]]:
+        """Return the length of the fields and the TTL of the entries.
+
+        Unlike reading them, this doesn't mark the entries as recently used.
+        """
+        now = time.monotonic()
+        results = []
+        with self._lock:
+            for key in keys:
+                expires_at, stored = self._entries.get(key, (now, {}))
+                if expires_at is not None and expires_at <= now:
+                    results.append((0, TTL_MISSING))
+                    continue
+                size = sum(
+                    len(field) + len(value) for field, value in stored.items()
+                )
+                ttl = (
+                    TTL_PERSISTENT
+                    if expires_at is None
+                    else round(expires_at - now)
+                )
+                results.append((size, ttl))
+        return results
+
+    def _delete(self, keys: Iterable[str]) -> int:
+        """Delete the entries for `keys`, the lock must be held."""
+        deleted = 0
+        for key in keys:
+            if self._get(key) is not None:
+                del self._entries[key]
+                deleted += 1
+        return deleted
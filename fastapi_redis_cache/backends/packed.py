@@ -0,0 +1,297 @@
+"""Store small cache entries packed together in shared Redis hashes.
+
+Each Redis key has a fixed overhead of several dozen bytes (more with an
+expiry), which is more than the entry itself for small responses such as flags
+and counts. `PackedRedisBackend` stores entries up to `max_packed_size` bytes
+as fields of a few bucket hashes instead, which Redis encodes compactly as
+listpacks while they are small. Larger entries keep the plain layout of
+`RedisBackend`, one hash per key.
+
+A packed field holds the time the entry expires followed by the entry fields,
+so expired entries are never returned. If the server supports `HEXPIRE`
+(Redis 7.4 and later) the fields are also expired by Redis. Otherwise each
+bucket expires with the last of its entries, and the expired fields of a bucket
+are removed when an entry is written to it (at most every `prune_interval`
+seconds), or by `purge_expired`.
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+import zlib
+from typing import TYPE_CHECKING, Union
+
+from redis.exceptions import ResponseError
+
+from fastapi_redis_cache.backends.base import (
+    TTL_MISSING,
+    Entry,
+    pack_entry,
+    unpack_entry,
+)
+from fastapi_redis_cache.backends.redis import RedisBackend, as_entry
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Collection, Iterator, Mapping, Sequence
+
+    from redis import client
+
+DEFAULT_MAX_PACKED_SIZE = 200
+DEFAULT_BUCKETS = 1024
+DEFAULT_NAMESPACE = "__packed__"
+DEFAULT_PRUNE_INTERVAL = 60
+# the time a packed entry expires, before its fields.
+EXPIRES_AT = struct.Struct("<d")
+
+
+class PackedRedisBackend(RedisBackend):
+    """Store small entries as fields of bucket hashes, and the rest as hashes.
+
+    Entries are still read in a single round trip, which checks both layouts.
+    Requires Redis 7.0 or later.
+
+    Args:
+        redis (Redis): The connected Redis client.
+        max_packed_size (int, optional): The largest entry (in bytes, once
+            packed) that is stored in a bucket. Defaults to 200.
+        buckets (int, optional): The number of bucket hashes. Redis only keeps
+            a hash compact while it has at most `hash-max-listpack-entries`
+            fields (128 by default), of at most `hash-max-listpack-value`
+            bytes (64 by default, so raise it to at least `max_packed_size`).
+            Defaults to 1024.
+        namespace (str, optional): The prefix of the bucket hash names.
+            Defaults to `"__packed__"`.
+        field_expiry (bool, optional): Expire packed entries with `HEXPIRE`,
+            which needs Redis 7.4 or later. Defaults to False.
+        prune_interval (float, optional): Without `field_expiry`, the expired
+            entries of a bucket are removed when an entry is written to it, if
+            it hasn't been pruned (by this process) for this many seconds.
+            Defaults to 60.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        redis: client.Redis,  # type: ignore[type-arg]
+        *,
+        max_packed_size: int = DEFAULT_MAX_PACKED_SIZE,
+        buckets: int = DEFAULT_BUCKETS,
+        namespace: str = DEFAULT_NAMESPACE,
+        field_expiry: bool = False,
+        prune_interval: float = DEFAULT_PRUNE_INTERVAL,
+    ) -> None:
+        """Use the connected `redis` client."""
+        super().__init__(redis)
+        self.max_packed_size = max_packed_size
+        self.buckets = buckets
+        self.namespace = namespace
+        self.field_expiry = field_expiry
+        self.prune_interval = prune_interval
+        # the time each bucket was last pruned by this process.
+        self.pruned_at: dict[str, float] = {}
+
+    def bucket(self, key: str) -> str:
+        """Return the name of the bucket hash that `key` is packed into."""
+        return f"{self.namespace}:{zlib.crc32(key.encode()) % self.buckets}"
+
+    def get_entry(self, key: str, fields: Sequence[str]) -> tuple[int, Entry]:
+        """Return the TTL and `fields` of the entry, in one round trip."""
+        return self.get_entries([key], fields)[0]
+
+    def get_entries(
+        self, keys: Sequence[str], fields: Sequence[str]
+    ) -> list[tuple[int, Entry]]:
+        """Return the TTL and `fields` of each entry, in one round trip.
+
+        Both the plain and packed layouts are read, at most one of them holds
+        each entry.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.ttl(key).hmget(key, fields).hget(self.bucket(key), key)
+        results = pipe.execute(raise_on_error=False)
+        return [
+            (ttl, as_entry(fields, values))
+            if ttl != TTL_MISSING and not isinstance(values, ResponseError)
+            else unpack(packed, fields)
+            for ttl, values, packed in zip(
+                results[::3], results[1::3], results[2::3]
+            )
+        ]
+
+    def set_entry(
+        self,
+        key: str,
+        entry: Mapping[str, Union[str, bytes]],
+        expire: int,
+        tag: str | None = None,
+    ) -> bool:
+        """Replace the entry, its expiry and tag membership atomically.
+
+        The entry is packed into its bucket if it is small enough, and any
+        copy in the other layout is deleted. The expired entries of the bucket
+        are removed too, if it is due to be pruned.
+        """
+        bucket = self.bucket(key)
+        packed = EXPIRES_AT.pack(time.time() + expire) + pack_entry(entry)
+        expired = self._prune(bucket)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(key)
+        if expired:
+            pipe.hdel(bucket, *expired)
+        if len(packed) > self.max_packed_size:
+            pipe.hdel(bucket, key)
+            pipe.hset(key, mapping=entry)  # type: ignore[arg-type]
+            pipe.expire(key, expire)
+        else:
+            pipe.hset(bucket, key, packed)
+            if self.field_expiry:
+                pipe.execute_command(  # type: ignore[no-untyped-call]
+                    "HEXPIRE", bucket, expire, "FIELDS", 1, key
+                )
+            else:
+                # the bucket lives as long as its longest lived entry.
+                pipe.expire(bucket, expire, nx=True)
+                pipe.expire(bucket, expire, gt=True)
+        if tag:
+            pipe.sadd(tag, key)
+        pipe.execute()
+        return True
+
+    def _prune(self, bucket: str) -> list[bytes]:
+        """Return the expired fields of `bucket`, if it is due to be pruned.
+
+        An entry rewritten by another client after this is read may be deleted
+        along with the expired fields, which only costs a cache miss.
+        """
+        now = time.time()
+        if (
+            self.field_expiry
+            or now - self.pruned_at.get(bucket, 0) < self.prune_interval
+        ):
+            return []
+        self.pruned_at[bucket] = now
+        return self.get_expired(bucket, now)
+
+    def get_expired(self, bucket: str, now: float) -> list[bytes]:
+        """Return the fields of `bucket` holding entries expired by `now`."""
+        return [
+            field
+            for field, packed in self.redis.hscan_iter(bucket)
+            if get_expires_at(packed) <= now
+        ]
+
+    def purge_expired(self) -> int:
+        """Remove the expired entries from every bucket.
+
+        Without `field_expiry`, expired entries are only removed from buckets
+        that are written to, so run this now and then (e.g. once a day) to
+        clean up buckets that are rarely written.
+
+        Returns:
+            `int`: The number of entries removed.
+        """
+        removed = 0
+        now = time.time()
+        for number in range(self.buckets):
+            bucket = f"{self.namespace}:{number}"
+            expired = self.get_expired(bucket, now)
+            if expired:
+                removed += self.redis.hdel(bucket, *expired)
+            self.pruned_at[bucket] = now
+        return removed
+
+    def delete(self, *keys: str) -> int:
+        """Delete the entries for `keys`, in either layout."""
+        if not keys:
+            return 0
+        pipe = self.redis.pipeline(transaction=True)
+        self._queue_delete(pipe, keys)
+        return sum(pipe.execute())
+
+    def delete_tags(
+        self, tags: Collection[str], keys: Collection[str] = ()
+    ) -> int:
+        """Delete the tag sets and entries in two round trips."""
+        pipe = self.redis.pipeline()
+        for tag in tags:
+            pipe.smembers(tag)
+        members = {member.decode() for member in set().union(*pipe.execute())}
+        pipe = self.redis.pipeline(transaction=True)
+        self._queue_delete(pipe, members.union(keys))
+        if tags:
+            pipe.delete(*tags)
+        results = pipe.execute()
+        return sum(results[:-1] if tags else results)
+
+    def _queue_delete(
+        self,
+        pipe: client.Pipeline,  # type: ignore[type-arg]
+        keys: Collection[str],
+    ) -> None:
+        """Add the commands deleting `keys` in both layouts to `pipe`."""
+        if not keys:
+            return
+        pipe.delete(*keys)
+        buckets: dict[str, list[str]] = {}
+        for key in keys:
+            buckets.setdefault(self.bucket(key), []).append(key)
+        for bucket, names in buckets.items():
+            pipe.hdel(bucket, *names)
+
+    def scan(self, match: str, count: int) -> Iterator[list[str]]:
+        """Yield the keys of the plain entries, then those of packed entries."""
+        for keys in super().scan(match, count):
+            entries = [
+                key for key in keys if not key.startswith(f"{self.namespace}:")
+            ]
+            if entries:
+                yield entries
+        for bucket in range(self.buckets):
+            keys = [
+                key.decode()
+                for key, _ in self.redis.hscan_iter(
+                    f"{self.namespace}:{bucket}", match=match, count=count
+                )
+            ]
+            if keys:
+                yield keys
+
+    def inspect(self, keys: Sequence[str]) -> list[tuple[int, int]]:
+        """Return the size and TTL of the entries, packed or not.
+
+        The size of a packed entry is the length of its field and value.
+        """
+        results = super().inspect(keys)
+        missing = [
+            index
+            for index, (_, ttl) in enumerate(results)
+            if ttl == TTL_MISSING
+        ]
+        if not missing:
+            return results
+        pipe = self.redis.pipeline(transaction=False)
+        for index in missing:
+            pipe.hget(self.bucket(keys[index]), keys[index])
+        for index, packed in zip(missing, pipe.execute()):
+            ttl, _ = unpack(packed, [])
+            if ttl != TTL_MISSING:
+                results[index] = (len(keys[index]) + len(packed), ttl)
+        return results
+
+
+def unpack(packed: bytes | None, fields: Sequence[str]) -> tuple[int, Entry]:
+    """Return the TTL and `fields` of a packed entry, if it hasn't expired."""
+    if not packed or isinstance(packed, ResponseError):
+        return (TTL_MISSING, {})
+    ttl = int(get_expires_at(packed) - time.time())
+    if ttl <= 0:
+        return (TTL_MISSING, {})
+    entry = unpack_entry(packed[EXPIRES_AT.size :])
+    return (ttl, {field: entry[field] for field in fields if field in entry})
+
+
+def get_expires_at(packed: bytes) -> float:
+    """Return the time (in seconds since the epoch) a packed entry expires."""
+    (expires_at,) = EXPIRES_AT.unpack_from(packed)
+    return float(expires_at)
@@ -0,0 +1,180 @@
+"""Store cache entries in Redis (the default backend)."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Union
+
+from redis.exceptions import ResponseError
+
+from fastapi_redis_cache.backends.base import TTL_MISSING, Entry
+from fastapi_redis_cache.scripts import FETCH_ENTRY, STORE_ENTRY
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Collection, Iterator, Mapping, Sequence
+
+    from redis import client
+    from redis.commands.core import Script
+
+
+class RedisBackend:
+    """Store each cache entry as a Redis hash, and each tag as a Redis set.
+
+    Entries are read and written in a single round trip, either using
+    pipelines or (if `use_scripts` is set) server-side Lua scripts run with
+    `EVALSHA`.
+    """
+
+    def __init__(
+        self,
+        redis: client.Redis,  # type: ignore[type-arg]
+        *,
+        use_scripts: bool = False,
+    ) -> None:
+        """Use the connected `redis` client.
+
+        The scripts are cached on the server by their SHA1 digest the first
+        time they are run, after that only the digest is sent.
+        """
+        self.redis = redis
+        self._fetch_script: Script | None = None
+        self._store_script: Script | None = None
+        if use_scripts:
+            self._fetch_script = redis.register_script(FETCH_ENTRY)
+            self._store_script = redis.register_script(STORE_ENTRY)
+
+    def ping(self) -> bool:
+        """Return True if the Redis server responds."""
+        return bool(self.redis.ping())
+
+    def get_entry(self, key: str, fields: Sequence[str]) -> tuple[int, Entry]:
+        """Return the TTL and `fields` of the entry, in one round trip."""
+        try:
+            if self._fetch_script:
+                ttl, *values = self._fetch_script(keys=[key], args=fields)
+            else:
+                pipe = self.redis.pipeline()
+                ttl, values = pipe.ttl(key).hmget(key, fields).execute()
+        except ResponseError:
+            # the key holds a value in an older (non-hash) layout, treat this as
+            # a miss so it is overwritten when the response is cached again.
+            return (TTL_MISSING, {})
+        return (ttl, as_entry(fields, values))
+
+    def get_entries(
+        self, keys: Sequence[str], fields: Sequence[str]
+    ) -> list[tuple[int, Entry]]:
+        """Return the TTL and `fields` of each entry, in one round trip."""
+        pipe = self.redis.pipeline()
+        for key in keys:
+            pipe.ttl(key).hmget(key, fields)
+        results = pipe.execute(raise_on_error=False)
+        return [
+            (TTL_MISSING, {})
+            if isinstance(values, ResponseError)
+            else (ttl, as_entry(fields, values))
+            for ttl, values in zip(results[::2], results[1::2])
+        ]
+
+    def set_entry(
+        self,
+        key: str,
+        entry: Mapping[str, Union[str, bytes]],
+        expire: int,
+        tag: str | None = None,
+    ) -> bool:
+        """Replace the entry, its expiry and tag membership atomically.
+
+        This is a single round trip, either as a `MULTI` pipeline or using the
+        `STORE_ENTRY` script.
+        """
+        if self._store_script:
+            keys = [key, tag] if tag else [key]
+            args = [expire, *(item for pair in entry.items() for item in pair)]
+            return bool(self._store_script(keys=keys, args=args))
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.hset(key, mapping=entry)  # type: ignore[arg-type]
+        pipe.expire(key, expire)
+        if tag:
+            pipe.sadd(tag, key)
+        return bool(pipe.execute()[2])
+
+    def update_entry(
+        self, key: str, entry: Mapping[str, Union[str, bytes]]
+    ) -> None:
+        """Add (or replace) fields of the entry."""
+        self.redis.hset(key, mapping=entry)  # type: ignore[arg-type]
+
+    def add_to_tag(self, tag: str, key: str) -> None:
+        """Add `key` to the tag set."""
+        self.redis.sadd(tag, key)
+
+    def get_tag(self, tag: str) -> set[bytes]:
+        """Return the members of the tag set."""
+        return set(self.redis.smembers(tag))
+
+    def delete(self, *keys: str) -> int:
+        """Delete the entries for `keys`."""
+        return int(self.redis.delete(*keys)) if keys else 0
+
+    def delete_tags(
+        self, tags: Collection[str], keys: Collection[str] = ()
+    ) -> int:
+        """Delete the tag sets and entries in two round trips.
+
+        The members of every tag set are read in one pipeline, then all the
+        entries and tag sets are deleted atomically in a second.
+        """
+        pipe = self.redis.pipeline()
+        for tag in tags:
+            pipe.smembers(tag)
+        members = set().union(*pipe.execute(), (key.encode() for key in keys))
+        pipe = self.redis.pipeline(transaction=True)
+        if members:
+            pipe.delete(*members)
+        if tags:
+            pipe.delete(*tags)
+        results = pipe.execute()
+        return int(results[0]) if members else 0
+
+    def scan(self, match: str, count: int) -> Iterator[list[str]]:
+        """Yield the keys of the hashes matching `match`, using `SCAN`."""
+        cursor = 0
+        while True:
+            cursor, keys = self.redis.scan(
+                cursor, match=match, count=count, _type="hash"
+            )
+            if keys:
+                yield [key.decode() for key in keys]
+            if not cursor:
+                return
+
+    def inspect(self, keys: Sequence[str]) -> list[tuple[int, int]]:
+        """Return `MEMORY USAGE` and `TTL` of the entries, in one round trip.
+
+        If the server doesn't support `MEMORY USAGE`, the lengths of the hash
+        fields are added up instead.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.memory_usage(key, samples=0).ttl(key)
+        results = pipe.execute(raise_on_error=False)
+        sizes, ttls = results[::2], results[1::2]
+        if any(isinstance(size, ResponseError) for size in sizes):
+            pipe = self.redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+            sizes = [
+                sum(len(field) + len(value) for field, value in entry.items())
+                for entry in pipe.execute()
+            ]
+        return [(int(size or 0), ttl) for size, ttl in zip(sizes, ttls)]
+
+
+def as_entry(fields: Sequence[str], values: Sequence[bytes | None]) -> Entry:
+    """Return the fields that have a value, as an entry."""
+    return {
+        field: value
+        for field, value in zip(fields, values)
+        if value is not None
+    }
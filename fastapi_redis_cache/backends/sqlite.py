@@ -0,0 +1,261 @@
+"""Store cache entries in a SQLite database file."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Union
+
+from fastapi_redis_cache.backends.base import (
+    TTL_MISSING,
+    TTL_PERSISTENT,
+    Entry,
+    to_bytes,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import (
+        Collection,
+        Iterable,
+        Iterator,
+        Mapping,
+        Sequence,
+    )
+    from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    expires_at REAL
+);
+CREATE TABLE IF NOT EXISTS fields (
+    key TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (key, field)
+);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (tag, key)
+);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+"""
+
+
+class SQLiteBackend:
+    """Store cache entries in a SQLite database, which persists on disk.
+
+    The cache survives restarts and can be shared by the worker processes on
+    one host, without running a server. The database uses write-ahead logging
+    so readers don't block the writer. Expiry times are stored as Unix
+    timestamps, expired entries are removed when they are next read or by
+    calling `purge_expired`.
+
+    Args:
+        path (Union[str, Path]): The database file, created if it doesn't
+            exist. Use `":memory:"` for a private in-memory database.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Open (or create) the database at `path`."""
+        self.path = path
+        self._db = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+    def ping(self) -> bool:
+        """Return True if the database can be queried."""
+        try:
+            with self._lock:
+                self._db.execute("SELECT 1")
+        except sqlite3.Error:
+            return False
+        return True
+
+    def get_entry(self, key: str, fields: Sequence[str]) -> tuple[int, Entry]:
+        """Return the TTL and `fields` of the entry for `key`."""
+        with self._lock:
+            return self._get_entry(key, fields)
+
+    def get_entries(
+        self, keys: Sequence[str], fields: Sequence[str]
+    ) -> list[tuple[int, Entry]]:
+        """Return the TTL and `fields` of each of the entries for `keys`."""
+        with self._lock:
+            return [self._get_entry(key, fields) for key in keys]
+
+    def _get_entry(self, key: str, fields: Sequence[str]) -> tuple[int, Entry]:
+        """Read an entry, the lock must be held."""
+        row = self._db.execute(
+            "SELECT expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return (TTL_MISSING, {})
+        (expires_at,) = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            with self._db:
+                self._db.execute("BEGIN")
+                self._delete([key])
+            return (TTL_MISSING, {})
+        placeholders = ", ".join("?" * len(fields))
+        rows = self._db.execute(
+            "SELECT field, value FROM fields "  # noqa: S608
+            f"WHERE key = ? AND field IN ({placeholders})",
+            (key, *fields),
+        )
+        ttl = TTL_PERSISTENT if expires_at is None else round(expires_at - now)
+        return (ttl, {field: bytes(value) for field, value in rows})
+
+    def set_entry(
+        self,
+        key: str,
+        entry: Mapping[str, Union[str, bytes]],
+        expire: int,
+        tag: str | None = None,
+    ) -> bool:
+        """Replace the entry, its expiry and tag membership in a transaction."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM fields WHERE key = ?", (key,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?)",
+                (key, time.time() + expire),
+            )
+            self._insert_fields(key, entry)
+            if tag:
+                self._db.execute(
+                    "INSERT OR IGNORE INTO tags VALUES (?, ?)", (tag, key)
+                )
+        return True
+
+    def update_entry(
+        self, key: str, entry: Mapping[str, Union[str, bytes]]
+    ) -> None:
+        """Add (or replace) fields of the entry for `key`."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT OR IGNORE INTO entries VALUES (?, NULL)", (key,)
+            )
+            self._insert_fields(key, entry)
+
+    def _insert_fields(
+        self, key: str, entry: Mapping[str, Union[str, bytes]]
+    ) -> None:
+        """Write the fields of an entry, the lock must be held."""
+        self._db.executemany(
+            "INSERT OR REPLACE INTO fields VALUES (?, ?, ?)",
+            [(key, field, to_bytes(value)) for field, value in entry.items()],
+        )
+
+    def add_to_tag(self, tag: str, key: str) -> None:
+        """Add `key` to the keys associated with `tag`."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO tags VALUES (?, ?)", (tag, key)
+            )
+
+    def get_tag(self, tag: str) -> set[bytes]:
+        """Return the keys associated with `tag`."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key FROM tags WHERE tag = ?", (tag,)
+            )
+            return {key.encode() for (key,) in rows}
+
+    def delete(self, *keys: str) -> int:
+        """Delete the entries for `keys`, returning how many there were."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            return self._delete(keys)
+
+    def delete_tags(
+        self, tags: Collection[str], keys: Collection[str] = ()
+    ) -> int:
+        """Delete `tags`, the entries of their keys and the entries for `keys`.
+
+        Everything is deleted in a single transaction.
+        """
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            members = set(keys)
+            for tag in tags:
+                members.update(
+                    key
+                    for (key,) in self._db.execute(
+                        "SELECT key FROM tags WHERE tag = ?", (tag,)
+                    )
+                )
+            self._db.executemany(
+                "DELETE FROM tags WHERE tag = ?", [(tag,) for tag in tags]
+            )
+            return self._delete(members)
+
+    def scan(self, match: str, count: int) -> Iterator[list[str]]:
+        """Yield the keys matching `match`, in key order.
+
+        Each batch is a separate query, so writes can happen in between.
+        """
+        last = ""
+        while True:
+            with self._lock:
+                keys = [
+                    key
+                    for (key,) in self._db.execute(
+                        "SELECT key FROM entries WHERE key GLOB ? AND key > ? "
+                        "ORDER BY key LIMIT ?",
+                        (match, last, count),
+                    )
+                ]
+            if not keys:
+                return
+            yield keys
+            last = keys[-1]
+
+    def inspect(self, keys: Sequence[str]) -> list[tuple[int, int]]:
+        """Return the length of the fields and the TTL of the entries."""
+        results = []
+        with self._lock:
+            for key in keys:
+                ttl, _ = self._get_entry(key, [])
+                (size,) = self._db.execute(
+                    "SELECT COALESCE(SUM(LENGTH(field) + LENGTH(value)), 0) "
+                    "FROM fields WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                results.append((size if ttl != TTL_MISSING else 0, ttl))
+        return results
+
+    def purge_expired(self) -> int:
+        """Delete every expired entry, returning how many there were."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            keys = [
+                key
+                for (key,) in self._db.execute(
+                    "SELECT key FROM entries WHERE expires_at <= ?",
+                    (time.time(),),
+                )
+            ]
+            return self._delete(keys)
+
+    def _delete(self, keys: Iterable[str]) -> int:
+        """Delete entries, the lock must be held (inside a transaction)."""
+        rows = [(key,) for key in keys]
+        if not rows:
+            return 0
+        self._db.executemany("DELETE FROM fields WHERE key = ?", rows)
+        return self._db.executemany(
+            "DELETE FROM entries WHERE key = ?", rows
+        ).rowcount
@@ -3,44 +3,197 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import math
+import random
+import time
 from datetime import timedelta
 from functools import partial, update_wrapper, wraps
 from http import HTTPStatus
-from typing import Any, Callable, Union
+from inspect import Parameter, isclass, signature
+from typing import TYPE_CHECKING, Any, Callable, Union, get_type_hints
 
-from fastapi import Response
+from fastapi import HTTPException, Request, Response
 
-from fastapi_redis_cache.client import FastApiRedisCache
+from fastapi_redis_cache.backends.base import to_bytes
+from fastapi_redis_cache.client import (
+    ALLOWED_HTTP_TYPES,
+    DEFAULT_INSTANCE,
+    ENTRY_COUNT,
+    ENTRY_DATA,
+    ENTRY_DELTA,
+    ENTRY_ETAG,
+    ENTRY_HEADERS,
+    ENTRY_LAST_MODIFIED,
+    ENTRY_METADATA_FIELDS,
+    ENTRY_NEGATIVE,
+    FastApiRedisCache,
+    format_delta,
+)
+from fastapi_redis_cache.codec import JsonCodec, SchemaCodec, get_schema_codec
+from fastapi_redis_cache.enums import RedisEvent
+from fastapi_redis_cache.key_gen import (
+    check_template,
+    format_template,
+    get_body_arg_digest,
+    get_body_digest,
+    get_body_params,
+    get_vary_headers,
+)
+from fastapi_redis_cache.responses import (
+    DEFAULT_MAX_CACHEABLE_SIZE,
+    cache_raw_response,
+    is_raw_response,
+    replay_raw_response,
+)
 from fastapi_redis_cache.util import (
     ONE_DAY_IN_SECONDS,
     ONE_HOUR_IN_SECONDS,
     ONE_MONTH_IN_SECONDS,
     ONE_WEEK_IN_SECONDS,
     ONE_YEAR_IN_SECONDS,
-    deserialize_json,
-    serialize_json,
 )
 
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Awaitable, Collection
+
+    from fastapi_redis_cache.codec import Codec
+    from fastapi_redis_cache.key_gen import KeyArgs, KeyBuilder
+    from fastapi_redis_cache.pagination import Pagination
+
 JSON_MEDIA_TYPE = "application/json"
+# name of the `Request` parameter added to path functions that don't have one.
+INJECTED_REQUEST_PARAM = "__fastapi_redis_cache_request"
+# attribute of decorated functions holding the cache instance they use.
+CACHE_INSTANCE_ATTR = "__fastapi_redis_cache__"
 
 
-def cache(
+def cache(  # noqa: PLR0913
     *,
-    expire: Union[int, timedelta] = ONE_YEAR_IN_SECONDS,
+    expire: Union[int, timedelta, None] = None,
     tag: str | None = None,
+    max_size: int = DEFAULT_MAX_CACHEABLE_SIZE,
+    stream_chunk_size: int | None = None,
+    vary: list[str] | None = None,
+    unordered_args: Collection[str] = (),
+    key_builder: KeyBuilder | None = None,
+    key_args: KeyArgs | None = None,
+    jitter: float = 0,
+    early_refresh: float | None = None,
+    negative_expire: Union[int, timedelta, None] = None,
+    negative_status_codes: Collection[int] = (HTTPStatus.NOT_FOUND,),
+    instance: Union[str, FastApiRedisCache] = DEFAULT_INSTANCE,
+    response_model: Any = None,  # noqa: ANN401
+    paginate: Pagination | None = None,
+    methods: Collection[str] | None = None,
+    body_key: bool | None = None,
 ) -> Callable[..., Any]:
     """Enable caching behavior for the decorated function.
 
     Args:
         expire (Union[int, timedelta], optional): The number of seconds
-            from now when the cached response should expire. Defaults to
-            31,536,000 seconds (i.e., the number of seconds in one year).
+            from now when the cached response should expire. Defaults to the
+            `default_expire` of the cache instance, which is 31,536,000 seconds
+            (i.e., the number of seconds in one year) unless configured.
         tag (str, optional): A tag to associate with the cached response. This
             can later be used to invalidate all cached responses with the same
-            tag, or for further fine-grained cache expiry. Defaults to None.
+            tag, or for further fine-grained cache expiry. It can include the
+            arguments of the path function, e.g. `"user:{user_id}"`. Defaults
+            to None.
+        max_size (int, optional): The largest body, in bytes, that will be
+            cached when the function returns a `Response` (including streamed
+            and file responses) or raw `bytes`. Larger responses are sent as
+            normal but not cached. Defaults to 1 MiB.
+        stream_chunk_size (int, optional): If set, cached raw responses are
+            sent as a chunked stream of this many bytes per chunk instead of a
+            single body. Defaults to None.
+        vary (list[str], optional): Names of request headers whose values
+            affect the response (such as `Accept-Language`). Their values are
+            included in the cache key, and they are listed in the `Vary`
+            response header. Defaults to None.
+        unordered_args (Collection[str], optional): Names of list arguments
+            where the order of the items does not affect the response. Their
+            items are sorted when creating the cache key, so requests that only
+            differ in the order share a cached response. Defaults to ().
+        key_builder (KeyBuilder, optional): A function called with the
+            decorated function and its arguments (`func, *args, **kwargs`)
+            that returns the string used for the arguments in the cache key.
+            Defaults to None.
+        key_args (KeyArgs, optional): Functions that return the value to use in
+            the cache key for the named arguments, e.g.
+            `{"user": lambda user: user.id}`. Defaults to None.
+        jitter (float, optional): The largest fraction (from 0 up to, but not
+            including, 1) by which the TTL of each cached response is randomly
+            reduced, so responses cached at the same time don't all expire at
+            the same time. Defaults to 0.
+        early_refresh (float, optional): If set, a cached response may be
+            recomputed before it expires, with a probability that increases
+            as the remaining TTL approaches the time the response took to
+            compute (the XFetch algorithm). Values larger than 1 favor earlier
+            refreshes. Defaults to None.
+        negative_expire (Union[int, timedelta], optional): If set, empty
+            results (`None`, or an empty list, dict or string) and any
+            `HTTPException` with a status code in `negative_status_codes` are
+            also cached, for this (usually short) time instead of `expire`.
+            A cached error is raised again on a cache hit. Defaults to None.
+        negative_status_codes (Collection[int], optional): The status codes
+            of the errors cached when `negative_expire` is set. Defaults to
+            `(404,)`.
+        instance (Union[str, FastApiRedisCache], optional): The cache
+            instance (or the name of one) that stores the responses. Defaults
+            to the default instance, `FastApiRedisCache()`.
+        response_model (Any, optional): The type of the response, used to
+            serialize it (see below). Set this if the route has a
+            `response_model` that differs from the return type annotation of
+            the function. Defaults to None, which uses the annotation.
+        paginate (Pagination, optional): If set, the function returns every
+            item of a paginated list, ignoring its page and size arguments.
+            The full list is cached once (with the same key for every page),
+            and each request is sent the page it asked for. Defaults to None.
+        methods (Collection[str], optional): The HTTP methods of the requests
+            that are cached. Only add methods such as `POST` for endpoints that
+            are safe to repeat, such as search queries. Defaults to `GET` and
+            `HEAD`.
+        body_key (bool, optional): Include a digest of the request body in the
+            cache key. Arguments read from the body (such as Pydantic models)
+            are replaced in the key by a digest of their JSON, or if there are
+            none, a digest of the (canonicalized JSON) request body is added.
+            Defaults to None, which includes the body if `methods` has any
+            method other than `GET` and `HEAD`, so requests with different
+            bodies don't share a cached response.
+
+    If the response type can be handled by Pydantic, it is serialized with a
+    `TypeAdapter` built once for the type, and cache hits are sent as the
+    stored JSON without FastAPI serializing them again. This only applies
+    while the cache instance uses the default `JsonCodec`.
     """
+    if not 0 <= jitter < 1:
+        msg = f"jitter must be at least 0 and less than 1, not {jitter}"
+        raise ValueError(msg)
+    negative_ttl = (
+        None if negative_expire is None else calculate_ttl(negative_expire)
+    )
 
     def outer_wrapper(func: Callable[..., Any]) -> Callable[..., Any]:
+        redis_cache = (
+            instance
+            if isinstance(instance, FastApiRedisCache)
+            else FastApiRedisCache(instance)
+        )
+        schema_codec = get_response_codec(func, response_model)
+        check_template(tag, func)
+        cache_methods = tuple(
+            method.upper() for method in methods or ALLOWED_HTTP_TYPES
+        )
+        use_body_key = (
+            any(method not in ALLOWED_HTTP_TYPES for method in cache_methods)
+            if body_key is None
+            else body_key
+        )
+        body_params = get_body_params(func) if use_body_key else []
+        cache_key_args = get_key_args(func, key_args, paginate, body_params)
+        digest_request_body = use_body_key and not body_params
+
         @wraps(func)
         async def inner_wrapper(
             *args: Any,  # noqa: ANN401
@@ -50,83 +203,739 @@ def cache(
 
             Otherwise evaluate the wrapped function and cache the result.
             """
+            request = kwargs.pop(INJECTED_REQUEST_PARAM, None)
             func_kwargs = kwargs.copy()
-            request = func_kwargs.pop("request", None)
+            request = func_kwargs.pop("request", request)
             response = func_kwargs.pop("response", None)
             create_response_directly = not response
-            if create_response_directly:
-                response = Response()
-                # below fix by @jaepetto on the original repo.
-                if "content-length" in response.headers:
-                    del response.headers["content-length"]
+            response = response or blank_response()
+            if vary:
+                response.headers["Vary"] = ", ".join(vary)
 
-            redis_cache = FastApiRedisCache()
             if (
                 redis_cache.not_connected
-                or redis_cache.request_is_not_cacheable(request)
+                or redis_cache.request_is_not_cacheable(request, cache_methods)
             ):
                 # if the redis client is not connected or request is not
                 # cacheable, no caching behavior is performed.
                 return await get_api_response_async(func, *args, **kwargs)
-            key = redis_cache.get_cache_key(tag, func, *args, **kwargs)
-            ttl, in_cache = redis_cache.check_cache(key)
-            if in_cache:
-                redis_cache.set_response_headers(
-                    response, True, deserialize_json(in_cache), ttl
-                )
-                if redis_cache.requested_resource_not_modified(
-                    request, in_cache
-                ):
-                    response.status_code = int(HTTPStatus.NOT_MODIFIED)
-                    return (
-                        Response(
-                            content=None,
-                            status_code=response.status_code,
-                            media_type=JSON_MEDIA_TYPE,
-                            headers=response.headers,
-                        )
-                        if create_response_directly
-                        else response
-                    )
-                return (
-                    Response(
-                        content=in_cache,
-                        media_type="application/json",
-                        headers=response.headers,
-                    )
-                    if create_response_directly
-                    else deserialize_json(in_cache)
+            call_tag = format_template(tag, func, args, kwargs) if tag else None
+            body_digest = (
+                await get_request_body_digest(request)
+                if digest_request_body
+                else None
+            )
+            key = redis_cache.build_cache_key(
+                call_tag,
+                func,
+                args,
+                kwargs,
+                vary_headers=get_vary_headers(request, vary or []),
+                unordered_args=unordered_args,
+                key_builder=key_builder,
+                key_args=cache_key_args,
+                body_digest=body_digest,
+            )
+            codec = select_codec(redis_cache, schema_codec)
+            get_entry_ttl = partial(
+                get_ttl,
+                redis_cache,
+                key,
+                expire,
+                jitter=jitter,
+                negative_ttl=negative_ttl,
+            )
+            compute = partial(
+                call_path_function,
+                func,
+                args,
+                kwargs,
+                on_error=partial(
+                    cache_http_exception,
+                    redis_cache,
+                    key,
+                    negative_ttl,
+                    call_tag,
+                    negative_status_codes,
+                ),
+            )
+            if paginate:
+                return await paginated_response(
+                    redis_cache,
+                    request,
+                    response,
+                    key,
+                    paginate.get_slice(kwargs),
+                    paginate=paginate,
+                    codec=codec,
+                    compute=compute,
+                    get_entry_ttl=get_entry_ttl,
+                    negative_ttl=negative_ttl,
+                    tag=call_tag,
+                    early_refresh=early_refresh,
+                    create_response_directly=create_response_directly,
                 )
-            response_data = await get_api_response_async(func, *args, **kwargs)
-            ttl = calculate_ttl(expire)
-            cached = redis_cache.add_to_cache(key, response_data, ttl)
-            if tag:
-                # if tag is provided, add the key to the tag set. This should
-                # help us search quicker for keys to invalidate.
-                redis_cache.add_key_to_tag_set(tag, key)
-            if cached:
-                redis_cache.set_response_headers(
+            call = HedgedCall(compute)
+            read = await read_entry(
+                redis_cache,
+                key,
+                partial(lookup_entry, redis_cache, key, request),
+                call,
+            )
+            if read is None:
+                # the read went over budget, or failed.
+                response_data, _ = await call.result()
+                return response_data
+            ttl, entry = read
+            if entry and not refresh_early(ttl, entry, early_refresh):
+                call.cancel()
+                return cached_response(
+                    redis_cache,
+                    request,
                     response,
-                    cache_hit=False,
-                    response_data=response_data,
-                    ttl=ttl,
+                    ttl,
+                    entry,
+                    codec=codec,
+                    create_response_directly=create_response_directly,
+                    stream_chunk_size=stream_chunk_size,
                 )
-                return (
-                    Response(
-                        content=serialize_json(response_data),
-                        media_type=JSON_MEDIA_TYPE,
-                        headers=response.headers,
-                    )
-                    if create_response_directly
-                    else response_data
+            response_data, delta = await call.result()
+            negative = bool(negative_ttl) and is_empty_result(response_data)
+            ttl = get_entry_ttl(negative=negative)
+            if is_raw_response(response_data):
+                return await cache_raw_response(
+                    redis_cache,
+                    key,
+                    response_data,
+                    ttl,
+                    call_tag,
+                    max_size,
+                    delta=delta,
                 )
-            return response_data
+            return cache_json_response(
+                redis_cache,
+                response,
+                key,
+                response_data,
+                ttl,
+                tag=call_tag,
+                delta=delta,
+                negative=negative,
+                codec=codec,
+                create_response_directly=create_response_directly,
+            )
 
+        add_request_parameter(func, inner_wrapper)
+        setattr(inner_wrapper, CACHE_INSTANCE_ATTR, redis_cache)
         return inner_wrapper
 
     return outer_wrapper
 
 
+def add_request_parameter(
+    func: Callable[..., Any], wrapper: Callable[..., Any]
+) -> None:
+    """Make sure FastAPI passes the `Request` to the `wrapper` of `func`.
+
+    The request is needed to check the `Cache-Control` and conditional request
+    headers, and for the `vary` headers. If `func` doesn't already have a
+    `request` parameter, a keyword-only one is added to the signature FastAPI
+    sees for `wrapper`. The wrapper removes it again before calling `func`.
+    """
+    if "request" not in signature(func).parameters:
+        add_keyword_parameter(func, wrapper, INJECTED_REQUEST_PARAM, Request)
+
+
+def add_keyword_parameter(
+    func: Callable[..., Any],
+    wrapper: Callable[..., Any],
+    name: str,
+    annotation: type[Any],
+) -> None:
+    """Add a keyword-only parameter to the signature FastAPI sees for `wrapper`.
+
+    The parameter is added before any `**kwargs` of `func`, so FastAPI passes
+    an argument of type `annotation` to `wrapper` as `name`.
+    """
+    sig = signature(func)
+    params = list(sig.parameters.values())
+    position = next(
+        (
+            index
+            for index, param in enumerate(params)
+            if param.kind == Parameter.VAR_KEYWORD
+        ),
+        len(params),
+    )
+    params.insert(
+        position,
+        Parameter(name, Parameter.KEYWORD_ONLY, annotation=annotation),
+    )
+    wrapper.__signature__ = sig.replace(  # type: ignore[attr-defined]
+        parameters=params
+    )
+
+
+def get_key_args(
+    func: Callable[..., Any],
+    key_args: KeyArgs | None,
+    paginate: Pagination | None,
+    body_params: Collection[str] = (),
+) -> KeyArgs | None:
+    """Return the `key_args` used for the cache keys of `func`.
+
+    Paginated functions leave their page and size out of the cache key, and
+    the `body_params` are replaced by a digest unless they are in `key_args`.
+    """
+    if body_params:
+        key_args = {
+            **dict.fromkeys(body_params, get_body_arg_digest),
+            **(key_args or {}),
+        }
+    if not paginate:
+        return key_args
+    paginate.check(func)
+    return paginate.get_key_args(key_args)
+
+
+async def get_request_body_digest(request: Request | None) -> str | None:
+    """Return a digest of the body of `request`, if there is a request."""
+    return get_body_digest(await request.body()) if request else None
+
+
+def get_response_codec(
+    func: Callable[..., Any],
+    response_model: Any = None,  # noqa: ANN401
+) -> SchemaCodec | None:
+    """Return the codec for the response type of `func`, if it has one.
+
+    The type is `response_model` if given, otherwise the return annotation.
+    There is no codec for functions without a return type, or that return
+    `Response` objects or raw bytes.
+    """
+    if response_model is None:
+        try:
+            response_model = get_type_hints(func).get("return")
+        except (NameError, TypeError):
+            return None
+    if (
+        response_model in {None, Any}
+        or isclass(response_model)
+        and issubclass(response_model, (Response, bytes))
+    ):
+        return None
+    return get_schema_codec(response_model)
+
+
+def select_codec(
+    redis_cache: FastApiRedisCache, schema_codec: SchemaCodec | None
+) -> Codec:
+    """Return the codec for a path function with the given `schema_codec`.
+
+    The schema codec replaces the default `JsonCodec` only, any other codec
+    configured for the cache instance is always used.
+    """
+    return (
+        schema_codec
+        if schema_codec and type(redis_cache.codec) is JsonCodec
+        else redis_cache.codec
+    )
+
+
+def blank_response() -> Response:
+    """Return an empty response to collect the cache headers in."""
+    response = Response()
+    # below fix by @jaepetto on the original repo.
+    if "content-length" in response.headers:
+        del response.headers["content-length"]
+    return response
+
+
+def lookup_entry(
+    redis_cache: FastApiRedisCache, key: str, request: Request | None
+) -> tuple[int, dict[str, Any]]:
+    """Return the TTL and cache entry needed to answer `request`.
+
+    Revalidations and HEAD requests are answered from the stored metadata if
+    possible, so the whole cached body is only transferred when it is needed.
+    An empty entry means the key is not in the cache.
+    """
+    if request and redis_cache.request_is_conditional(request):
+        ttl, entry = redis_cache.fetch_entry(key, ENTRY_METADATA_FIELDS)
+        if (
+            entry
+            and get_error_status(entry) is None
+            and (
+                request.method == "HEAD"
+                or redis_cache.resource_not_modified(
+                    request,
+                    entry.get(ENTRY_ETAG),
+                    entry.get(ENTRY_LAST_MODIFIED),
+                )
+            )
+        ):
+            return (ttl, entry)
+    return redis_cache.fetch_entry(key)
+
+
+def cache_json_response(  # noqa: PLR0913
+    redis_cache: FastApiRedisCache,
+    response: Response,
+    key: str,
+    response_data: Any,  # noqa: ANN401
+    ttl: int,
+    *,
+    tag: str | None,
+    delta: float,
+    negative: bool,
+    codec: Codec,
+    create_response_directly: bool,
+) -> Any:  # noqa: ANN401
+    """Cache the data returned by a path function, and return the response.
+
+    The data is returned unchanged if it can't be cached.
+    """
+    entry = redis_cache.build_entry(
+        key,
+        response_data,
+        delta=delta,
+        negative_status=HTTPStatus.OK if negative else None,
+        codec=codec,
+    )
+    # if tag is provided, the key is also added to the tag set in the same
+    # round trip. This should help us search quicker for keys to invalidate.
+    if not entry or not redis_cache.store_entry(key, entry, ttl, tag):
+        return response_data
+    return json_response(
+        redis_cache,
+        response,
+        response_data,
+        ttl,
+        codec=codec,
+        entry=entry,
+        create_response_directly=create_response_directly,
+    )
+
+
+class HedgedCall:
+    """A call to a path function, which can be started before it is needed.
+
+    When a cache read is slow the function is started while the read is still
+    pending, and its result used if the read misses (or is abandoned).
+    """
+
+    def __init__(
+        self, compute: Callable[[], Awaitable[tuple[Any, float]]]
+    ) -> None:
+        """Wrap `compute`, without calling it yet."""
+        self.compute = compute
+        self.task: asyncio.Task[tuple[Any, float]] | None = None
+
+    def start(self) -> None:
+        """Start computing the result in a task."""
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.compute())
+
+    async def result(self) -> tuple[Any, float]:
+        """Return the result and compute time, computing it if not started."""
+        if self.task is None:
+            return await self.compute()
+        return await self.task
+
+    def cancel(self) -> None:
+        """Discard the result, which is no longer needed."""
+        if self.task is None:
+            return
+        if self.task.done() and not self.task.cancelled():
+            # retrieve any exception, so it isn't reported as unhandled.
+            self.task.exception()
+        self.task.cancel()
+
+
+async def read_entry(
+    redis_cache: FastApiRedisCache,
+    key: str,
+    lookup: Callable[[], tuple[int, dict[str, Any]]],
+    call: HedgedCall | None = None,
+) -> tuple[int, dict[str, Any]] | None:
+    """Return the TTL and cache entry for `key` from `lookup`, within budget.
+
+    Without a `read_timeout` the entry is read directly. Otherwise it is read
+    in a worker thread, which is abandoned if it takes longer than the budget
+    (or fails), returning None. If `hedge_after` is set and the read takes
+    longer than that, `call` (if given) is started while it is still pending.
+    """
+    if redis_cache.read_timeout is None:
+        return lookup()
+    read = asyncio.get_running_loop().run_in_executor(None, lookup)
+    timeout = redis_cache.read_timeout
+    hedge_after = redis_cache.hedge_after
+    try:
+        if call and hedge_after is not None and hedge_after < timeout:
+            done, _ = await asyncio.wait({read}, timeout=hedge_after)
+            if not done:
+                redis_cache.hedged_reads += 1
+                call.start()
+                timeout -= hedge_after
+        return await asyncio.wait_for(read, timeout)
+    except asyncio.TimeoutError:
+        redis_cache.read_timeouts += 1
+        redis_cache.log(RedisEvent.READ_TIMED_OUT, key=key)
+    except Exception as ex:  # noqa: BLE001
+        redis_cache.read_errors += 1
+        redis_cache.log(RedisEvent.READ_FAILED, msg=repr(ex), key=key)
+    return None
+
+
+def json_response(  # noqa: PLR0913
+    redis_cache: FastApiRedisCache,
+    response: Response,
+    response_data: Any,  # noqa: ANN401
+    ttl: int,
+    *,
+    codec: Codec,
+    entry: dict[str, Any],
+    create_response_directly: bool,
+) -> Any:  # noqa: ANN401
+    """Return the response for data that has just been added to the cache.
+
+    The headers and body are taken from the cache `entry`, so the data is only
+    serialized once.
+    """
+    redis_cache.set_response_headers(
+        response,
+        cache_hit=False,
+        ttl=ttl,
+        etag=entry[ENTRY_ETAG],
+        last_modified=entry.get(ENTRY_LAST_MODIFIED),
+    )
+    return (
+        Response(
+            content=codec.to_json(entry[ENTRY_DATA]),
+            media_type=JSON_MEDIA_TYPE,
+            headers=response.headers,
+        )
+        if create_response_directly
+        else response_data
+    )
+
+
+def cached_response(  # noqa: PLR0913
+    redis_cache: FastApiRedisCache,
+    request: Request | None,
+    response: Response,
+    ttl: int,
+    entry: dict[str, Any],
+    *,
+    codec: Codec,
+    create_response_directly: bool,
+    stream_chunk_size: int | None = None,
+) -> Any:  # noqa: ANN401
+    """Return the response for a cache hit.
+
+    A `304 Not Modified` or `HEAD` response is built from the entry metadata
+    alone, otherwise `entry` must also contain the cached response data.
+    Raw responses, and data stored by a `SchemaCodec`, are always sent as a
+    new `Response` object. Cached errors are raised again as an
+    `HTTPException`.
+    """
+    error_status = get_error_status(entry)
+    if error_status is not None:
+        raise HTTPException(
+            error_status,
+            detail=redis_cache.codec.loads(entry[ENTRY_DATA]),
+            headers={redis_cache.response_header: "Hit"},
+        )
+    raw_headers = entry.get(ENTRY_HEADERS)
+    if raw_headers or isinstance(codec, SchemaCodec):
+        create_response_directly = True
+    etag = entry.get(ENTRY_ETAG)
+    last_modified = entry.get(ENTRY_LAST_MODIFIED)
+    redis_cache.set_response_headers(
+        response,
+        cache_hit=True,
+        ttl=ttl,
+        etag=etag,
+        last_modified=last_modified,
+    )
+    if redis_cache.resource_not_modified(request, etag, last_modified):
+        return empty_response(
+            response,
+            HTTPStatus.NOT_MODIFIED,
+            create_response_directly=create_response_directly,
+        )
+    if request and request.method == "HEAD":
+        return empty_response(
+            response,
+            HTTPStatus.OK,
+            create_response_directly=create_response_directly,
+            raw_headers=raw_headers,
+        )
+    if raw_headers:
+        return replay_raw_response(entry, response.headers, stream_chunk_size)
+    in_cache = entry[ENTRY_DATA]
+    return (
+        Response(
+            content=codec.to_json(in_cache),
+            media_type=JSON_MEDIA_TYPE,
+            headers=response.headers,
+        )
+        if create_response_directly
+        else codec.loads(in_cache)
+    )
+
+
+async def paginated_response(  # noqa: PLR0913
+    redis_cache: FastApiRedisCache,
+    request: Request | None,
+    response: Response,
+    key: str,
+    page: tuple[int, int],
+    *,
+    paginate: Pagination,
+    codec: Codec,
+    compute: Callable[[], Awaitable[tuple[Any, float]]],
+    get_entry_ttl: Callable[..., int],
+    negative_ttl: int | None,
+    tag: str | None,
+    early_refresh: float | None,
+    create_response_directly: bool,
+) -> Any:  # noqa: ANN401
+    """Return the items from `page[0]` to `page[1]` of a paginated list.
+
+    Only the chunks holding the page are fetched. On a cache miss the full
+    list is computed and cached, unless it isn't a list or tuple. The `ETag`
+    of the response is that of the page, and `X-Total-Count` is the number of
+    items in the full list.
+    """
+    start, stop = page
+    fields = [
+        ENTRY_COUNT,
+        ENTRY_DATA,
+        ENTRY_DELTA,
+        ENTRY_NEGATIVE,
+        *paginate.get_chunk_fields(start, stop),
+    ]
+    call = HedgedCall(compute)
+    read = await read_entry(
+        redis_cache, key, partial(redis_cache.fetch_entry, key, fields), call
+    )
+    if read is None:
+        # the read went over budget, or failed.
+        response_data, _ = await call.result()
+        return (
+            response_data[start:stop]
+            if isinstance(response_data, (list, tuple))
+            else response_data
+        )
+    ttl, entry = read
+    if get_error_status(entry) is not None:
+        call.cancel()
+        return cached_response(
+            redis_cache,
+            request,
+            response,
+            ttl,
+            entry,
+            codec=codec,
+            create_response_directly=create_response_directly,
+        )
+    cache_hit = ENTRY_COUNT in entry and not refresh_early(
+        ttl, entry, early_refresh
+    )
+    if cache_hit:
+        call.cancel()
+        items = paginate.get_items(entry, start, stop, codec)
+    else:
+        response_data, delta = await call.result()
+        if not isinstance(response_data, (list, tuple)):
+            return response_data
+        negative = bool(negative_ttl) and not response_data
+        ttl = get_entry_ttl(negative=negative)
+        entry = build_paginated_entry(
+            redis_cache,
+            key,
+            response_data,
+            paginate,
+            codec,
+            delta=delta,
+            negative=negative,
+        )
+        if not entry or not redis_cache.store_entry(key, entry, ttl, tag):
+            return response_data[start:stop]
+        items = list(response_data[start:stop])
+    return page_response(
+        redis_cache,
+        request,
+        response,
+        items,
+        ttl=ttl,
+        count=entry[ENTRY_COUNT],
+        cache_hit=cache_hit,
+        paginate=paginate,
+        codec=codec,
+        create_response_directly=create_response_directly,
+    )
+
+
+def page_response(  # noqa: PLR0913
+    redis_cache: FastApiRedisCache,
+    request: Request | None,
+    response: Response,
+    items: list[Any],
+    *,
+    ttl: int,
+    count: Union[str, int],
+    cache_hit: bool,
+    paginate: Pagination,
+    codec: Codec,
+    create_response_directly: bool,
+) -> Any:  # noqa: ANN401
+    """Return the response for the `items` of a page of `count` items.
+
+    Revalidations of the page and HEAD requests get an empty response.
+    """
+    body = codec.to_json(to_bytes(codec.dumps(items)))
+    redis_cache.set_response_headers(
+        response,
+        cache_hit=cache_hit,
+        ttl=ttl,
+        etag=paginate.get_etag(body),
+    )
+    response.headers["X-Total-Count"] = str(count)
+    if redis_cache.resource_not_modified(request, response.headers["ETag"]):
+        return empty_response(
+            response,
+            HTTPStatus.NOT_MODIFIED,
+            create_response_directly=create_response_directly,
+        )
+    if request and request.method == "HEAD":
+        return empty_response(
+            response,
+            HTTPStatus.OK,
+            create_response_directly=create_response_directly,
+        )
+    return (
+        Response(
+            content=body, media_type=JSON_MEDIA_TYPE, headers=response.headers
+        )
+        if create_response_directly or isinstance(codec, SchemaCodec)
+        else items
+    )
+
+
+def build_paginated_entry(  # noqa: PLR0913
+    redis_cache: FastApiRedisCache,
+    key: str,
+    items: Union[list[Any], tuple[Any, ...]],
+    paginate: Pagination,
+    codec: Codec,
+    *,
+    delta: float,
+    negative: bool,
+) -> dict[str, Union[str, bytes]]:
+    """Return the cache entry for the full list of a paginated function.
+
+    An empty entry is returned (and the failure logged) if the items can't be
+    serialized. `negative` marks an empty list as a negative entry.
+    """
+    try:
+        entry = paginate.build_entry(items, codec)
+    except TypeError:
+        message = f"Items of {type(items)} are not JSON-serializable"
+        redis_cache.log(RedisEvent.FAILED_TO_CACHE_KEY, msg=message, key=key)
+        return {}
+    entry[ENTRY_DELTA] = format_delta(delta)
+    if negative:
+        entry[ENTRY_NEGATIVE] = str(int(HTTPStatus.OK))
+    return entry
+
+
+def get_error_status(entry: dict[str, Any]) -> int | None:
+    """Return the status code if `entry` is a cached error, otherwise None."""
+    status = int(entry.get(ENTRY_NEGATIVE, HTTPStatus.OK))
+    return None if status == HTTPStatus.OK else status
+
+
+def is_empty_result(response_data: Any) -> bool:  # noqa: ANN401
+    """Return True if a path function returned nothing (or an empty value)."""
+    return response_data is None or (
+        isinstance(response_data, (str, list, tuple, dict))
+        and not response_data
+    )
+
+
+async def call_path_function(
+    func: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    *,
+    on_error: Callable[[HTTPException], None],
+) -> tuple[Any, float]:
+    """Call `func`, returning its result and the seconds it took to compute.
+
+    If `func` raises an `HTTPException` it is passed to `on_error` before
+    being raised again.
+    """
+    started = time.perf_counter()
+    try:
+        response_data = await get_api_response_async(func, *args, **kwargs)
+    except HTTPException as ex:
+        on_error(ex)
+        raise
+    return (response_data, time.perf_counter() - started)
+
+
+def cache_http_exception(  # noqa: PLR0913
+    redis_cache: FastApiRedisCache,
+    key: str,
+    ttl: int | None,
+    tag: str | None,
+    status_codes: Collection[int],
+    ex: HTTPException,
+) -> None:
+    """Cache the error raised by a path function as a negative entry.
+
+    Nothing is cached unless negative caching is enabled (`ttl` is set) and
+    the status code is one of `status_codes`. Only the status code and detail
+    are cached, not the exception headers.
+    """
+    if not ttl or ex.status_code not in status_codes:
+        return
+    redis_cache.add_to_cache(
+        key, ex.detail, ttl, tag, negative_status=ex.status_code
+    )
+    ex.headers = {**(ex.headers or {}), redis_cache.response_header: "Miss"}
+
+
+def empty_response(
+    response: Response,
+    status_code: HTTPStatus,
+    *,
+    create_response_directly: bool,
+    raw_headers: str | None = None,
+) -> Response:
+    """Return a response without a body, for `304` and `HEAD` responses.
+
+    `raw_headers` are the stored headers of a cached raw response, which are
+    included so a `HEAD` response reports the right content type.
+    """
+    response.status_code = int(status_code)
+    headers = dict(response.headers)
+    if raw_headers:
+        headers = {**json.loads(raw_headers), **headers}
+    return (
+        Response(
+            content=None,
+            status_code=response.status_code,
+            media_type=None if raw_headers else JSON_MEDIA_TYPE,
+            headers=headers,
+        )
+        if create_response_directly
+        else response
+    )
+
+
 async def get_api_response_async(
     func: Callable[..., Any],
     *args: Any,  # noqa: ANN401
@@ -140,14 +949,62 @@ async def get_api_response_async(
     )
 
 
-def calculate_ttl(expire: Union[int, timedelta]) -> int:
+def get_ttl(  # noqa: PLR0913
+    redis_cache: FastApiRedisCache,
+    key: str,
+    expire: Union[int, timedelta, None],
+    *,
+    jitter: float,
+    negative_ttl: int | None,
+    negative: bool,
+) -> int:
+    """Return the TTL to cache a response with.
+
+    Negative entries use `negative_ttl` if it is set. Otherwise the TTL is
+    `expire` (or the default of the cache instance) with `jitter` applied,
+    adapted to the popularity of `key`.
+    """
+    if negative_ttl and negative:
+        return negative_ttl
+    return redis_cache.adapt_ttl(
+        key,
+        calculate_ttl(
+            redis_cache.default_expire if expire is None else expire, jitter
+        ),
+    )
+
+
+def calculate_ttl(expire: Union[int, timedelta], jitter: float = 0) -> int:
     """Converts expire time to total seconds.
 
-    Also ensures ttl is capped at one year.
+    Also ensures ttl is capped at one year. If `jitter` is set, the ttl is
+    randomly reduced by up to that fraction of its value.
     """
     if isinstance(expire, timedelta):
         expire = int(expire.total_seconds())
-    return min(expire, ONE_YEAR_IN_SECONDS)
+    ttl = min(expire, ONE_YEAR_IN_SECONDS)
+    if jitter:
+        # not used for security, so the standard generator is fine.
+        ttl -= int(ttl * random.uniform(0, jitter))  # noqa: S311
+    return ttl
+
+
+def refresh_early(ttl: int, entry: dict[str, Any], beta: float | None) -> bool:
+    """Return True if a cached entry should be recomputed before it expires.
+
+    Implements XFetch ("Optimal Probabilistic Cache Stampede Prevention",
+    Vattani et al.): the entry is refreshed if `delta * beta * -log(rand())`
+    is at least the remaining `ttl`, where `delta` is the number of seconds
+    the entry took to compute. The closer the entry is to expiring, and the
+    slower it is to compute, the more likely one request refreshes it early,
+    which avoids every request recomputing it at once after it expires.
+    """
+    if not beta or ttl < 0 or ENTRY_DELTA not in entry:
+        return False
+    delta = float(entry[ENTRY_DELTA])
+    # 1 - random() is never 0, so its log is always defined.
+    rand = 1 - random.random()  # noqa: S311
+    return delta * beta * -math.log(rand) >= ttl
 
 
 cache_one_minute = partial(cache, expire=60)
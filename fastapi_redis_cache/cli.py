@@ -0,0 +1,203 @@
+"""Command line interface for managing the cache.
+
+Run `fastapi-redis-cache --help` (or `python -m fastapi_redis_cache.cli
+--help`) for the available commands.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import os
+import sys
+from typing import TYPE_CHECKING, Any
+
+from fastapi_redis_cache.analytics import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_KEYS_PER_SECOND,
+    DEFAULT_TOP,
+    MemoryReport,
+)
+from fastapi_redis_cache.client import FastApiRedisCache
+from fastapi_redis_cache.warm import DEFAULT_WARM_CONCURRENCY, warm_cache
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable, Sequence
+
+DEFAULT_REDIS_URL = "redis://127.0.0.1:6379"
+
+
+def load_object(path: str) -> Any:  # noqa: ANN401
+    """Import and return the object at `path`, given as `module:attribute`."""
+    module_name, _, attribute = path.partition(":")
+    if not attribute:
+        msg = f"expected 'module:attribute', got {path!r}"
+        raise argparse.ArgumentTypeError(msg)
+    obj: Any = importlib.import_module(module_name)
+    for name in attribute.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def connect(args: argparse.Namespace) -> FastApiRedisCache:
+    """Return the cache, connecting to Redis unless it is already connected.
+
+    Modules loaded by a command may call `FastApiRedisCache.init` themselves,
+    to use the same options (such as `ignore_arg_types`) as the application.
+    """
+    redis_cache = FastApiRedisCache()
+    if redis_cache.not_connected:
+        redis_cache.init(host_url=args.host_url, prefix=args.prefix)
+    return redis_cache
+
+
+async def get_warm_targets(path: str) -> Any:  # noqa: ANN401
+    """Return the warm targets at `path`, calling it if it is a function."""
+    targets = load_object(path)
+    if callable(targets):
+        targets = targets()
+        if inspect.isawaitable(targets):
+            targets = await targets
+    return targets
+
+
+def warm(args: argparse.Namespace) -> int:
+    """Warm the cache using the `WarmTarget` list given in `args.targets`."""
+
+    async def run() -> int:
+        targets = list(await get_warm_targets(args.targets))
+        if connect(args).not_connected:
+            print("Unable to connect to Redis.", file=sys.stderr)  # noqa: T201
+            return 1
+        warmed = await warm_cache(targets, concurrency=args.concurrency)
+        print(f"Warmed {warmed} of {len(targets)} targets.")  # noqa: T201
+        return 0 if warmed == len(targets) else 1
+
+    return asyncio.run(run())
+
+
+def report(args: argparse.Namespace) -> int:
+    """Print how much memory the entries of each endpoint and tag use."""
+    redis_cache = connect(args)
+    if redis_cache.not_connected:
+        print("Unable to connect to Redis.", file=sys.stderr)  # noqa: T201
+        return 1
+    memory_report = redis_cache.memory_report(
+        batch_size=args.batch_size,
+        max_keys_per_second=args.rate or None,
+        sample_rate=args.sample_rate,
+        top=args.top,
+    )
+    if args.json:
+        print(json.dumps(memory_report.to_dict(), indent=2))  # noqa: T201
+    else:
+        print(format_report(memory_report))  # noqa: T201
+    return 0
+
+
+def format_report(memory_report: MemoryReport) -> str:
+    """Return the report as a table, using the most memory first."""
+    lines = [
+        f"{'keys':>8} {'total':>10} {'p50':>8} {'p99':>8} {'max':>8} "
+        f"{'ttl p50':>8}  endpoint [tag]"
+    ]
+    for group in memory_report.sorted_groups():
+        details = group.to_dict()
+        size, ttl = details["size"], details["ttl"]
+        tag = f" [{group.tag}]" if group.tag else ""
+        lines.append(
+            f"{group.keys:>8} {group.total_size:>10} {size.get('p50', '-'):>8} "
+            f"{size.get('p99', '-'):>8} {size.get('max', '-'):>8} "
+            f"{ttl.get('p50', '-'):>8}  {group.name}{tag}"
+        )
+        lines.extend(
+            f"{'':>9}{entry['size']:>10}  {entry['key']}"
+            for entry in details["largest"]
+        )
+    lines.append(
+        f"Scanned {memory_report.scanned} keys ({memory_report.sampled} "
+        f"sampled), about {memory_report.total_size} bytes in total."
+    )
+    return "\n".join(lines)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog="fastapi-redis-cache",
+        description="Manage the FastAPI Redis cache.",
+    )
+    parser.add_argument(
+        "--host-url",
+        default=os.environ.get("REDIS_URL", DEFAULT_REDIS_URL),
+        help="URL of the Redis server (default: $REDIS_URL or %(default)s)",
+    )
+    parser.add_argument(
+        "--prefix", default="", help="prefix used for the cache keys"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    warm_parser = commands.add_parser(
+        "warm", help="pre-populate the cache for a list of routes"
+    )
+    warm_parser.add_argument(
+        "targets",
+        help="a list of WarmTarget objects (or a function returning one), "
+        "given as 'module:attribute'",
+    )
+    warm_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_WARM_CONCURRENCY,
+        help="the most targets to warm at once (default: %(default)s)",
+    )
+    warm_parser.set_defaults(handler=warm)
+
+    report_parser = commands.add_parser(
+        "report", help="report the memory used by each endpoint and tag"
+    )
+    report_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="the number of keys to scan at once (default: %(default)s)",
+    )
+    report_parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_KEYS_PER_SECOND,
+        help="the most keys to scan each second, or 0 for no limit "
+        "(default: %(default)s)",
+    )
+    report_parser.add_argument(
+        "--sample-rate",
+        type=float,
+        default=1.0,
+        help="the fraction of the keys to inspect (default: %(default)s)",
+    )
+    report_parser.add_argument(
+        "--top",
+        type=int,
+        default=DEFAULT_TOP,
+        help="the number of largest entries to list for each endpoint "
+        "(default: %(default)s)",
+    )
+    report_parser.add_argument(
+        "--json", action="store_true", help="print the report as JSON"
+    )
+    report_parser.set_defaults(handler=report)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the command line interface, returning the exit status."""
+    args = get_parser().parse_args(argv)
+    handler: Callable[[argparse.Namespace], int] = args.handler
+    return handler(args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -13,23 +17,77 @@ from typing import (
     Union,
 )
 
-import tzlocal
+from anyio import to_thread
 
+from fastapi_redis_cache.analytics import (
+    MemoryReport,
+    scan_memory,
+    scan_memory_async,
+)
+from fastapi_redis_cache.backends.redis import RedisBackend
+from fastapi_redis_cache.codec import JsonCodec
 from fastapi_redis_cache.enums import RedisEvent, RedisStatus
-from fastapi_redis_cache.key_gen import get_cache_key
+from fastapi_redis_cache.key_gen import (
+    build_cache_key,
+    get_request_cache_key,
+)
 from fastapi_redis_cache.redis import redis_connect
-from fastapi_redis_cache.util import serialize_json
+from fastapi_redis_cache.util import ONE_YEAR_IN_SECONDS, serialize_json
 
 if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import (
+        AsyncIterator,
+        Collection,
+        Iterator,
+        Mapping,
+        Sequence,
+    )
+
     from fastapi import Request, Response
     from redis import client
+    from starlette.datastructures import MutableHeaders
+
+    from fastapi_redis_cache.backends import Backend
+    from fastapi_redis_cache.codec import Codec
+    from fastapi_redis_cache.host_cache import HostCache
+    from fastapi_redis_cache.hot_keys import HotKeyTracker
+    from fastapi_redis_cache.key_gen import KeyArgs, KeyBuilder
 
 DEFAULT_RESPONSE_HEADER = "X-FastAPI-Cache"
-ALLOWED_HTTP_TYPES = ["GET"]
+DEFAULT_INSTANCE = "default"
+KEY_DEBUG_HASH = "__keys__"
+NEGATIVE_KEY_SET = "__negative__"
+ALLOWED_HTTP_TYPES = ["GET", "HEAD"]
+CONDITIONAL_HEADERS = ["If-None-Match", "If-Modified-Since"]
 LOG_TIMESTAMP = "%m/%d/%Y %H:%M:%S %Z"
 HTTP_TIME = "%a, %d %b %Y %H:%M:%S GMT"
+# response headers that are never stored with a raw cached response.
+UNCACHED_HEADERS = ["content-length", "set-cookie", "expires", "cache-control"]
+
+# each cache entry is stored as a Redis hash with these fields, so the small
+# metadata fields can be fetched without transferring the whole response body.
+ENTRY_DATA = "data"
+ENTRY_ETAG = "etag"
+ENTRY_LAST_MODIFIED = "last_modified"
+# only set for responses cached as raw bytes rather than JSON.
+ENTRY_HEADERS = "headers"
+# the number of seconds it took to compute the response.
+ENTRY_DELTA = "delta"
+# only set for negative entries (errors and empty results), holds the status.
+ENTRY_NEGATIVE = "negative"
+ENTRY_METADATA_FIELDS = [
+    ENTRY_ETAG,
+    ENTRY_LAST_MODIFIED,
+    ENTRY_HEADERS,
+    ENTRY_DELTA,
+    ENTRY_NEGATIVE,
+]
+ENTRY_FIELDS = [ENTRY_DATA, *ENTRY_METADATA_FIELDS]
+# paginated results are stored in chunks instead of `data`, in the fields
+# `chunk:0`, `chunk:1`, etc., with the number of items in `count`.
+ENTRY_COUNT = "count"
+ENTRY_CHUNK_PREFIX = "chunk:"
 
-logging.basicConfig()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
@@ -37,52 +95,92 @@ logger.setLevel(logging.INFO)
 class MetaSingleton(type):
     """Metaclass for creating singleton classes.
 
-    These are classes that allow only a single instance to be created.
+    These are classes that allow only a single instance to be created for each
+    name.
     (seapagan): Not happy about my type-hinting here, will re-visit later.
     """
 
-    _instances: ClassVar[dict[type[Any], Any]] = {}
+    _instances: ClassVar[dict[tuple[type[Any], str], Any]] = {}
 
-    def __call__(cls, *args: Any, **kwargs: Any) -> Any:
-        """Return the instance of the class.
+    def __call__(cls, name: str = DEFAULT_INSTANCE) -> Any:
+        """Return the instance of the class called `name`.
 
         if it already exists then return that,otherwise create it and return.
         """
-        if cls not in cls._instances:
-            cls._instances[cls] = super().__call__(*args, **kwargs)
-        return cls._instances[cls]
+        key = (cls, name)
+        if key not in cls._instances:
+            cls._instances[key] = super().__call__(name)
+        return cls._instances[key]
 
 
 class FastApiRedisCache(metaclass=MetaSingleton):
-    """Communicates with Redis server to cache API response data."""
+    """Communicates with Redis server to cache API response data.
+
+    `FastApiRedisCache()` always returns the same (default) instance. Other
+    independent instances, each with their own connection and settings, are
+    created by name, e.g. `FastApiRedisCache("analytics")`.
+    """
 
     host_url: str
     prefix: str = ""
     response_header: str = ""
     status: RedisStatus = RedisStatus.NONE
     redis: client.Redis | None = None  # type: ignore
+    backend: Backend | None = None
+    use_scripts: bool = False
+    hash_keys: bool = False
+    key_debug: bool = False
+    hot_keys: HotKeyTracker | None = None
+    host_cache: HostCache | None = None
+    connecting: asyncio.Task[None] | None = None
+    codec: Codec = JsonCodec()
+    default_expire: Union[int, timedelta] = ONE_YEAR_IN_SECONDS
+    read_timeout: float | None = None
+    hedge_after: float | None = None
+    # reads abandoned for going over `read_timeout`, reads that failed, and
+    # reads slow enough for the path function to be started in parallel.
+    read_timeouts: int = 0
+    read_errors: int = 0
+    hedged_reads: int = 0
+
+    def __init__(self, name: str = DEFAULT_INSTANCE) -> None:
+        """Create the cache instance called `name`, call `init` to connect."""
+        self.name = name
 
     @property
     def connected(self) -> bool:
-        """Return True if the Redis client is connected to a server."""
+        """Return True if the storage backend is connected."""
         return self.status == RedisStatus.CONNECTED
 
     @property
     def not_connected(self) -> bool:
-        """Return True if the Redis client is not connected to a server."""
+        """Return True if the storage backend is not connected."""
         return not self.connected
 
-    def init(
+    def init(  # noqa: PLR0913
         self,
         host_url: str,
         prefix: str = "",
         response_header: Optional[str] = None,
         ignore_arg_types: Optional[list[type[object]]] = None,
+        *,
+        use_scripts: bool = False,
+        hash_keys: bool = False,
+        key_debug: bool = False,
+        hot_keys: HotKeyTracker | None = None,
+        codec: Codec | None = None,
+        default_expire: Union[int, timedelta] = ONE_YEAR_IN_SECONDS,
+        backend: Backend | None = None,
+        host_cache: HostCache | None = None,
+        connect: bool = True,
+        read_timeout: float | None = None,
+        hedge_after: float | None = None,
     ) -> None:
         """Connect to a Redis database using `host_url` and configure cache.
 
         Args:
-            host_url (str): URL for a Redis database.
+            host_url (str): URL for a Redis database. Ignored if `backend` is
+                given.
             prefix (str, optional): Prefix to add to every cache key stored in
                 the Redis database. Defaults to None.
             response_header (str, optional): Name of the custom header field
@@ -93,24 +191,126 @@ class FastApiRedisCache(metaclass=MetaSingleton):
                 (such as a `Request` or `Response` object), including their type
                 in this list will ignore those arguments when the key is
                 created. Defaults to None.
+            use_scripts (bool, optional): Use server-side Lua scripts (run with
+                `EVALSHA`) to read and write cache entries, so each operation
+                is a single round trip to Redis. Defaults to False, in which
+                case pipelines are used instead.
+            hash_keys (bool, optional): Replace the argument values in each
+                cache key with a fixed-length digest, keeping the prefix,
+                function name and tag readable. Defaults to False.
+            key_debug (bool, optional): When `hash_keys` is set, also record
+                the readable version of each key so it can be found with
+                `lookup_key`. This costs an extra write per request, so is only
+                intended for debugging. Defaults to False.
+            hot_keys (HotKeyTracker, optional): Track how often each key is
+                looked up in this process, to report the most requested keys,
+                pin their entries in memory and adapt TTLs to their
+                popularity. Defaults to None.
+            codec (Codec, optional): Converts JSON response data to and from
+                the form stored in Redis. Defaults to `JsonCodec()`.
+            default_expire (Union[int, timedelta], optional): How long
+                responses are cached by `cache` decorators that don't set
+                `expire`. Defaults to one year.
+            backend (Backend, optional): Store cache entries somewhere other
+                than Redis, such as a `MemoryBackend` or `SQLiteBackend`.
+                Defaults to None, which connects to Redis at `host_url`.
+            host_cache (HostCache, optional): Share entries read from (or
+                written to) the backend with the other processes on this host,
+                checking it before the backend. Defaults to None.
+            connect (bool, optional): Connect straight away. If False, call
+                `connect` later, until then responses are not cached. Defaults
+                to True.
+            read_timeout (float, optional): The most seconds the `cache`
+                decorator (or `CacheMiddleware`) waits for a cached response.
+                Slower reads (and reads
+                that fail) are abandoned, and the path function is called
+                instead, without caching its response. Defaults to None, which
+                waits for every read.
+            hedge_after (float, optional): With `read_timeout`, the seconds
+                after which the path function is started while a read is still
+                pending. Its result is used if the read misses or is abandoned.
+                Defaults to None, which only calls it once the read is done.
         """
         self.host_url = host_url
         self.prefix = prefix
         self.response_header = response_header or DEFAULT_RESPONSE_HEADER
         self.ignore_arg_types = ignore_arg_types or []
-        self._connect()
+        self.use_scripts = use_scripts
+        self.hash_keys = hash_keys
+        self.key_debug = key_debug
+        self.hot_keys = hot_keys
+        self.codec = codec or JsonCodec()
+        self.default_expire = default_expire
+        self.host_cache = host_cache
+        self.read_timeout = read_timeout
+        self.hedge_after = hedge_after
+        self.read_timeouts = self.read_errors = self.hedged_reads = 0
+        self.status = RedisStatus.NONE
+        self.redis = self.backend = None
+        if connect:
+            self.connect(backend)
+
+    async def init_async(
+        self,
+        host_url: str,
+        **options: Any,
+    ) -> asyncio.Task[None]:
+        """Configure the cache like `init`, connecting in the background.
+
+        This returns straight away, so the application can start serving
+        requests while the connection is made in a worker thread. Until it is
+        ready responses are not cached, the path functions are just called.
+        Call this from a lifespan handler, `options` are the other arguments
+        of `init`.
+
+        Returns:
+            `asyncio.Task`: The connection attempt, await it to wait until the
+                cache is ready.
+        """
+        backend = options.pop("backend", None)
+        self.init(host_url, **options, connect=False)
+        self.connecting = asyncio.create_task(
+            to_thread.run_sync(self.connect, backend)
+        )
+        return self.connecting
+
+    def connect(self, backend: Backend | None = None) -> None:
+        """Connect to Redis at `host_url`, or start using `backend`.
+
+        The status is only set once the backend is ready, so this can run in
+        another thread while requests are handled.
+        """
+        if backend:
+            self._use_backend(backend)
+        else:
+            self._connect()
+
+    def _use_backend(self, backend: Backend) -> None:
+        """Store cache entries using `backend` instead of Redis."""
+        name = type(backend).__name__
+        if backend.ping():
+            self.backend = backend
+            self.status = RedisStatus.CONNECTED
+            self.log(RedisEvent.CONNECT_SUCCESS, msg=f"Using {name}.")
+        else:  # pragma: no cover
+            self.status = RedisStatus.CONN_ERROR
+            self.log(RedisEvent.CONNECT_FAIL, msg=f"{name} is unavailable.")
 
     def _connect(self) -> None:
         self.log(
             RedisEvent.CONNECT_BEGIN,
             msg="Attempting to connect to Redis server...",
         )
-        self.status, self.redis = redis_connect(self.host_url)
-        if self.status == RedisStatus.CONNECTED:
+        status, self.redis = redis_connect(self.host_url)
+        if status == RedisStatus.CONNECTED and self.redis:
             self.log(
                 RedisEvent.CONNECT_SUCCESS,
                 msg="Redis client is connected to server.",
             )
+            self.backend = RedisBackend(
+                self.redis, use_scripts=self.use_scripts
+            )
+        self.status = status
         if self.status == RedisStatus.AUTH_ERROR:  # pragma: no cover
             self.log(
                 RedisEvent.CONNECT_FAIL,
@@ -125,10 +325,16 @@ class FastApiRedisCache(metaclass=MetaSingleton):
                 msg="Redis server did not respond to PING message.",
             )
 
-    def request_is_not_cacheable(self, request: Request) -> bool:
-        """Return True if the request is not cacheable."""
+    def request_is_not_cacheable(
+        self, request: Request, methods: Collection[str] = ALLOWED_HTTP_TYPES
+    ) -> bool:
+        """Return True if the request is not cacheable.
+
+        Only requests using one of the HTTP `methods` are cacheable, by default
+        `GET` and `HEAD`.
+        """
         return bool(request) and (
-            request.method not in ALLOWED_HTTP_TYPES
+            request.method not in methods
             or any(
                 directive in request.headers.get("Cache-Control", "")
                 for directive in ["no-store", "no-cache"]
@@ -143,9 +349,145 @@ class FastApiRedisCache(metaclass=MetaSingleton):
         **kwargs: Any,
     ) -> str:
         """Return a key to use for caching the response of a function."""
-        return get_cache_key(
-            self.prefix, tag, self.ignore_arg_types, func, *args, **kwargs
+        return self.build_cache_key(tag, func, args, kwargs)
+
+    def build_cache_key(  # noqa: PLR0913
+        self,
+        tag: str | None,
+        func: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        *,
+        vary_headers: Mapping[str, str] | None = None,
+        unordered_args: Collection[str] = (),
+        key_builder: KeyBuilder | None = None,
+        key_args: KeyArgs | None = None,
+        body_digest: str | None = None,
+    ) -> str:
+        """Return a cache key, including any `vary_headers` in the key.
+
+        `unordered_args` are the names of list arguments whose order does not
+        affect the response. `key_builder` and `key_args` customize how the
+        arguments are added to the key, and `body_digest` is a digest of the
+        request body (see `key_gen.build_cache_key`).
+        """
+        key_parts = partial(
+            build_cache_key,
+            self.prefix,
+            tag,
+            self.ignore_arg_types,
+            func,
+            args,
+            kwargs,
+            vary_headers=vary_headers,
+            unordered_args=unordered_args,
+            key_builder=key_builder,
+            key_args=key_args,
+            body_digest=body_digest,
         )
+        return self._hash_key(key_parts)
+
+    def get_request_cache_key(
+        self, tag: str | None, request: Request, vary: list[str]
+    ) -> str:
+        """Return a key to use for caching the response to a request."""
+        return self._hash_key(
+            partial(get_request_cache_key, self.prefix, tag, request, vary)
+        )
+
+    def _hash_key(self, build_key: Callable[..., str]) -> str:
+        """Build a key using `build_key`, hashing it if `hash_keys` is set.
+
+        In `key_debug` mode the readable key is recorded against the hashed key.
+        """
+        if not self.hash_keys:
+            return build_key()
+        key = build_key(hash_args=True)
+        if self.key_debug and self.backend:
+            self.backend.update_entry(self.key_debug_name, {key: build_key()})
+        return key
+
+    @property
+    def key_debug_name(self) -> str:
+        """Return the name of the hash mapping hashed keys to readable keys."""
+        return (
+            f"{self.prefix}:{KEY_DEBUG_HASH}" if self.prefix else KEY_DEBUG_HASH
+        )
+
+    def adapt_ttl(self, key: str, ttl: int) -> int:
+        """Return the TTL to cache `key` with, adapted to its popularity."""
+        return self.hot_keys.adapt_ttl(key, ttl) if self.hot_keys else ttl
+
+    def negative_keys_name(self, tag: str | None = None) -> str:
+        """Return the name of the set of negative entry keys for `tag`.
+
+        Negative entries are not added to the tag set, so they are tracked
+        (and can be cleared) separately from the other cached responses.
+        """
+        name = (
+            f"{self.prefix}:{NEGATIVE_KEY_SET}"
+            if self.prefix
+            else NEGATIVE_KEY_SET
+        )
+        return f"{name}:{tag}" if tag else name
+
+    def clear_negative_entries(self, tag: str | None = None) -> int:
+        """Delete the negative entries cached with `tag` (or without a tag).
+
+        Returns:
+            `int`: The number of entries deleted.
+        """
+        if not self.backend:
+            return 0
+        name = self.negative_keys_name(tag)
+        self._forget_tagged_keys([name])
+        return self.backend.delete_tags([name])
+
+    def invalidate(
+        self, tags: Collection[str] = (), keys: Collection[str] = ()
+    ) -> int:
+        """Delete every entry cached with any of `tags`, and those for `keys`.
+
+        The negative entries cached with `tags` are deleted too. All the
+        deletes are batched together (for Redis, into two round trips).
+
+        Returns:
+            `int`: The number of entries deleted.
+        """
+        if not self.backend or not (tags or keys):
+            return 0
+        names = [*tags, *map(self.negative_keys_name, tags)]
+        self._forget_tagged_keys(names)
+        for key in keys:
+            self.forget_key(key)
+        deleted = self.backend.delete_tags(names, keys)
+        self.log(
+            RedisEvent.KEYS_INVALIDATED,
+            msg=f"{deleted} deleted, tags={list(tags)}, keys={list(keys)}",
+        )
+        return deleted
+
+    def _forget_tagged_keys(self, tags: Collection[str]) -> None:
+        """Remove the copies kept outside the backend of the keys in `tags`."""
+        if not self.hot_keys and not self.host_cache:
+            return
+        for tag in tags:
+            for key in self.get_tagged_keys(tag):
+                self.forget_key(key.decode())
+
+    def forget_key(self, key: str) -> None:
+        """Remove any copy of the entry for `key` kept outside the backend."""
+        if self.hot_keys:
+            self.hot_keys.unpin(key)
+        if self.host_cache:
+            self.host_cache.delete(key)
+
+    def lookup_key(self, key: str) -> str | None:
+        """Return the readable form of a hashed `key`, if it was recorded."""
+        if not self.backend:
+            return None
+        _, entry = self.backend.get_entry(self.key_debug_name, [key])
+        return entry[key].decode() if key in entry else None
 
     def add_key_to_tag_set(self, tag: str, key: str) -> None:
         """Add a key to a set of keys associated with a tag.
@@ -156,82 +498,369 @@ class FastApiRedisCache(metaclass=MetaSingleton):
         However, keys are not removed from the tag set when they expire so will
         need to handle possibly stale keys when invalidating.
         """
-        if self.redis:
-            self.redis.sadd(tag, key)
+        if self.backend:
+            self.backend.add_to_tag(tag, key)
 
-    def get_tagged_keys(self, tag: str) -> set[str]:
+    def get_tagged_keys(self, tag: str) -> set[bytes]:
         """Return a set of keys associated with a tag."""
-        return self.redis.smembers(tag) if self.redis else set()
+        return self.backend.get_tag(tag) if self.backend else set()
+
+    def scan_memory(self, **options: Any) -> Iterator[MemoryReport]:
+        """Scan the cached entries, yielding the memory report after each batch.
+
+        The scan can be stopped at any point, e.g. once enough keys have been
+        sampled. The `options` are those of `analytics.scan_memory`:
+        `batch_size`, `max_keys_per_second`, `sample_rate` and `top`.
+        """
+        if not self.backend:
+            return iter([MemoryReport()])
+        return scan_memory(self.backend, self.prefix, **options)
+
+    def memory_report(self, **options: Any) -> MemoryReport:
+        """Return how much memory the entries of each endpoint and tag use.
+
+        This scans every key under the prefix, at a limited rate (by default,
+        1000 keys per second) so it can be run against a busy server. The
+        `options` are those of `scan_memory`.
+        """
+        *_, report = self.scan_memory(**options)
+        return report
+
+    async def scan_memory_async(
+        self, **options: Any
+    ) -> AsyncIterator[MemoryReport]:
+        """Scan the cached entries as `scan_memory` does, without blocking.
+
+        Use this (or `memory_report_async`) in async code, such as an admin
+        route, so the scan doesn't block the event loop while it runs.
+        """
+        if not self.backend:
+            yield MemoryReport()
+            return
+        async for report in scan_memory_async(
+            self.backend, self.prefix, **options
+        ):
+            yield report
+
+    async def memory_report_async(self, **options: Any) -> MemoryReport:
+        """Return the report of `memory_report`, without blocking."""
+        report = MemoryReport()
+        async for report in self.scan_memory_async(**options):  # noqa: B007
+            pass
+        return report
+
+    def request_is_conditional(self, request: Request) -> bool:
+        """Return True if the request can be answered from metadata alone.
+
+        This is the case for `HEAD` requests and for requests carrying an
+        `If-None-Match` or `If-Modified-Since` header.
+        """
+        return bool(request) and (
+            request.method == "HEAD"
+            or any(header in request.headers for header in CONDITIONAL_HEADERS)
+        )
+
+    def fetch_entry(
+        self, key: str, fields: list[str] = ENTRY_FIELDS
+    ) -> tuple[int, dict[str, Any]]:
+        """Return the TTL and the requested `fields` of the entry for `key`.
+
+        The TTL and fields are fetched in a single round trip. Fields that are
+        missing are left out of the returned dictionary, so an empty dictionary
+        means the key is not in the cache. Metadata fields are decoded to
+        `str`, the response data is returned exactly as stored.
+
+        If hot key tracking is enabled the lookup is counted, and the entries
+        of hot keys are returned from process memory while they are pinned.
+        If there is a host cache it is checked before the backend.
+        """
+        if self.hot_keys:
+            self.hot_keys.record(key)
+            pinned = self.hot_keys.get_pinned(key)
+            if pinned:
+                self.log(RedisEvent.HOT_KEY_FOUND_IN_MEMORY, key=key)
+                return pinned
+
+        shared = self._read_host_cache(key, fields)
+        if shared:
+            self.log(RedisEvent.KEY_FOUND_IN_HOST_CACHE, key=key)
+            return shared
+
+        ttl, entry = self._read_entry(key, fields)
+        if ENTRY_DATA in entry or ENTRY_COUNT in entry:
+            self.log(
+                RedisEvent.NEGATIVE_KEY_FOUND_IN_CACHE
+                if ENTRY_NEGATIVE in entry
+                else RedisEvent.KEY_FOUND_IN_CACHE,
+                key=key,
+            )
+            if self.hot_keys and fields == ENTRY_FIELDS:
+                self.hot_keys.pin(key, ttl, entry)
+        return (ttl, entry)
+
+    def _read_entry(
+        self, key: str, fields: list[str]
+    ) -> tuple[int, dict[str, Any]]:
+        """Read the TTL and `fields` of the entry for `key` from the backend."""
+        if not self.backend:
+            return (0, {})
+        ttl, entry = self.backend.get_entry(key, fields)
+        if self.host_cache and fields == ENTRY_FIELDS and ENTRY_DATA in entry:
+            self.host_cache.set(key, entry, ttl)
+        return (ttl, decode_entry(entry))
+
+    def _read_host_cache(
+        self, key: str, fields: list[str]
+    ) -> tuple[int, dict[str, Any]] | None:
+        """Return the TTL and `fields` of the entry for `key` in the host cache.
+
+        The host cache holds whole entries, so metadata-only lookups (such as
+        conditional requests) can be answered from it too.
+        """
+        shared = self.host_cache.get(key) if self.host_cache else None
+        if not shared:
+            return None
+        ttl, entry = shared
+        return (
+            ttl,
+            decode_entry(
+                {field: entry[field] for field in fields if field in entry}
+            ),
+        )
+
+    def fetch_entries(
+        self, keys: Sequence[str], fields: list[str] = ENTRY_FIELDS
+    ) -> list[tuple[int, dict[str, Any]]]:
+        """Return the TTL and `fields` of each of the entries for `keys`.
+
+        The entries are fetched together (in a single round trip to Redis),
+        without counting them as hot key lookups.
+        """
+        if not self.backend:
+            return [(0, {}) for _ in keys]
+        return [
+            (ttl, decode_entry(entry))
+            for ttl, entry in self.backend.get_entries(keys, fields)
+        ]
 
     def check_cache(self, key: str) -> tuple[int, str]:
         """Check if `key` is in the cache and return its TTL and value."""
-        if not self.redis:
-            # This should not get here if self.redis is still None, but is added
-            # to satisfy mypy until I can refactor the code to fix this.
-            return (0, "")
+        ttl, entry = self.fetch_entry(key, [ENTRY_DATA])
+        return (ttl, entry.get(ENTRY_DATA, ""))
+
+    def resource_not_modified(
+        self,
+        request: Request | None,
+        etag: str | None,
+        last_modified: str | None = None,
+    ) -> bool:
+        """Return True if the cached resource matches the request validators.
 
-        pipe = self.redis.pipeline()
-        ttl, in_cache = pipe.ttl(key).get(key).execute()
-        if in_cache:
-            self.log(RedisEvent.KEY_FOUND_IN_CACHE, key=key)
-        return (ttl, in_cache)
+        `If-None-Match` takes precedence, `If-Modified-Since` is only checked
+        when it is missing (RFC 9110, section 13.2.2).
+        """
+        if not request:
+            return False
+        if "If-None-Match" in request.headers:
+            check_etags = [
+                etag.strip()
+                for etag in request.headers["If-None-Match"].split(",")
+                if etag
+            ]
+            if len(check_etags) == 1 and check_etags[0] == "*":
+                return True
+            return etag in check_etags
+        if last_modified and "If-Modified-Since" in request.headers:
+            modified_at = parse_http_date(last_modified)
+            since = parse_http_date(request.headers["If-Modified-Since"])
+            return bool(modified_at and since and modified_at <= since)
+        return False
 
     def requested_resource_not_modified(
         self, request: Request, cached_data: str
     ) -> bool:
         """Return True if the requested resource has not been modified."""
-        if not request or "If-None-Match" not in request.headers:
-            return False
-        check_etags = [
-            etag.strip()
-            for etag in request.headers["If-None-Match"].split(",")
-            if etag
-        ]
-        if len(check_etags) == 1 and check_etags[0] == "*":
-            return True
-        return self.get_etag(cached_data) in check_etags
-
-    def add_to_cache(self, key: str, value: Any, expire: int) -> bool:
-        """Add `value` to the cache using `key` and set an expiration time."""
-        # quick hack to satisfy mypy until I can refactor the code to fix this
-        if not self.redis:
-            return False
+        return self.resource_not_modified(request, self.get_etag(cached_data))
 
-        response_data = None
+    def add_to_cache(  # noqa: PLR0913
+        self,
+        key: str,
+        value: Any,
+        expire: int,
+        tag: str | None = None,
+        *,
+        delta: float | None = None,
+        negative_status: int | None = None,
+        codec: Codec | None = None,
+    ) -> bool:
+        """Add `value` to the cache using `key` and set an expiration time.
+
+        The serialized value is stored alongside its ETag and Last-Modified
+        metadata, and `delta` (the number of seconds it took to compute) if
+        provided. If `tag` is provided the key is also added to the tag set.
+
+        If `negative_status` is set, `value` is an error (or empty result)
+        with that status code. It is stored as a negative entry, which is
+        added to the negative keys set for `tag` instead of the tag set.
+        """
+        entry = self.build_entry(
+            key,
+            value,
+            delta=delta,
+            negative_status=negative_status,
+            codec=codec,
+        )
+        return bool(entry) and self.store_entry(key, entry, expire, tag)
+
+    def build_entry(  # noqa: PLR0913
+        self,
+        key: str,
+        value: Any,
+        *,
+        delta: float | None = None,
+        negative_status: int | None = None,
+        codec: Codec | None = None,
+    ) -> dict[str, Union[str, bytes]]:
+        """Return the cache entry for `value`, serialized using `codec`.
+
+        `codec` defaults to the codec of the cache instance. An empty entry is
+        returned (and the failure logged) if `value` can't be serialized.
+        """
         try:
-            response_data = serialize_json(value)
+            response_data = (codec or self.codec).dumps(value)
         except TypeError:
             message = f"Object of type {type(value)} is not JSON-serializable"
             self.log(RedisEvent.FAILED_TO_CACHE_KEY, msg=message, key=key)
+            return {}
+        entry: dict[str, Union[str, bytes]] = {
+            ENTRY_DATA: response_data,
+            ENTRY_ETAG: self.get_etag(response_data),
+        }
+        if isinstance(value, dict) and "last_modified" in value:
+            entry[ENTRY_LAST_MODIFIED] = format_http_date(
+                value["last_modified"]
+            )
+        if delta is not None:
+            entry[ENTRY_DELTA] = format_delta(delta)
+        if negative_status is not None:
+            entry[ENTRY_NEGATIVE] = str(negative_status)
+        return entry
+
+    def add_response_to_cache(  # noqa: PLR0913
+        self,
+        key: str,
+        body: bytes,
+        headers: Mapping[str, str],
+        expire: int,
+        tag: str | None = None,
+        *,
+        delta: float | None = None,
+    ) -> bool:
+        """Add a raw response `body` and its `headers` to the cache.
+
+        This is used for responses that are not JSON, such as HTML, files or
+        streamed content. The body is stored exactly as it was sent.
+        """
+        ignore_headers = [*UNCACHED_HEADERS, self.response_header.lower()]
+        stored_headers = {
+            name: value
+            for name, value in headers.items()
+            if name.lower() not in ignore_headers
+        }
+        entry: dict[str, Union[str, bytes]] = {
+            ENTRY_DATA: body,
+            ENTRY_ETAG: stored_headers.pop("etag", self.get_etag(body)),
+            ENTRY_HEADERS: json.dumps(stored_headers),
+        }
+        if "last-modified" in stored_headers:
+            entry[ENTRY_LAST_MODIFIED] = stored_headers["last-modified"]
+        if delta is not None:
+            entry[ENTRY_DELTA] = format_delta(delta)
+        return self.store_entry(key, entry, expire, tag)
+
+    def store_entry(
+        self,
+        key: str,
+        entry: Mapping[str, Union[str, bytes]],
+        expire: int,
+        tag: str | None = None,
+    ) -> bool:
+        """Replace the cache entry for `key` with the fields in `entry`.
+
+        Negative entries are added to the negative keys set for `tag`, instead
+        of the tag set.
+
+        The entry, expiry and tag membership are written atomically (for
+        Redis, in a single round trip).
+        """
+        if not self.backend:
             return False
-        cached = self.redis.set(name=key, value=response_data, ex=expire)
+        self.forget_key(key)
+        if ENTRY_NEGATIVE in entry:
+            tag = self.negative_keys_name(tag)
+
+        cached = self.backend.set_entry(key, entry, expire, tag)
         if not cached:
-            self.log(RedisEvent.FAILED_TO_CACHE_KEY, key=key, value=value)
+            self.log(RedisEvent.FAILED_TO_CACHE_KEY, key=key)
             return False
+        if self.host_cache:
+            self.host_cache.set(key, entry, expire)
 
-        self.log(RedisEvent.KEY_ADDED_TO_CACHE, key=key)
+        self.log(
+            RedisEvent.NEGATIVE_KEY_ADDED_TO_CACHE
+            if ENTRY_NEGATIVE in entry
+            else RedisEvent.KEY_ADDED_TO_CACHE,
+            key=key,
+        )
         return cached
 
-    def set_response_headers(
+    def set_response_headers(  # noqa: PLR0913
         self,
         response: Response,
         cache_hit: bool,  # noqa: FBT001
         response_data: dict[str, Any] | None = None,
         ttl: float | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Set headers for the response to indicate cache status and TTL.
+
+        The `ETag` and `Last-Modified` headers are taken from `etag` and
+        `last_modified` if given (i.e. from the stored metadata), otherwise
+        they are calculated from `response_data`.
+        """
+        if response_data and not etag:
+            etag = self.get_etag(response_data)
+            if "last_modified" in response_data:
+                last_modified = format_http_date(response_data["last_modified"])
+        self.set_cache_headers(
+            response.headers,
+            cache_hit=cache_hit,
+            ttl=ttl,
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    def set_cache_headers(  # noqa: PLR0913
+        self,
+        headers: MutableHeaders,
+        *,
+        cache_hit: bool,
+        ttl: float | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
     ) -> None:
-        """Set headers for the response to indicate cache status and TTL."""
-        response.headers[self.response_header] = "Hit" if cache_hit else "Miss"
+        """Set the cache status, TTL and validator headers in `headers`."""
+        headers[self.response_header] = "Hit" if cache_hit else "Miss"
         expires_at = datetime.now(tz=timezone.utc) + timedelta(
             seconds=ttl or 0.0
         )
-        response.headers["Expires"] = expires_at.strftime(HTTP_TIME)
-        response.headers["Cache-Control"] = f"max-age={ttl}"
-        if response_data:
-            response.headers["ETag"] = self.get_etag(response_data)
-            if "last_modified" in response_data:
-                response.headers["Last-Modified"] = response_data[
-                    "last_modified"
-                ]
+        headers["Expires"] = expires_at.strftime(HTTP_TIME)
+        headers["Cache-Control"] = f"max-age={ttl}"
+        if etag:
+            headers["ETag"] = etag
+        if last_modified:
+            headers["Last-Modified"] = last_modified
 
     def log(
         self,
@@ -242,6 +871,8 @@ class FastApiRedisCache(metaclass=MetaSingleton):
     ) -> None:
         """Log `RedisEvent` using the configured `Logger` object."""
         message = f" {self.get_log_time()} | {event.name}"
+        if self.name != DEFAULT_INSTANCE:
+            message += f": instance={self.name}"
         if msg:
             message += f": {msg}"
         if key:
@@ -254,7 +885,7 @@ class FastApiRedisCache(metaclass=MetaSingleton):
     def get_etag(cached_data: Union[str, bytes, dict[str, Any]]) -> str:
         """Return the etag."""
         if isinstance(cached_data, bytes):
-            cached_data = cached_data.decode()
+            cached_data = cached_data.decode(errors="surrogateescape")
         if not isinstance(cached_data, str):
             cached_data = serialize_json(cached_data)
         return f"W/{hash(cached_data)}"
@@ -262,5 +893,51 @@ class FastApiRedisCache(metaclass=MetaSingleton):
     @staticmethod
     def get_log_time() -> str:
         """Get a timestamp to include with a log message."""
+        # imported here, as it is only needed once something is logged.
+        import tzlocal
+
         local_tz = tzlocal.get_localzone()
         return datetime.now(local_tz).strftime(LOG_TIMESTAMP)
+
+
+def format_http_date(value: Any) -> str:
+    """Format a `last_modified` value for use in the `Last-Modified` header.
+
+    `datetime` objects are converted to an HTTP date, anything else is assumed
+    to be formatted already.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo:
+            value = value.astimezone(timezone.utc)
+        return str(value.strftime(HTTP_TIME))
+    return str(value)
+
+
+def decode_entry(entry: Mapping[str, bytes]) -> dict[str, Any]:
+    """Decode the metadata fields of an entry, leaving the data as stored."""
+    return {
+        field: value
+        if field == ENTRY_DATA or field.startswith(ENTRY_CHUNK_PREFIX)
+        else value.decode()
+        for field, value in entry.items()
+    }
+
+
+def format_delta(delta: float) -> str:
+    """Format a compute time in seconds for storing in a cache entry."""
+    return f"{delta:.6f}"
+
+
+def parse_http_date(value: str) -> datetime | None:
+    """Parse an HTTP (or ISO 8601) date, returning None if it is invalid.
+
+    Dates without a timezone are assumed to be in UTC.
+    """
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
@@ -0,0 +1,124 @@
+"""Codecs that convert response data to and from its stored form.
+
+Each cache instance has a codec. The default `JsonCodec` stores the JSON
+response body, so a cache hit can be sent without decoding it first.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Any, Protocol, Union
+
+from pydantic import PydanticUserError, TypeAdapter, ValidationError
+from pydantic_core import PydanticSerializationError
+
+from fastapi_redis_cache.util import deserialize_json, serialize_json
+
+
+class Codec(Protocol):
+    """Convert the data returned by path functions to and from bytes."""
+
+    def dumps(self, value: Any) -> Union[str, bytes]:  # noqa: ANN401
+        """Return the stored form of `value`.
+
+        Raises:
+            TypeError: If `value` can't be stored by this codec.
+        """
+
+    def loads(self, data: bytes) -> Any:  # noqa: ANN401
+        """Return the value stored as `data`."""
+
+    def to_json(self, data: bytes) -> Union[str, bytes]:
+        """Return the JSON response body for the value stored as `data`."""
+
+
+class JsonCodec:
+    """Store response data as JSON (the default)."""
+
+    def dumps(self, value: Any) -> Union[str, bytes]:  # noqa: ANN401
+        """Return `value` as a JSON string."""
+        return serialize_json(value)
+
+    def loads(self, data: bytes) -> Any:  # noqa: ANN401
+        """Return the value of the JSON `data`."""
+        return deserialize_json(data)
+
+    def to_json(self, data: bytes) -> Union[str, bytes]:
+        """Return the stored JSON unchanged."""
+        return data
+
+
+class CompressedJsonCodec(JsonCodec):
+    """Store response data as zlib-compressed JSON.
+
+    This saves memory in Redis (and network traffic) for large responses, at
+    the cost of compressing each response when it is cached and decompressing
+    it for every cache hit.
+    """
+
+    def __init__(self, level: int = zlib.Z_DEFAULT_COMPRESSION) -> None:
+        """Create a codec using the zlib compression `level` (0 to 9)."""
+        self.level = level
+
+    def dumps(self, value: Any) -> bytes:  # noqa: ANN401
+        """Return `value` as compressed JSON."""
+        return zlib.compress(serialize_json(value).encode(), self.level)
+
+    def loads(self, data: bytes) -> Any:  # noqa: ANN401
+        """Return the value of the compressed JSON `data`."""
+        return deserialize_json(zlib.decompress(data).decode())
+
+    def to_json(self, data: bytes) -> bytes:
+        """Return the decompressed JSON."""
+        return zlib.decompress(data)
+
+
+class SchemaCodec:
+    """Store response data as JSON, using the type the path function returns.
+
+    The JSON is written and read by a Pydantic `TypeAdapter` built once for
+    the type, instead of checking the type of every value as `JsonCodec` does.
+    This is the JSON FastAPI sends for a response of that type, so cache hits
+    can be sent as stored.
+    """
+
+    def __init__(self, adapter: TypeAdapter[Any]) -> None:
+        """Create a codec using the compiled `adapter`."""
+        self.adapter = adapter
+
+    def dumps(self, value: Any) -> bytes:  # noqa: ANN401
+        """Return `value` as JSON, using field aliases like FastAPI.
+
+        The value is validated against the type first, as FastAPI does for the
+        response, so any extra fields (of a dict, say) are left out.
+
+        Raises:
+            TypeError: If the value isn't valid for the type, or can't be
+                serialized.
+        """
+        try:
+            return self.adapter.dump_json(
+                self.adapter.validate_python(value, from_attributes=True),
+                by_alias=True,
+            )
+        except (ValidationError, PydanticSerializationError) as ex:
+            raise TypeError(str(ex)) from ex
+
+    def loads(self, data: bytes) -> Any:  # noqa: ANN401
+        """Return the value of the JSON `data`, validated against the type."""
+        return self.adapter.validate_json(data)
+
+    def to_json(self, data: bytes) -> bytes:
+        """Return the stored JSON unchanged."""
+        return data
+
+
+def get_schema_codec(annotation: Any) -> SchemaCodec | None:  # noqa: ANN401
+    """Return a `SchemaCodec` for the type `annotation`.
+
+    Returns None if Pydantic can't generate a schema for the type.
+    """
+    try:
+        return SchemaCodec(TypeAdapter(annotation))
+    except (PydanticUserError, TypeError):
+        return None
@@ -21,3 +21,11 @@ class RedisEvent(IntEnum):
     KEY_ADDED_TO_CACHE = 4
     KEY_FOUND_IN_CACHE = 5
     FAILED_TO_CACHE_KEY = 6
+    FAILED_TO_WARM_CACHE = 7
+    NEGATIVE_KEY_ADDED_TO_CACHE = 8
+    NEGATIVE_KEY_FOUND_IN_CACHE = 9
+    HOT_KEY_FOUND_IN_MEMORY = 10
+    KEY_FOUND_IN_HOST_CACHE = 11
+    KEYS_INVALIDATED = 12
+    READ_TIMED_OUT = 13
+    READ_FAILED = 14
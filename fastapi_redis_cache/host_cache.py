@@ -0,0 +1,214 @@
+"""Share cached entries between the worker processes on one host.
+
+Every worker of a gunicorn or uvicorn server would otherwise fetch the same
+popular entries from Redis, and any cache kept in process memory is duplicated
+in each of them. `HostCache` stores entries in a memory-mapped file (ideally on
+a `tmpfs` such as `/dev/shm`) that all the workers map, so an entry fetched by
+one worker is served to the others without a round trip to Redis.
+
+The file is a fixed-size table of slots. Each key is hashed to one slot, and a
+newer entry simply replaces whatever the slot held before. Writers lock the
+slot they are writing (with `fcntl.lockf`, so only writers to the same slot
+ever wait). Readers never lock: each slot has a sequence number that is odd
+while it is being written, and a read is retried if the number changed while
+the slot was being copied.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from hashlib import blake2b
+from typing import TYPE_CHECKING, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+from fastapi_redis_cache.backends.base import pack_entry, unpack_entry
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterator, Mapping
+    from pathlib import Path
+
+DEFAULT_SLOTS = 1024
+DEFAULT_SLOT_SIZE = 64 * 1024
+DEFAULT_MAX_AGE = 30
+READ_ATTEMPTS = 5
+
+MAGIC = b"FRCHOST2"
+# magic, number of slots, slot size.
+FILE_HEADER = struct.Struct("<8sII")
+# sequence number, key digest, expiry time in the backend, time the slot is
+# evicted (at most `max_age` after it was written), payload length.
+SLOT_HEADER = struct.Struct("<Q16sddI")
+SEQUENCE = struct.Struct("<Q")
+# the slot header after the sequence number, which is written separately.
+SLOT_FIELDS = struct.Struct("<16sddI")
+
+
+class HostCache:
+    """Cache entries in a memory-mapped file shared by every local process.
+
+    Each process creates its own `HostCache` with the same `path`, `slots` and
+    `slot_size`. The file is created by the first one to open it.
+
+    Args:
+        path (Union[str, Path]): The file holding the entries.
+        slots (int, optional): The number of entries the file can hold.
+            Defaults to 1024.
+        slot_size (int, optional): The size of each slot in bytes. Entries
+            larger than this (less a 44 byte header) are not stored. Defaults to
+            64 KiB, so the default file is 64 MiB.
+        max_age (int, optional): The most seconds an entry is kept, even if its
+            TTL in Redis is longer. Entries deleted or replaced in Redis by
+            another host are not seen until then. Defaults to 30.
+
+    Raises:
+        RuntimeError: If `fcntl` is not available (i.e. on Windows).
+        ValueError: If the file was created with a different layout.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        slots: int = DEFAULT_SLOTS,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        max_age: int = DEFAULT_MAX_AGE,
+    ) -> None:
+        """Map the file at `path`, creating it if it doesn't exist."""
+        if fcntl is None:  # pragma: no cover
+            msg = "HostCache requires fcntl, which is not available"
+            raise RuntimeError(msg)
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.max_age = max_age
+        # `lockf` locks are held by the process, so don't exclude its threads.
+        self._thread_lock = threading.Lock()
+        size = FILE_HEADER.size + slots * slot_size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._lock(0, FILE_HEADER.size):
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, size)
+                os.pwrite(
+                    self._fd, FILE_HEADER.pack(MAGIC, slots, slot_size), 0
+                )
+            header = os.pread(self._fd, FILE_HEADER.size, 0)
+        if header != FILE_HEADER.pack(MAGIC, slots, slot_size):
+            os.close(self._fd)
+            msg = f"{path} was created with a different number or size of slots"
+            raise ValueError(msg)
+        self._map = mmap.mmap(self._fd, size)
+
+    def close(self) -> None:
+        """Unmap and close the file, leaving it for the other processes."""
+        self._map.close()
+        os.close(self._fd)
+
+    @contextmanager
+    def _lock(self, start: int, length: int) -> Iterator[None]:
+        """Hold an exclusive lock on a range of the file.
+
+        The range is locked against other processes, and the whole file against
+        the other threads of this process.
+        """
+        with self._thread_lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, length, start)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, length, start)
+
+    def _locate(self, key: str) -> tuple[bytes, int]:
+        """Return the digest of `key` and the offset of its slot."""
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        index = int.from_bytes(digest[:8], "big") % self.slots
+        return (digest, FILE_HEADER.size + index * self.slot_size)
+
+    def get(self, key: str) -> tuple[int, dict[str, bytes]] | None:
+        """Return the TTL and entry stored for `key`, if it hasn't expired.
+
+        The TTL is the time left until the entry expires in the backend, even
+        though the slot is evicted sooner (after `max_age`).
+        """
+        digest, offset = self._locate(key)
+        for _ in range(READ_ATTEMPTS):
+            (sequence,) = SEQUENCE.unpack_from(self._map, offset)
+            if sequence % 2:
+                continue
+            _, slot_digest, expires_at, evict_at, length = (
+                SLOT_HEADER.unpack_from(self._map, offset)
+            )
+            if slot_digest != digest:
+                return None
+            start = offset + SLOT_HEADER.size
+            payload = self._map[start : start + min(length, self.capacity)]
+            if SEQUENCE.unpack_from(self._map, offset)[0] == sequence:
+                break
+        else:
+            return None
+        now = time.time()
+        ttl = int(expires_at - now)
+        if now >= evict_at or ttl <= 0:
+            return None
+        return (ttl, unpack_entry(payload))
+
+    def set(
+        self, key: str, entry: Mapping[str, Union[str, bytes]], ttl: int
+    ) -> bool:
+        """Store `entry`, which expires in `ttl` seconds, for at most `max_age`.
+
+        Returns:
+            `bool`: False if the entry is too large to be stored.
+        """
+        payload = pack_entry(entry)
+        if len(payload) > self.capacity or ttl <= 0:
+            return False
+        digest, offset = self._locate(key)
+        now = time.time()
+        with self._write(offset):
+            SLOT_FIELDS.pack_into(
+                self._map,
+                offset + SEQUENCE.size,
+                digest,
+                now + ttl,
+                now + min(ttl, self.max_age),
+                len(payload),
+            )
+            start = offset + SLOT_HEADER.size
+            self._map[start : start + len(payload)] = payload
+        return True
+
+    def delete(self, key: str) -> None:
+        """Remove the entry stored for `key`, if there is one."""
+        digest, offset = self._locate(key)
+        with self._write(offset):
+            slot_digest = self._map[
+                offset + SEQUENCE.size : offset + SEQUENCE.size + len(digest)
+            ]
+            if slot_digest == digest:
+                self._map[
+                    offset + SEQUENCE.size : offset + SLOT_HEADER.size
+                ] = bytes(SLOT_HEADER.size - SEQUENCE.size)
+
+    @property
+    def capacity(self) -> int:
+        """Return the largest entry (once packed) that can be stored."""
+        return self.slot_size - SLOT_HEADER.size
+
+    @contextmanager
+    def _write(self, offset: int) -> Iterator[None]:
+        """Lock a slot, marking it as being written while the lock is held."""
+        with self._lock(offset, self.slot_size):
+            (sequence,) = SEQUENCE.unpack_from(self._map, offset)
+            SEQUENCE.pack_into(self._map, offset, sequence + 1)
+            try:
+                yield
+            finally:
+                SEQUENCE.pack_into(self._map, offset, sequence + 2)
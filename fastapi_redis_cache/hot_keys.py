@@ -0,0 +1,199 @@
+"""Detect the most requested cache keys in this worker process.
+
+A small number of keys usually receive most of the cache hits. Every lookup is
+counted in a count-min sketch, a fixed-size table that estimates how often each
+key was seen without storing the keys themselves. Keys that are looked up often
+enough are "hot": they are reported by `top_keys`, their entries can be pinned
+in process memory for a few seconds so repeated lookups don't go to Redis at
+all, and their TTL can be extended (or the TTL of rarely used keys shortened)
+when they are cached.
+
+The tracker may be used from several threads (the cache reads entries in worker
+threads when it has a `read_timeout`), so its state is changed under a lock.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from hashlib import blake2b
+from typing import Any
+
+DEFAULT_SKETCH_WIDTH = 2048
+DEFAULT_SKETCH_DEPTH = 4
+DEFAULT_HOT_THRESHOLD = 100
+DEFAULT_PIN_SECONDS = 5
+DEFAULT_MAX_PINNED = 128
+DEFAULT_MAX_TRACKED = 1000
+DEFAULT_DECAY_INTERVAL = 100_000
+
+
+class CountMinSketch:
+    """Estimate how often each key has been seen, in a fixed amount of memory.
+
+    Each key is counted in one cell of every row, chosen by a different hash.
+    Collisions can only add to a count, so the smallest of a key's cells is
+    the best estimate and never less than the true count.
+    """
+
+    def __init__(
+        self,
+        width: int = DEFAULT_SKETCH_WIDTH,
+        depth: int = DEFAULT_SKETCH_DEPTH,
+    ) -> None:
+        """Create an empty sketch with `depth` rows of `width` counters."""
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+
+    def _cells(self, key: str) -> list[int]:
+        """Return the index of the cell for `key` in each row."""
+        digest = blake2b(key.encode(), digest_size=4 * self.depth).digest()
+        return [
+            int.from_bytes(digest[row * 4 : row * 4 + 4], "big") % self.width
+            for row in range(self.depth)
+        ]
+
+    def add(self, key: str) -> int:
+        """Count an occurrence of `key` and return its new estimated count."""
+        cells = self._cells(key)
+        for row, cell in zip(self.rows, cells):
+            row[cell] += 1
+        return min(row[cell] for row, cell in zip(self.rows, cells))
+
+    def estimate(self, key: str) -> int:
+        """Return the estimated number of times `key` has been seen."""
+        return min(row[cell] for row, cell in zip(self.rows, self._cells(key)))
+
+    def decay(self) -> None:
+        """Halve every count, so the estimates favor recent occurrences."""
+        for row in self.rows:
+            row[:] = [count // 2 for count in row]
+
+
+class HotKeyTracker:
+    """Track the most requested keys, pinning their entries in memory.
+
+    Args:
+        threshold (int, optional): The estimated number of lookups after which
+            a key is hot. Defaults to 100.
+        pin_seconds (float, optional): How long the entry of a hot key is kept
+            in process memory. Changes made by other workers (or directly in
+            Redis) are not seen until it expires. Set to 0 to disable pinning.
+            Defaults to 5.
+        max_pinned (int, optional): The most entries pinned at once. The
+            oldest is removed to make room for a new one. Defaults to 128.
+        ttl_bounds (tuple[int, int], optional): If set, the TTL of each cached
+            response is scaled by how popular its key is (relative to
+            `threshold`) and kept within these (minimum, maximum) seconds.
+            Defaults to None, which leaves TTLs unchanged.
+        max_tracked (int, optional): The most hot keys remembered for
+            `top_keys`. Defaults to 1000.
+        decay_interval (int, optional): The counts are halved after this many
+            lookups, so keys stop being hot once they are no longer requested.
+            Defaults to 100,000.
+        sketch (CountMinSketch, optional): The sketch used to count lookups.
+            Defaults to a 2048 x 4 sketch.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        threshold: int = DEFAULT_HOT_THRESHOLD,
+        pin_seconds: float = DEFAULT_PIN_SECONDS,
+        max_pinned: int = DEFAULT_MAX_PINNED,
+        ttl_bounds: tuple[int, int] | None = None,
+        max_tracked: int = DEFAULT_MAX_TRACKED,
+        decay_interval: int = DEFAULT_DECAY_INTERVAL,
+        sketch: CountMinSketch | None = None,
+    ) -> None:
+        """Create a tracker that hasn't seen any keys yet."""
+        self.threshold = threshold
+        self.pin_seconds = pin_seconds
+        self.max_pinned = max_pinned
+        self.ttl_bounds = ttl_bounds
+        self.max_tracked = max_tracked
+        self.decay_interval = decay_interval
+        self.sketch = sketch or CountMinSketch()
+        self.lookups = 0
+        # estimated counts of the hot keys, for `top_keys`.
+        self.hot: dict[str, int] = {}
+        # key -> (time pinned, TTL when pinned, entry), oldest first.
+        self.pinned: dict[str, tuple[float, int, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str) -> int:
+        """Count a lookup of `key` and return its estimated count."""
+        with self._lock:
+            return self._record(key)
+
+    def _record(self, key: str) -> int:
+        """Count a lookup of `key`, while holding the lock."""
+        self.lookups += 1
+        if self.lookups % self.decay_interval == 0:
+            self.sketch.decay()
+            self.hot = {
+                hot_key: count // 2
+                for hot_key, count in self.hot.items()
+                if count // 2 >= self.threshold
+            }
+        count = self.sketch.add(key)
+        if count >= self.threshold:
+            if key not in self.hot and len(self.hot) >= self.max_tracked:
+                coldest = min(self.hot, key=self.hot.__getitem__)
+                if self.hot[coldest] >= count:
+                    return count
+                del self.hot[coldest]
+            self.hot[key] = count
+        return count
+
+    def is_hot(self, key: str) -> bool:
+        """Return True if `key` has been looked up often enough to be hot."""
+        return key in self.hot
+
+    def top_keys(self, n: int = 10) -> list[tuple[str, int]]:
+        """Return the `n` hot keys with the most lookups, and their counts."""
+        with self._lock:
+            hot = list(self.hot.items())
+        return sorted(hot, key=lambda item: -item[1])[:n]
+
+    def get_pinned(self, key: str) -> tuple[int, dict[str, Any]] | None:
+        """Return the TTL and entry pinned for `key`, if it is still valid."""
+        pinned = self.pinned.get(key)
+        if pinned is None:
+            return None
+        pinned_at, ttl, entry = pinned
+        elapsed = time.monotonic() - pinned_at
+        if elapsed >= min(self.pin_seconds, ttl):
+            with self._lock:
+                if self.pinned.get(key) is pinned:
+                    del self.pinned[key]
+            return None
+        return (ttl - int(elapsed), entry)
+
+    def pin(self, key: str, ttl: int, entry: dict[str, Any]) -> None:
+        """Pin `entry` in memory if `key` is hot and pinning is enabled."""
+        if not self.pin_seconds or ttl <= 0 or not self.is_hot(key):
+            return
+        with self._lock:
+            self.pinned.pop(key, None)
+            if len(self.pinned) >= self.max_pinned:
+                del self.pinned[next(iter(self.pinned))]
+            self.pinned[key] = (time.monotonic(), ttl, entry)
+
+    def unpin(self, key: str) -> None:
+        """Remove the pinned entry for `key`, after it has been replaced."""
+        with self._lock:
+            self.pinned.pop(key, None)
+
+    def adapt_ttl(self, key: str, ttl: int) -> int:
+        """Return the TTL for `key`, scaled by its popularity.
+
+        A key looked up exactly `threshold` times keeps `ttl`. More popular
+        keys get a longer TTL and less popular keys a shorter one, within the
+        `ttl_bounds`.
+        """
+        if not self.ttl_bounds:
+            return ttl
+        min_ttl, max_ttl = self.ttl_bounds
+        scaled = ttl * self.sketch.estimate(key) // self.threshold
+        return max(min_ttl, min(scaled, max_ttl))
@@ -0,0 +1,97 @@
+"""Invalidate cached responses when data is changed.
+
+Only `GET` and `HEAD` requests are cached, so the path functions that create,
+update or delete data are never cached themselves. Decorating them with
+`invalidates` deletes the cached responses they make stale as soon as they
+succeed, instead of serving stale data until it expires.
+"""
+
+from __future__ import annotations
+
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Union
+
+from fastapi import BackgroundTasks
+
+from fastapi_redis_cache.cache import (
+    add_keyword_parameter,
+    get_api_response_async,
+)
+from fastapi_redis_cache.client import DEFAULT_INSTANCE, FastApiRedisCache
+from fastapi_redis_cache.key_gen import check_template, format_template
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Collection
+
+# name of the `BackgroundTasks` parameter added to path functions.
+INJECTED_BACKGROUND_PARAM = "__fastapi_redis_cache_background"
+
+
+def invalidates(
+    *,
+    tags: Collection[str] = (),
+    keys: Collection[str] = (),
+    background: bool = False,
+    instance: Union[str, FastApiRedisCache] = DEFAULT_INSTANCE,
+) -> Callable[..., Any]:
+    """Invalidate cached responses after the decorated function succeeds.
+
+    Nothing is invalidated if the function raises an exception.
+
+    Args:
+        tags (Collection[str], optional): The tags of the cached responses to
+            delete, including their negative entries. These can include the
+            arguments of the function, e.g. `"user:{user_id}"`. Defaults to ().
+        keys (Collection[str], optional): Cache keys to delete, which can
+            include the arguments of the function too. Defaults to ().
+        background (bool, optional): Delete the responses in a background task,
+            after the response has been sent, so the request isn't slowed down
+            by the deletes. Until then the stale responses can still be served.
+            Defaults to False.
+        instance (Union[str, FastApiRedisCache], optional): The cache instance
+            (or the name of one) holding the responses. Defaults to the default
+            instance, `FastApiRedisCache()`.
+
+    Raises:
+        ValueError: If a tag or key uses a name that isn't an argument of the
+            decorated function.
+    """
+
+    def outer_wrapper(func: Callable[..., Any]) -> Callable[..., Any]:
+        redis_cache = (
+            instance
+            if isinstance(instance, FastApiRedisCache)
+            else FastApiRedisCache(instance)
+        )
+        for template in (*tags, *keys):
+            check_template(template, func)
+
+        @wraps(func)
+        async def inner_wrapper(
+            *args: Any,  # noqa: ANN401
+            **kwargs: Any,  # noqa: ANN401
+        ) -> Any:  # noqa: ANN401
+            """Call the function, then invalidate the cached responses."""
+            background_tasks = kwargs.pop(INJECTED_BACKGROUND_PARAM, None)
+            response_data = await get_api_response_async(func, *args, **kwargs)
+            call_tags = [
+                format_template(tag, func, args, kwargs) for tag in tags
+            ]
+            call_keys = [
+                format_template(key, func, args, kwargs) for key in keys
+            ]
+            if background_tasks is None:
+                redis_cache.invalidate(call_tags, call_keys)
+            else:
+                background_tasks.add_task(
+                    redis_cache.invalidate, call_tags, call_keys
+                )
+            return response_data
+
+        if background:
+            add_keyword_parameter(
+                func, inner_wrapper, INJECTED_BACKGROUND_PARAM, BackgroundTasks
+            )
+        return inner_wrapper
+
+    return outer_wrapper
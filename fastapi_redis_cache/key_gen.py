@@ -2,17 +2,50 @@
 
 from __future__ import annotations
 
+import json
+import re
+import warnings
+from collections.abc import Mapping
+from contextlib import suppress
+from decimal import Decimal
+from enum import Enum
+from hashlib import blake2b
 from inspect import Signature, signature
+from string import Formatter
 from typing import TYPE_CHECKING, Any, Callable
+from urllib.parse import parse_qsl, urlencode
 
 from fastapi import Request, Response
+from fastapi.dependencies.utils import get_dependant
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.datastructures import UploadFile
 
 if TYPE_CHECKING:  # pragma: no cover
     from collections import OrderedDict
+    from collections.abc import Collection
 
     from fastapi_redis_cache.types import ArgType, SigParameters
 
 ALWAYS_IGNORE_ARG_TYPES = [Response, Request]
+KEY_DIGEST_SIZE = 16
+# name of the pseudo-argument holding the digest of the request body.
+BODY_KEY_ARG = "__body__"
+# bytes of an uploaded file read at a time, to find its digest.
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# matches the default `repr` of an object, e.g. `<Session object at 0x11b9f>`
+MEMORY_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+>")
+
+KeyBuilder = Callable[..., str]
+KeyArgs = Mapping[str, Callable[[Any], Any]]
+
+
+class UnstableCacheKeyWarning(UserWarning):
+    """An argument is added to cache keys with its memory address.
+
+    The address is different for every request, so the cache key is too and
+    the cached response will never be used.
+    """
 
 
 def get_cache_key(  # noqa: D417
@@ -43,18 +76,240 @@ def get_cache_key(  # noqa: D417
         `str`: Unique identifier for `func`, `*args` and `**kwargs` that can be
             used as a Redis key to retrieve cached API response data.
     """
-    if not ignore_arg_types:
-        ignore_arg_types = []
-    ignore_arg_types.extend(ALWAYS_IGNORE_ARG_TYPES)
-    ignore_arg_types = list(set(ignore_arg_types))
+    return build_cache_key(prefix, tag, ignore_arg_types, func, args, kwargs)
+
+
+def build_cache_key(  # noqa: PLR0913
+    prefix: str,
+    tag: str | None,
+    ignore_arg_types: list[ArgType],
+    func: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    *,
+    vary_headers: Mapping[str, str] | None = None,
+    unordered_args: Collection[str] = (),
+    hash_args: bool = False,
+    key_builder: KeyBuilder | None = None,
+    key_args: KeyArgs | None = None,
+    body_digest: str | None = None,
+) -> str:
+    """Generate a cache key as `get_cache_key`, with some extra options.
+
+    Args:
+        prefix (`str`): As for `get_cache_key`.
+        tag (`str`): As for `get_cache_key`.
+        ignore_arg_types (`list[ArgType]`): As for `get_cache_key`.
+        func (`Callable`): Path operation function for an API endpoint.
+        args (`tuple`): The positional arguments `func` is called with.
+        kwargs (`dict`): The keyword arguments `func` is called with.
+        vary_headers (`Mapping[str, str]`, optional): Request headers (and
+            their values) that affect the response, these are added to the key.
+        unordered_args (`Collection[str]`, optional): Names of list or tuple
+            arguments where the order of the items does not affect the
+            response, these are sorted before being added to the key.
+        hash_args (`bool`, optional): Replace the arguments and vary headers
+            with a fixed-length digest, leaving the prefix, function name and
+            tag readable.
+        key_builder (`KeyBuilder`, optional): Called with `func`, `*args` and
+            `**kwargs`, returns the string used in place of the arguments.
+        key_args (`KeyArgs`, optional): Functions that return the value to use
+            in the key for the named arguments, e.g. `{"user": lambda u: u.id}`.
+            These arguments are included even if their type is ignored.
+        body_digest (`str`, optional): A digest of the request body (see
+            `get_body_digest`), added to the key after the arguments.
+
+    Returns:
+        `str`: Unique identifier for `func`, `args`, `kwargs`, `vary_headers`
+            and `body_digest`.
+    """
+    ignore_arg_types = list(
+        {*(ignore_arg_types or []), *ALWAYS_IGNORE_ARG_TYPES}
+    )
+    prefix = f"{prefix}:" if prefix else ""
+    tag_string = f"::{tag}" if tag else ""
+    vary_string = get_vary_str(vary_headers) if vary_headers else ""
+
+    if key_builder:
+        args_str = key_builder(func, *args, **kwargs)
+    else:
+        sig = signature(func)
+        func_args = get_func_args(sig, *args, **kwargs)
+        args_str = get_args_str(
+            sig.parameters,
+            func_args,
+            ignore_arg_types,
+            unordered_args,
+            key_args,
+        )
+        warn_unstable_args(func, args_str)
+    if body_digest:
+        body_arg = f"{BODY_KEY_ARG}=#{body_digest}"
+        args_str = f"{args_str},{body_arg}" if args_str else body_arg
+    args_part = f"({args_str}){vary_string}"
+    if hash_args:
+        args_part = f"(#{get_key_digest(args_part)})"
+    return f"{prefix}{func.__module__}.{func.__name__}{args_part}{tag_string}"
+
+
+def get_request_cache_key(
+    prefix: str,
+    tag: str | None,
+    request: Request,
+    vary: list[str],
+    *,
+    hash_args: bool = False,
+) -> str:
+    """Generate a key to uniquely identify a request by its URL and headers.
+
+    This is used when caching at the ASGI layer, before the request has been
+    routed to a path operation function.
+
+    Args:
+        prefix (`str`): Customizable namespace value that will prefix all cache
+            keys.
+        tag (`str`): Customizable tag value that will be inserted into the
+            cache key.
+        request (`Request`): The incoming request. `HEAD` requests share the
+            key of the equivalent `GET` request.
+        vary (`list[str]`): Names of the request headers whose values affect
+            the response, these are included in the key.
+        hash_args (`bool`, optional): Replace the query parameters and vary
+            headers with a fixed-length digest.
+
+    Returns:
+        `str`: Unique identifier for the method, path, query parameters (in a
+            canonical order) and `vary` headers of the request.
+    """
     prefix = f"{prefix}:" if prefix else ""
     tag_string = f"::{tag}" if tag else ""
+    vary_string = get_vary_str(get_vary_headers(request, vary)) if vary else ""
+    method = "GET" if request.method == "HEAD" else request.method
+    query = urlencode(
+        sorted(parse_qsl(request.url.query, keep_blank_values=True))
+    )
+    args_part = f"?{query}{vary_string}"
+    if hash_args:
+        args_part = f"?#{get_key_digest(args_part)}"
+    return f"{prefix}{method}:{request.url.path}{args_part}{tag_string}"
+
+
+def get_key_digest(value: str) -> str:
+    """Return a compact (128-bit BLAKE2b) hex digest of part of a cache key."""
+    return blake2b(value.encode(), digest_size=KEY_DIGEST_SIZE).hexdigest()
+
+
+def get_body_digest(body: bytes) -> str:
+    """Return a digest of a request body, as used in cache keys.
+
+    A JSON body is canonicalized first (see `canonical_json`), so bodies that
+    only differ in their formatting or the order of their keys share a digest.
+    Any other body is used as is.
+    """
+    with suppress(ValueError):
+        body = canonical_json(json.loads(body))
+    return blake2b(body, digest_size=KEY_DIGEST_SIZE).hexdigest()
+
+
+def get_body_arg_digest(value: Any) -> str:  # noqa: ANN401
+    """Return the value used in a cache key for an argument from the body.
+
+    This is a digest of the canonical JSON of the argument (for example a
+    Pydantic model), so large request bodies don't make large keys. Uploaded
+    files are replaced by their name and a digest of their content.
+    """
+    encoded = jsonable_encoder(
+        value, custom_encoder={UploadFile: get_upload_digest}
+    )
+    digest = blake2b(canonical_json(encoded), digest_size=KEY_DIGEST_SIZE)
+    return f"#{digest.hexdigest()}"
+
+
+def get_upload_digest(upload: UploadFile) -> dict[str, str | None]:
+    """Return the name and a digest of the content of an uploaded file.
+
+    The file is read from the start, and left where it was.
+    """
+    digest = blake2b(digest_size=KEY_DIGEST_SIZE)
+    position = upload.file.tell()
+    upload.file.seek(0)
+    while chunk := upload.file.read(UPLOAD_CHUNK_SIZE):
+        digest.update(chunk)
+    upload.file.seek(position)
+    return {"filename": upload.filename, "content": digest.hexdigest()}
+
+
+def canonical_json(value: Any) -> bytes:  # noqa: ANN401
+    """Return `value` as compact JSON, with the keys of objects sorted."""
+    return json.dumps(
+        value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode()
+
+
+def get_body_params(func: Callable[..., Any]) -> list[str]:
+    """Return the names of the arguments FastAPI reads from the request body.
+
+    These are found the way FastAPI finds them, so they include Pydantic
+    models, `dict` and other non-scalar arguments, and arguments declared with
+    `Body()`, `Form()` or `File()` (such as an `UploadFile`), but not query
+    parameters or dependencies.
+    """
+    dependant = get_dependant(path="", call=func)
+    return [field.name for field in dependant.body_params]
+
+
+def get_vary_headers(
+    request: Request | None, vary: list[str]
+) -> dict[str, str]:
+    """Return the (lower case) names and values of the `vary` headers."""
+    headers = request.headers if request else {}
+    return {header.lower(): headers.get(header, "") for header in vary}
+
+
+def get_vary_str(vary_headers: Mapping[str, str]) -> str:
+    """Return the part of a cache key made from the `vary_headers`."""
+    headers = ",".join(
+        f"{header}={value}" for header, value in sorted(vary_headers.items())
+    )
+    return f"[{headers}]"
 
-    sig = signature(func)
-    sig_params = sig.parameters
-    func_args = get_func_args(sig, *args, **kwargs)
-    args_str = get_args_str(sig_params, func_args, ignore_arg_types)
-    return f"{prefix}{func.__module__}.{func.__name__}({args_str}){tag_string}"
+
+def check_template(template: str | None, func: Callable[..., Any]) -> None:
+    """Check every `{name}` in `template` (if given) is an argument of `func`.
+
+    Raises:
+        ValueError: If the template uses any other name.
+    """
+    if not template:
+        return
+    params = signature(func).parameters
+    for _, field_name, _, _ in Formatter().parse(template):
+        if field_name is None:
+            continue
+        name = re.split(r"[.\[]", field_name, maxsplit=1)[0]
+        if name not in params:
+            msg = (
+                f"{template!r} uses {name!r}, which is not an argument of "
+                f"{func.__name__}"
+            )
+            raise ValueError(msg)
+
+
+def format_template(
+    template: str,
+    func: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> str:
+    """Return `template` with each `{name}` replaced by an argument of `func`.
+
+    For example, `"user:{user_id}"` becomes `"user:42"` when `func` is called
+    with `user_id=42`. Attributes and items can be used too, as in
+    `"user:{user.id}"`.
+    """
+    if "{" not in template:
+        return template
+    return template.format_map(get_func_args(signature(func), *args, **kwargs))
 
 
 def get_func_args(
@@ -70,13 +325,107 @@ def get_args_str(
     sig_params: SigParameters,
     func_args: OrderedDict[str, Any],
     ignore_arg_types: list[ArgType],
+    unordered_args: Collection[str] = (),
+    key_args: KeyArgs | None = None,
 ) -> str:
     """Return a string with name and value of all args.
 
-    Ignores those whose type is included in `ignore_arg_types`
+    Ignores those whose type is included in `ignore_arg_types`, unless there is
+    an extractor for them in `key_args`. Each value is converted to its
+    canonical form (see `canonicalize`), so that equivalent values share the
+    same cache key.
     """
+    key_args = key_args or {}
     return ",".join(
-        f"{arg}={val}"
-        for arg, val in func_args.items()
-        if sig_params[arg].annotation not in ignore_arg_types
+        f"{arg}={canonicalize(val, sort_items=arg in unordered_args)}"
+        for arg, val in (
+            (arg, key_args[arg](val) if arg in key_args else val)
+            for arg, val in func_args.items()
+            if arg in key_args
+            or sig_params[arg].annotation not in ignore_arg_types
+        )
     )
+
+
+def warn_unstable_args(func: Callable[..., Any], args_str: str) -> None:
+    """Warn if any argument in `args_str` contains a memory address."""
+    if MEMORY_ADDRESS.search(args_str):
+        unstable = [
+            arg.split("=", 1)[0]
+            for arg in args_str.split(",")
+            if MEMORY_ADDRESS.search(arg)
+        ]
+        warnings.warn(
+            f"The cache key for {func.__module__}.{func.__name__} includes a "
+            f"memory address for {', '.join(unstable)}, so will never be "
+            "reused. Add the argument type to `ignore_arg_types`, or use "
+            "`key_args` or `key_builder` to choose what goes in the key.",
+            UnstableCacheKeyWarning,
+            stacklevel=2,
+        )
+
+
+def canonicalize(value: Any, *, sort_items: bool = False) -> str:  # noqa: ANN401
+    """Return a canonical string form of `value` for use in a cache key.
+
+    - whole numbers are formatted the same whether they are an `int`, `float`
+      or `Decimal` (so `1`, `1.0` and `Decimal("1.00")` are all `1`).
+    - enums are replaced by their value, and Pydantic models by their fields.
+    - mappings are sorted by key and sets are sorted, since their order never
+      affects the response. Lists and tuples are only sorted if `sort_items`
+      is True.
+    - the items of mappings, lists and sets are encoded as JSON (see
+      `canonicalize_item`), so `["a,b"]` and `["a", "b"]` stay different.
+    - anything else uses `str(value)`.
+    """
+    if isinstance(value, Enum):
+        return canonicalize(value.value, sort_items=sort_items)
+    if isinstance(value, (str, bool)) or value is None:
+        return str(value)
+    if isinstance(value, (int, float, Decimal)):
+        return canonicalize_number(value)
+    if isinstance(value, (BaseModel, Mapping, list, tuple, set, frozenset)):
+        return canonicalize_item(value, sort_items=sort_items)
+    return str(value)
+
+
+def canonicalize_item(value: Any, *, sort_items: bool = False) -> str:  # noqa: ANN401, PLR0911
+    """Return the canonical JSON form of a value inside a collection.
+
+    Strings (and any other object, by its `str`) are quoted and escaped as
+    JSON strings, so the separators of the enclosing collection can't appear
+    unquoted in an item. Numbers are formatted as in `canonicalize`.
+    """
+    if isinstance(value, Enum):
+        return canonicalize_item(value.value)
+    if isinstance(value, (str, bool)) or value is None:
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (int, float, Decimal)):
+        return canonicalize_number(value)
+    if isinstance(value, BaseModel):
+        return canonicalize_item(value.model_dump())
+    if isinstance(value, Mapping):
+        items = sorted(
+            f"{canonicalize_item(key)}:{canonicalize_item(item)}"
+            for key, item in value.items()
+        )
+        return f"{{{','.join(items)}}}"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [canonicalize_item(item) for item in value]
+        if sort_items or isinstance(value, (set, frozenset)):
+            items.sort()
+        return f"[{','.join(items)}]"
+    return json.dumps(str(value), ensure_ascii=False)
+
+
+def canonicalize_number(value: float | Decimal) -> str:
+    """Return a canonical string form of a number."""
+    if isinstance(value, Decimal):
+        if value.is_finite() and value == value.to_integral_value():
+            return str(int(value))
+        return (
+            format(value.normalize(), "f") if value.is_finite() else str(value)
+        )
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
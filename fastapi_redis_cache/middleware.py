@@ -0,0 +1,205 @@
+"""ASGI middleware that serves cached responses before a request is routed.
+
+The `cache` decorator only runs once FastAPI has routed the request, resolved
+every dependency and validated the parameters. On a cache hit that work is
+wasted, so the `CacheMiddleware` answers hits for the configured paths directly
+at the ASGI layer instead.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from functools import partial
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Union
+
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+
+from fastapi_redis_cache.cache import (
+    blank_response,
+    cached_response,
+    calculate_ttl,
+    lookup_entry,
+    read_entry,
+)
+from fastapi_redis_cache.client import DEFAULT_INSTANCE, FastApiRedisCache
+from fastapi_redis_cache.responses import DEFAULT_MAX_CACHEABLE_SIZE
+
+if TYPE_CHECKING:  # pragma: no cover
+    from datetime import timedelta
+
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+@dataclass
+class CacheRule:
+    """Describe which requests the `CacheMiddleware` caches, and how.
+
+    Args:
+        path (str): The request path to cache. Shell-style wildcards are
+            supported, for example `/products/*`.
+        expire (Union[int, timedelta], optional): The number of seconds from
+            now when the cached response should expire. Defaults to the
+            `default_expire` of the cache instance (one year unless set).
+        tag (str, optional): A tag to associate with the cached responses.
+            Defaults to None.
+        vary (list[str], optional): Names of request headers whose values
+            affect the response. These are included in the cache key. Defaults
+            to an empty list.
+        max_size (int, optional): The largest body, in bytes, that will be
+            cached. Defaults to 1 MiB.
+    """
+
+    path: str
+    expire: Union[int, timedelta, None] = None
+    tag: str | None = None
+    vary: list[str] = field(default_factory=list)
+    max_size: int = DEFAULT_MAX_CACHEABLE_SIZE
+
+    def matches(self, path: str) -> bool:
+        """Return True if this rule applies to the request `path`."""
+        return fnmatchcase(path, self.path)
+
+
+class CacheMiddleware:
+    """Cache the responses for matching paths at the ASGI layer.
+
+    Cache keys are created from the request method, path, query parameters (in
+    a canonical order) and the headers listed in the rule's `vary` argument.
+    A cache hit is sent without routing the request, so no dependencies are
+    resolved and the path operation function is not called.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rules: list[CacheRule],
+        instance: Union[str, FastApiRedisCache] = DEFAULT_INSTANCE,
+    ) -> None:
+        """Wrap `app`, caching requests that match one of the `rules`.
+
+        The responses are stored in the cache `instance` (or the instance with
+        that name), which defaults to `FastApiRedisCache()`.
+        """
+        self.app = app
+        self.rules = rules
+        self.redis_cache = (
+            instance
+            if isinstance(instance, FastApiRedisCache)
+            else FastApiRedisCache(instance)
+        )
+
+    def get_rule(self, path: str) -> CacheRule | None:
+        """Return the first rule that applies to `path`, if any."""
+        return next((rule for rule in self.rules if rule.matches(path)), None)
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """Answer the request from the cache, or cache the app's response."""
+        rule = self.get_rule(scope["path"]) if scope["type"] == "http" else None
+        redis_cache = self.redis_cache
+        if rule is None or redis_cache.not_connected:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        if redis_cache.request_is_not_cacheable(request):
+            await self.app(scope, receive, send)
+            return
+
+        key = redis_cache.get_request_cache_key(rule.tag, request, rule.vary)
+        read = await read_entry(
+            redis_cache, key, partial(lookup_entry, redis_cache, key, request)
+        )
+        if read is None:
+            # the read went over budget, or failed.
+            await self.app(scope, receive, send)
+            return
+        ttl, entry = read
+        if entry:
+            response = cached_response(
+                redis_cache,
+                request,
+                blank_response(),
+                ttl,
+                entry,
+                codec=redis_cache.codec,
+                create_response_directly=True,
+            )
+            await response(scope, receive, send)
+            return
+
+        if request.method == "HEAD":
+            # the body of a HEAD response is empty, so it can't be cached.
+            await self.app(scope, receive, send)
+            return
+        recorder = ResponseRecorder(redis_cache, key, rule, send)
+        await self.app(scope, receive, recorder)
+
+
+class ResponseRecorder:
+    """Pass ASGI response messages on, caching the completed response.
+
+    Only `200` responses no larger than the rule's `max_size` are cached, and
+    never those meant for a single client (see `is_private_response`).
+    """
+
+    def __init__(
+        self,
+        redis_cache: FastApiRedisCache,
+        key: str,
+        rule: CacheRule,
+        send: Send,
+    ) -> None:
+        """Record the response for `key` before passing it on to `send`."""
+        self.redis_cache = redis_cache
+        self.key = key
+        self.rule = rule
+        self.send = send
+        self.ttl = calculate_ttl(
+            redis_cache.default_expire if rule.expire is None else rule.expire
+        )
+        self.headers: MutableHeaders | None = None
+        self.body: bytearray | None = None
+
+    async def __call__(self, message: Message) -> None:
+        """Record `message`, then send it."""
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(scope=message)
+            if message["status"] == HTTPStatus.OK and not is_private_response(
+                headers
+            ):
+                self.headers = headers
+                self.body = bytearray()
+                self.redis_cache.set_cache_headers(
+                    self.headers, cache_hit=False, ttl=self.ttl
+                )
+        elif message["type"] == "http.response.body" and self.body is not None:
+            self.body.extend(message.get("body", b""))
+            if len(self.body) > self.rule.max_size:
+                self.body = None
+            elif not message.get("more_body", False) and self.headers:
+                self.redis_cache.add_response_to_cache(
+                    self.key,
+                    bytes(self.body),
+                    self.headers,
+                    self.ttl,
+                    self.rule.tag,
+                )
+        await self.send(message)
+
+
+def is_private_response(headers: MutableHeaders) -> bool:
+    """Return True if a response must not be stored in a shared cache.
+
+    That is a response with `Cache-Control: no-store` or `private`, or one
+    setting a cookie (such as a session), which is only meant for the client
+    that made the request.
+    """
+    cache_control = headers.get("Cache-Control", "").lower()
+    return "set-cookie" in headers or any(
+        directive in cache_control for directive in ("no-store", "private")
+    )
@@ -0,0 +1,143 @@
+"""Serve every page of a paginated list from one cached result set.
+
+Without this, `?page=1&size=50`, `?page=2&size=50` and `?page=1&size=100` each
+have their own cache key, so the same query is run (and its results cached)
+once for every page and page size requested. With `cache(paginate=...)` the
+path function returns the full ordered list, which is cached once, split into
+chunks of `chunk_size` items stored in separate fields of the entry. Each
+request only fetches the chunks overlapping the requested page.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from hashlib import blake2b
+from inspect import signature
+from typing import TYPE_CHECKING, Any, Callable, Union
+
+from fastapi_redis_cache.client import ENTRY_CHUNK_PREFIX, ENTRY_COUNT
+from fastapi_redis_cache.key_gen import KEY_DIGEST_SIZE
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Mapping, Sequence
+
+    from fastapi_redis_cache.codec import Codec
+    from fastapi_redis_cache.key_gen import KeyArgs
+
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_MAX_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Pagination:
+    """How a cached path function is paginated.
+
+    Args:
+        page (str, optional): The name of the argument holding the page number,
+            starting from 1. Defaults to "page".
+        size (str, optional): The name of the argument holding the number of
+            items per page. Defaults to "size".
+        chunk_size (int, optional): The number of items stored in each chunk.
+            Smaller chunks transfer less data for small pages, larger chunks
+            mean fewer fields to fetch for large pages. Defaults to 100.
+        max_size (int, optional): The most items sent in one page, larger
+            page sizes are reduced to this. It limits the number of chunks a
+            single request can fetch. Defaults to 1000, or None for no limit.
+
+    Raises:
+        ValueError: If `chunk_size` or `max_size` is less than 1.
+    """
+
+    page: str = "page"
+    size: str = "size"
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    max_size: int | None = DEFAULT_MAX_SIZE
+
+    def __post_init__(self) -> None:
+        """Check the chunk size and maximum page size are valid."""
+        if self.chunk_size < 1:
+            msg = f"chunk_size must be at least 1, not {self.chunk_size}"
+            raise ValueError(msg)
+        if self.max_size is not None and self.max_size < 1:
+            msg = f"max_size must be at least 1, not {self.max_size}"
+            raise ValueError(msg)
+
+    def check(self, func: Callable[..., Any]) -> None:
+        """Check the page and size arguments are arguments of `func`.
+
+        Raises:
+            ValueError: If either of them isn't.
+        """
+        params = signature(func).parameters
+        for name in (self.page, self.size):
+            if name not in params:
+                msg = f"{name!r} is not an argument of {func.__name__}"
+                raise ValueError(msg)
+
+    def get_key_args(self, key_args: KeyArgs | None) -> KeyArgs:
+        """Return `key_args`, leaving the page and size out of the cache key."""
+        return {**(key_args or {}), self.page: ignore, self.size: ignore}
+
+    def get_slice(self, kwargs: Mapping[str, Any]) -> tuple[int, int]:
+        """Return the start and stop index of the page requested in `kwargs`.
+
+        The page size is reduced to `max_size`, if it is larger.
+        """
+        size = max(int(kwargs[self.size]), 0)
+        if self.max_size is not None:
+            size = min(size, self.max_size)
+        start = (max(int(kwargs[self.page]), 1) - 1) * size
+        return (start, start + size)
+
+    def get_chunk_fields(self, start: int, stop: int) -> list[str]:
+        """Return the entry fields of the chunks holding items start to stop."""
+        return [
+            f"{ENTRY_CHUNK_PREFIX}{chunk}"
+            for chunk in range(
+                start // self.chunk_size, math.ceil(stop / self.chunk_size)
+            )
+        ]
+
+    def build_entry(
+        self, items: Sequence[Any], codec: Codec
+    ) -> dict[str, Union[str, bytes]]:
+        """Return the entry fields storing `items` in chunks.
+
+        Raises:
+            TypeError: If the items can't be serialized by `codec`.
+        """
+        entry: dict[str, Union[str, bytes]] = {ENTRY_COUNT: str(len(items))}
+        for chunk, start in enumerate(range(0, len(items), self.chunk_size)):
+            entry[f"{ENTRY_CHUNK_PREFIX}{chunk}"] = codec.dumps(
+                list(items[start : start + self.chunk_size])
+            )
+        return entry
+
+    def get_items(
+        self, entry: Mapping[str, Any], start: int, stop: int, codec: Codec
+    ) -> list[Any]:
+        """Return items start to stop from the chunks fetched in `entry`."""
+        items: list[Any] = []
+        for field in self.get_chunk_fields(start, stop):
+            if field not in entry:
+                break
+            items.extend(codec.loads(entry[field]))
+        offset = start - start % self.chunk_size
+        return items[start - offset : stop - offset]
+
+    @staticmethod
+    def get_etag(body: Union[str, bytes]) -> str:
+        """Return the ETag of a page, from a digest of its JSON `body`.
+
+        Pages are sliced from the cached list, so their ETags are not stored.
+        A digest (unlike `hash`) is the same in every process, so a page can be
+        revalidated by any worker.
+        """
+        if isinstance(body, str):
+            body = body.encode()
+        return f"W/{blake2b(body, digest_size=KEY_DIGEST_SIZE).hexdigest()}"
+
+
+def ignore(_: Any) -> None:  # noqa: ANN401
+    """Return None, so an argument has the same value in every cache key."""
@@ -1,12 +1,18 @@
 """Helper function to connect to Redis and return a Redis client instance."""
 
+from __future__ import annotations
+
 import os
+from typing import TYPE_CHECKING
 
 import redis
-from fakeredis import FakeRedis
 
 from fastapi_redis_cache.enums import RedisStatus
-from fastapi_redis_cache.types import RedisConnectType
+
+if TYPE_CHECKING:  # pragma: no cover
+    from fakeredis import FakeRedis
+
+    from fastapi_redis_cache.types import RedisConnectType
 
 
 def redis_connect(host_url: str) -> RedisConnectType:
@@ -37,4 +43,7 @@ def _connect(host_url: str) -> RedisConnectType:
 
 def _connect_fake() -> tuple[RedisStatus, FakeRedis]:
     """Return a FakeRedis instance for testing purposes."""
+    # imported here, as fakeredis is only installed for testing.
+    from fakeredis import FakeRedis
+
     return (RedisStatus.CONNECTED, FakeRedis())
@@ -0,0 +1,191 @@
+"""Cache and replay raw (non-JSON) responses such as HTML, files and streams."""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import time
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Union
+
+from anyio import to_thread
+from fastapi import Response
+from fastapi.responses import FileResponse, StreamingResponse
+
+from fastapi_redis_cache.client import ENTRY_DATA, ENTRY_HEADERS
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import (
+        AsyncIterable,
+        AsyncIterator,
+        Iterator,
+        Mapping,
+    )
+
+    from fastapi_redis_cache.client import FastApiRedisCache
+
+OCTET_STREAM_MEDIA_TYPE = "application/octet-stream"
+DEFAULT_MAX_CACHEABLE_SIZE = 1024 * 1024
+
+
+def is_raw_response(response_data: Any) -> bool:  # noqa: ANN401
+    """Return True if the endpoint returned a response that is not JSON."""
+    return isinstance(response_data, (Response, bytes))
+
+
+async def cache_raw_response(  # noqa: PLR0913
+    redis_cache: FastApiRedisCache,
+    key: str,
+    response_data: Union[Response, bytes],
+    ttl: int,
+    tag: str | None,
+    max_size: int,
+    *,
+    delta: float | None = None,
+) -> Response:
+    """Cache the body of a raw response and return the response to send.
+
+    Raw `bytes` are sent as an `application/octet-stream` response. Only `200`
+    responses are cached, and only if the body is no larger than `max_size`
+    bytes. Streamed responses are cached after the last chunk has been sent
+    to the client. `delta` is the number of seconds it took to compute the
+    response.
+    """
+    if isinstance(response_data, bytes):
+        response_data = Response(
+            content=response_data, media_type=OCTET_STREAM_MEDIA_TYPE
+        )
+    if response_data.status_code != HTTPStatus.OK:
+        return response_data
+
+    etag = response_data.headers.get("etag")
+    if isinstance(response_data, FileResponse):
+        etag = await cache_file_response(
+            redis_cache, key, response_data, ttl, tag, max_size, delta=delta
+        )
+    elif isinstance(response_data, StreamingResponse):
+        # the ETag isn't known until the whole body has been streamed.
+        response_data.body_iterator = tee_body(
+            redis_cache,
+            key,
+            response_data,
+            response_data.body_iterator,
+            ttl,
+            tag,
+            max_size,
+            delta=delta,
+        )
+    else:
+        etag = etag or redis_cache.get_etag(response_data.body)
+        if len(response_data.body) <= max_size:
+            redis_cache.add_response_to_cache(
+                key,
+                response_data.body,
+                response_data.headers,
+                ttl,
+                tag,
+                delta=delta,
+            )
+    redis_cache.set_response_headers(
+        response_data, cache_hit=False, ttl=ttl, etag=etag
+    )
+    return response_data
+
+
+async def cache_file_response(  # noqa: PLR0913
+    redis_cache: FastApiRedisCache,
+    key: str,
+    response: FileResponse,
+    ttl: int,
+    tag: str | None,
+    max_size: int,
+    *,
+    delta: float | None = None,
+) -> str | None:
+    """Cache the content of the file sent by a `FileResponse`.
+
+    The file is read in a worker thread, and its `ETag` and other headers are
+    set now (as Starlette would when sending it), so the response sent and the
+    cached entry have the same `ETag`, which is returned. If the file can't be
+    read it isn't cached, and Starlette reports the error when the response is
+    sent.
+    """
+    try:
+        stat_result = await to_thread.run_sync(os.stat, response.path)
+        if not stat.S_ISREG(stat_result.st_mode):
+            return None
+        response.set_stat_headers(stat_result)
+        body = (
+            await to_thread.run_sync(Path(response.path).read_bytes)
+            if stat_result.st_size <= max_size
+            else None
+        )
+    except OSError:
+        return None
+    if body is not None:
+        redis_cache.add_response_to_cache(
+            key, body, response.headers, ttl, tag, delta=delta
+        )
+    return response.headers.get("etag")
+
+
+async def tee_body(  # noqa: PLR0913
+    redis_cache: FastApiRedisCache,
+    key: str,
+    response: StreamingResponse,
+    body_iterator: AsyncIterable[Union[str, bytes]],
+    ttl: int,
+    tag: str | None,
+    max_size: int,
+    *,
+    delta: float | None = None,
+) -> AsyncIterator[Union[str, bytes]]:
+    """Pass each chunk of a streamed response on while buffering a copy.
+
+    Once the stream is finished the buffered body is cached, unless it grew
+    larger than `max_size` bytes in which case buffering stops early. The time
+    spent streaming is added to `delta`, the time taken to create the response.
+    """
+    started = time.perf_counter()
+    buffer: bytearray | None = bytearray()
+    async for chunk in body_iterator:
+        if buffer is not None:
+            buffer.extend(chunk if isinstance(chunk, bytes) else chunk.encode())
+            if len(buffer) > max_size:
+                buffer = None
+        yield chunk
+    if buffer is not None:
+        redis_cache.add_response_to_cache(
+            key,
+            bytes(buffer),
+            response.headers,
+            ttl,
+            tag,
+            delta=(delta or 0) + time.perf_counter() - started,
+        )
+
+
+def replay_raw_response(
+    entry: dict[str, Any],
+    headers: Mapping[str, str],
+    stream_chunk_size: int | None = None,
+) -> Response:
+    """Return a response for a cached raw `entry`.
+
+    The stored response headers are combined with the cache `headers`. If
+    `stream_chunk_size` is set the body is sent as a chunked stream.
+    """
+    headers = {**json.loads(entry[ENTRY_HEADERS]), **headers}
+    if stream_chunk_size:
+        return StreamingResponse(
+            iter_chunks(entry[ENTRY_DATA], stream_chunk_size), headers=headers
+        )
+    return Response(content=entry[ENTRY_DATA], headers=headers)
+
+
+def iter_chunks(data: bytes, chunk_size: int) -> Iterator[bytes]:
+    """Yield `data` in chunks of `chunk_size` bytes."""
+    for start in range(0, len(data), chunk_size):
+        yield data[start : start + chunk_size]
@@ -0,0 +1,27 @@
+"""Server-side Lua scripts used to reduce the number of Redis round trips.
+
+These are registered with the Redis client using `register_script`, which runs
+them with `EVALSHA` and transparently re-loads them if the server has flushed
+its script cache.
+"""
+
+# Return the TTL of the cache entry in KEYS[1], followed by the values of the
+# entry fields named in ARGV.
+FETCH_ENTRY = """
+local values = redis.call('HMGET', KEYS[1], unpack(ARGV))
+table.insert(values, 1, redis.call('TTL', KEYS[1]))
+return values
+"""
+
+# Replace the cache entry in KEYS[1] with the field/value pairs in ARGV[2:],
+# expiring after ARGV[1] seconds. If a tag set is given in KEYS[2] the key is
+# added to it.
+STORE_ENTRY = """
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+if KEYS[2] then
+    redis.call('SADD', KEYS[2], KEYS[1])
+end
+return 1
+"""
@@ -9,7 +9,6 @@ from enum import Enum
 from typing import Any, Callable, Union
 from uuid import UUID
 
-from dateutil import parser
 from pydantic import BaseModel
 
 DATETIME_AWARE = "%m/%d/%Y %I:%M:%S %p %z"
@@ -21,9 +20,19 @@ ONE_WEEK_IN_SECONDS = ONE_DAY_IN_SECONDS * 7
 ONE_MONTH_IN_SECONDS = ONE_DAY_IN_SECONDS * 30
 ONE_YEAR_IN_SECONDS = ONE_DAY_IN_SECONDS * 365
 
+
+def parse_datetime(value: str) -> datetime:
+    """Parse a date (or datetime) serialized by `BetterJsonEncoder`."""
+    # imported here, as it is only needed when a cached date is read and takes
+    # a while to import.
+    from dateutil import parser
+
+    return parser.parse(value)
+
+
 SERIALIZE_OBJ_MAP = {
-    str(datetime): parser.parse,
-    str(date): parser.parse,
+    str(datetime): parse_datetime,
+    str(date): parse_datetime,
     str(Decimal): Decimal,
 }
 
@@ -77,7 +86,7 @@ def serialize_json(json_dict: dict[str, Any]) -> str:
     return json.dumps(json_dict, cls=BetterJsonEncoder)
 
 
-def deserialize_json(json_str: str) -> Any:  # noqa: ANN401
+def deserialize_json(json_str: Union[str, bytes]) -> Any:  # noqa: ANN401
     """Deserialize a JSON string to a dictionary."""
     return json.loads(json_str, object_hook=object_hook)
 
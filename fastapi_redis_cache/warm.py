@@ -0,0 +1,119 @@
+"""Pre-populate the cache before real traffic arrives.
+
+After a Redis failover, or once a tag has been invalidated, every cached route
+starts cold and the first requests pay the full cost of computing each
+response. `warm_cache` calls decorated path functions with known arguments so
+their responses are cached in advance, using exactly the same cache keys and
+storage as live requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from inspect import signature
+from typing import TYPE_CHECKING, Any, Callable
+
+from fastapi import Request, Response
+
+from fastapi_redis_cache.cache import (
+    CACHE_INSTANCE_ATTR,
+    INJECTED_REQUEST_PARAM,
+)
+from fastapi_redis_cache.client import FastApiRedisCache
+from fastapi_redis_cache.enums import RedisEvent
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable
+
+DEFAULT_WARM_CONCURRENCY = 8
+
+
+@dataclass
+class WarmTarget:
+    """A call to a decorated path function whose response should be cached.
+
+    Args:
+        func (Callable): The path function, decorated with `cache`.
+        kwargs (dict[str, Any], optional): The arguments to call `func` with,
+            as FastAPI would pass them (for example, after converting query
+            parameters to their declared types). Any dependencies, such as a
+            database session, must be included too. Defaults to no arguments.
+        headers (dict[str, str], optional): Request headers, for routes that
+            use `vary`. Defaults to no headers.
+    """
+
+    func: Callable[..., Any]
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def redis_cache(self) -> FastApiRedisCache:
+        """Return the cache instance used by the path function."""
+        return getattr(self.func, CACHE_INSTANCE_ATTR, FastApiRedisCache())
+
+    @property
+    def name(self) -> str:
+        """Return the qualified name of the path function."""
+        return f"{self.func.__module__}.{self.func.__name__}"
+
+    def get_call_kwargs(self) -> dict[str, Any]:
+        """Return `kwargs`, with the request (and response) FastAPI adds."""
+        params = signature(self.func).parameters
+        request = Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "path": "/",
+                "query_string": b"",
+                "headers": [
+                    (name.lower().encode(), value.encode())
+                    for name, value in self.headers.items()
+                ],
+            }
+        )
+        call_kwargs = dict(self.kwargs)
+        if INJECTED_REQUEST_PARAM in params:
+            call_kwargs[INJECTED_REQUEST_PARAM] = request
+        elif "request" in params:
+            call_kwargs.setdefault("request", request)
+        if "response" in params:
+            call_kwargs.setdefault("response", Response())
+        return call_kwargs
+
+
+async def warm_cache(
+    targets: Iterable[WarmTarget],
+    *,
+    concurrency: int = DEFAULT_WARM_CONCURRENCY,
+) -> int:
+    """Cache the response for each of the `targets`.
+
+    The targets are warmed concurrently, with at most `concurrency` running at
+    once. Responses that are already cached are left as they are. A target
+    that raises an exception, or whose cache instance is not connected, is
+    skipped. This can be awaited from a FastAPI lifespan handler, after
+    `FastApiRedisCache.init`.
+
+    Returns:
+        `int`: The number of targets that were warmed successfully.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm_target(target: WarmTarget) -> bool:
+        redis_cache = target.redis_cache
+        if redis_cache.not_connected:
+            return False
+        async with semaphore:
+            try:
+                await target.func(**target.get_call_kwargs())
+            except Exception as ex:  # noqa: BLE001
+                redis_cache.log(
+                    RedisEvent.FAILED_TO_WARM_CACHE,
+                    msg=f"{target.name}: {ex!r}",
+                )
+                return False
+            return True
+
+    results = await asyncio.gather(*map(warm_target, targets))
+    return sum(results)
@@ -1,15 +1,51 @@
 """Dummy FastAPI app to test the cache decorator and functionality."""
 
 import logging
+from collections.abc import Iterator
 from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Union
+from typing import Annotated, Union
 
-from fastapi import FastAPI, Request, Response
+from fastapi import (
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
-from fastapi_redis_cache import cache, cache_one_hour, cache_one_minute
+from fastapi_redis_cache import (
+    CacheMiddleware,
+    CacheRule,
+    Pagination,
+    cache,
+    cache_one_hour,
+    cache_one_minute,
+    invalidates,
+)
 
 app = FastAPI(title="FastAPI Redis Cache Test App")
+app.add_middleware(
+    CacheMiddleware,
+    rules=[
+        CacheRule(path="/middleware/*", expire=60),
+        CacheRule(path="/middleware_vary", vary=["Accept-Language"]),
+    ],
+)
+
+# counts how often the middleware routes resolve their dependency.
+dependency_calls = {"count": 0}
+
+
+def counted_dependency() -> int:
+    """Dependency that counts how often it has been resolved."""
+    dependency_calls["count"] += 1
+    return dependency_calls["count"]
 
 
 @app.get("/cache_never_expire")
@@ -45,6 +81,35 @@ def cache_json_encoder() -> (
     }
 
 
+class Item(BaseModel):
+    """A response model with an aliased field."""
+
+    item_id: int = Field(alias="itemId")
+    name: str
+
+
+@app.get("/cache_model/{item_id}")
+@cache()
+def cache_model(item_id: int, response: Response) -> Item:
+    """Route returning a Pydantic model, serialized using its aliases."""
+    response.headers["X-Item"] = str(item_id)
+    return Item(itemId=item_id, name="item")
+
+
+@app.get("/cache_model_filtered", response_model=Item)
+@cache(response_model=Item)
+def cache_model_filtered(response: Response) -> dict[str, Union[int, str]]:
+    """Route returning a dict with a field the response model leaves out."""
+    return {"itemId": 1, "name": "item", "password_hash": "secret"}
+
+
+@app.get("/cache_json_encoder_untyped")
+@cache()
+def cache_json_encoder_untyped():  # noqa: ANN201
+    """Route without a return type, so its data uses the JSON encoder."""
+    return cache_json_encoder.__wrapped__()
+
+
 @app.get("/cache_one_hour")
 @cache_one_hour()
 def partial_cache_one_hour(response: Response) -> dict[str, Union[bool, str]]:
@@ -63,3 +128,251 @@ def cache_invalid_type(request: Request, response: Response) -> logging.Logger:
     logger = logging.getLogger(__name__)
     logger.setLevel(logging.INFO)
     return logger
+
+
+@app.api_route("/cache_head", methods=["GET", "HEAD"])
+@cache()
+def cache_head(request: Request) -> dict[str, Union[bool, str]]:
+    """Route that can also be requested with HEAD."""
+    return {"success": True, "message": "this data can be fetched with HEAD"}
+
+
+@app.get("/cache_last_modified")
+@cache()
+def cache_last_modified(request: Request) -> dict[str, Union[bool, datetime]]:
+    """Route that returns a `last_modified` value."""
+    return {
+        "success": True,
+        "last_modified": datetime(2021, 4, 20, 7, 17, 17, tzinfo=timezone.utc),
+    }
+
+
+@app.get("/cache_html", response_class=HTMLResponse)
+@cache()
+def cache_html() -> HTMLResponse:
+    """Route that returns an HTML response."""
+    return HTMLResponse("<h1>this data is not JSON</h1>")
+
+
+@app.get("/cache_bytes", response_model=None)
+@cache()
+def cache_bytes() -> bytes:
+    """Route that returns raw bytes."""
+    return b"\x00\x01\x02\xff"
+
+
+# the file sent by the `/cache_file` route.
+served_file = {"path": __file__}
+
+
+@app.get("/cache_file", response_class=FileResponse)
+@cache()
+def cache_file() -> FileResponse:
+    """Route that sends a file."""
+    return FileResponse(served_file["path"], media_type="text/plain")
+
+
+def stream_chunks() -> Iterator[bytes]:
+    """Yield a few chunks of data for the streaming routes."""
+    for chunk in range(5):
+        yield f"chunk {chunk}\n".encode()
+
+
+@app.get("/cache_stream")
+@cache(stream_chunk_size=8)
+def cache_stream() -> StreamingResponse:
+    """Route that returns a streamed response."""
+    return StreamingResponse(stream_chunks(), media_type="text/plain")
+
+
+@app.get("/cache_stream_too_large")
+@cache(max_size=10)
+def cache_stream_too_large() -> StreamingResponse:
+    """Route that streams more data than can be cached."""
+    return StreamingResponse(stream_chunks(), media_type="text/plain")
+
+
+@app.get("/middleware/items")
+def middleware_items(
+    page: int = 1, size: int = 10, calls: int = Depends(counted_dependency)
+) -> dict[str, int]:
+    """Route that is cached by the middleware."""
+    return {"page": page, "size": size, "calls": calls}
+
+
+@app.get("/middleware/session")
+def middleware_session(
+    response: Response,
+    cache_control: str = "",
+    calls: int = Depends(counted_dependency),
+) -> dict[str, int]:
+    """Route whose response is private, so is never cached by the middleware.
+
+    Without a `cache_control` value it sets a session cookie instead.
+    """
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
+    else:
+        response.set_cookie("session", str(calls))
+    return {"calls": calls}
+
+
+@app.get("/middleware_vary")
+def middleware_vary(request: Request) -> dict[str, str]:
+    """Route whose response depends on the Accept-Language header."""
+    return {"language": request.headers.get("accept-language", "")}
+
+
+@app.get("/cache_vary")
+@cache(vary=["Accept-Language"], unordered_args=["ids"])
+def cache_vary(ids: Annotated[list[int], Query()] = []) -> dict[str, list[int]]:
+    """Route that is cached separately for each Accept-Language header."""
+    return {"ids": ids}
+
+
+@app.get("/cache_jitter")
+@cache(expire=100, jitter=0.5)
+def cache_jitter() -> dict[str, bool]:
+    """Route whose cache TTL is randomly reduced by up to half."""
+    return {"success": True}
+
+
+@app.get("/cache_early_refresh")
+@cache(expire=60, early_refresh=1e9)
+def cache_early_refresh() -> dict[str, bool]:
+    """Route that is always refreshed early, since `early_refresh` is huge."""
+    return {"success": True}
+
+
+@app.get("/cache_negative/{item_id}")
+@cache(negative_expire=30, tag="items")
+def cache_negative(item_id: int) -> dict[str, int]:
+    """Route that raises errors, which are cached for a short time."""
+    dependency_calls["count"] += 1
+    if item_id == 0:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid item id")
+    raise HTTPException(status.HTTP_404_NOT_FOUND, "Item not found")
+
+
+@app.get("/cache_empty")
+@cache(negative_expire=30)
+def cache_empty() -> list[int]:
+    """Route with an empty result, which is cached for a short time."""
+    return []
+
+
+@app.get("/cache_analytics")
+@cache(instance="analytics")
+def cache_analytics() -> dict[str, list[int]]:
+    """Route cached by a separate, named cache instance."""
+    return {"totals": [1, 2, 3]}
+
+
+# counts how often the paginated routes compute their full result.
+list_queries = {"count": 0}
+
+
+@app.api_route("/items", methods=["GET", "HEAD"])
+@cache(paginate=Pagination(chunk_size=3))
+def list_items(page: int = 1, size: int = 5) -> list[Item]:
+    """Route returning every item, which is cached once for every page."""
+    list_queries["count"] += 1
+    return [Item(itemId=item_id, name="item") for item_id in range(1, 12)]
+
+
+@app.get("/numbers")
+@cache(
+    paginate=Pagination(page="p", size="n", chunk_size=4, max_size=8),
+    negative_expire=30,
+)
+def list_numbers(  # noqa: ANN201
+    response: Response, p: int = 1, n: int = 10, last: int = 20
+):
+    """Untyped paginated route, with a result that depends on `last`."""
+    list_queries["count"] += 1
+    return list(range(last))
+
+
+class SearchQuery(BaseModel):
+    """A query sent in the body of a search request."""
+
+    text: str
+    limit: int = 10
+
+
+# counts how often the search routes run their query.
+search_queries = {"count": 0}
+
+
+@app.post("/search")
+@cache(methods=["POST"], body_key=True, tag="search")
+def search(query: SearchQuery, page: int = 1) -> dict[str, Union[str, int]]:
+    """Route cached by a digest of the Pydantic model in the request body."""
+    search_queries["count"] += 1
+    return {"text": query.text, "limit": query.limit, "page": page}
+
+
+@app.post("/search_raw")
+@cache(methods=["POST"], body_key=True)
+async def search_raw(request: Request) -> dict[str, list[str]]:
+    """Route cached by a digest of the JSON request body it reads itself."""
+    search_queries["count"] += 1
+    return {"fields": sorted(await request.json())}
+
+
+@app.post("/search_dict")
+@cache(methods=["POST"], body_key=True, tag="search")
+def search_dict(query: dict[str, str]) -> dict[str, list[str]]:
+    """Route cached by a digest of the `dict` in the request body."""
+    search_queries["count"] += 1
+    return {"fields": sorted(query)}
+
+
+@app.post("/upload")
+@cache(methods=["POST"], body_key=True, tag="search")
+async def upload(file: UploadFile) -> dict[str, Union[str, int]]:
+    """Route cached by the name and content of an uploaded file."""
+    search_queries["count"] += 1
+    return {"filename": file.filename or "", "size": len(await file.read())}
+
+
+@app.post("/search_default")
+@cache(methods=["POST"])
+async def search_default(request: Request) -> dict[str, list[str]]:
+    """Route caching POST requests, keyed by their body by default."""
+    search_queries["count"] += 1
+    return {"fields": sorted(await request.json())}
+
+
+@app.post("/search_uncached")
+@cache()
+def search_uncached(query: SearchQuery) -> dict[str, str]:
+    """Route handling POST requests, which are not cached by default."""
+    search_queries["count"] += 1
+    return {"text": query.text}
+
+
+# the data changed (and invalidated) by the `/users` routes.
+users = {1: "Ada", 2: "Grace"}
+
+
+@app.get("/users/{user_id}")
+@cache(tag="user:{user_id}")
+def get_user(user_id: int) -> dict[str, str]:
+    """Route cached with a tag that includes the user id."""
+    return {"name": users.get(user_id, "")}
+
+
+@app.put("/users/{user_id}")
+@invalidates(tags=["user:{user_id}"])
+def update_user(user_id: int, name: str) -> dict[str, str]:
+    """Route that changes a user, invalidating the cached response."""
+    users[user_id] = name
+    return {"name": name}
+
+
+@app.delete("/users/{user_id}")
+@invalidates(tags=["user:{user_id}"], background=True)
+async def delete_user(user_id: int) -> dict[str, bool]:
+    """Route that deletes a user, invalidating in a background task."""
+    return {"deleted": users.pop(user_id, None) is not None}
@@ -0,0 +1,188 @@
+"""Test the report of the memory used by the cached responses."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fastapi_redis_cache import FastApiRedisCache, MemoryBackend
+from fastapi_redis_cache.analytics import (
+    KeyGroup,
+    get_distribution,
+    parse_cache_key,
+    scan_memory,
+)
+from fastapi_redis_cache.cli import main
+from tests.main import app
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize(
+    ("key", "expected"),
+    [
+        (
+            "tests.main.get_user(user_id=1)::user:1",
+            ("tests.main.get_user", "user:1"),
+        ),
+        (
+            "api:tests.main.cache_vary(ids=[1])[accept-language=en]",
+            ("tests.main.cache_vary", None),
+        ),
+        (
+            "api:tests.main.cache_model(#0a1b2c)::items",
+            ("tests.main.cache_model", "items"),
+        ),
+        ("api:GET:/middleware/items?page=2", ("GET:/middleware/items", None)),
+    ],
+)
+def test_parse_cache_key(key, expected) -> None:
+    """Test the function (or path) and tag are parsed from cache keys."""
+    assert parse_cache_key(key, "api") == expected
+
+
+def test_get_distribution() -> None:
+    """Test percentiles are taken by nearest rank."""
+    assert get_distribution(list(range(1, 101))) == {
+        "p50": 50,
+        "p90": 90,
+        "p99": 99,
+        "max": 100,
+    }
+    assert get_distribution([7]) == {"p50": 7, "p90": 7, "p99": 7, "max": 7}
+    assert get_distribution([]) == {}
+
+
+def test_key_group_largest() -> None:
+    """Test only the largest entries are kept, and sizes are estimated."""
+    group = KeyGroup("func", top=2)
+    group.keys = 4
+    for size in (10, 30, 20):
+        group.add(f"key{size}", size, 60)
+    assert group.to_dict()["largest"] == [
+        {"key": "key30", "size": 30},
+        {"key": "key20", "size": 20},
+    ]
+    assert group.total_size == 80  # noqa: PLR2004
+
+
+def test_memory_report() -> None:
+    """Test cached responses are grouped by function and tag."""
+    redis_cache = FastApiRedisCache()
+    for user_id in (1, 2):
+        client.get(f"/users/{user_id}")
+    client.get("/cache_never_expire")
+    report = redis_cache.memory_report(max_keys_per_second=None)
+    assert report.complete
+    groups = {
+        (group.name, group.tag): group for group in report.groups.values()
+    }
+    assert groups[("tests.main.get_user", "user:1")].keys == 1
+    assert groups[("tests.main.get_user", "user:2")].keys == 1
+    never_expire = groups[("tests.main.cache_never_expire", None)]
+    assert never_expire.persistent == 0
+    assert never_expire.to_dict()["size"]["max"] > 0
+    assert never_expire.to_dict()["ttl"]["max"] > 0
+
+
+def test_memory_report_prefix_and_internal_keys() -> None:
+    """Test only keys under the prefix are scanned, skipping bookkeeping."""
+    backend = MemoryBackend()
+    backend.set_entry("api:tests.main.cache_html()", {"data": "<h1>"}, 60)
+    backend.set_entry("api:__keys__", {"api:x(#1)": "api:x(a=1)"}, 60)
+    backend.set_entry("other:tests.main.cache_html()", {"data": "x"}, 60)
+    *_, report = scan_memory(backend, "api", max_keys_per_second=None)
+    assert list(report.groups) == [("tests.main.cache_html", None)]
+    assert report.scanned == 2  # noqa: PLR2004
+
+
+def test_memory_report_sampling() -> None:
+    """Test unsampled keys are counted, with their size estimated."""
+    backend = MemoryBackend()
+    for number in range(10):
+        backend.set_entry(f"func(n={number})", {"data": "x"}, 60)
+    *_, report = scan_memory(
+        backend, sample_rate=1e-9, max_keys_per_second=None
+    )
+    (group,) = report.groups.values()
+    assert group.keys == 10  # noqa: PLR2004
+    assert report.sampled == 0
+    assert group.total_size == 0
+
+
+def test_scan_memory_rate_limit(monkeypatch) -> None:
+    """Test the scan pauses between batches to stay under the rate limit."""
+    delays: list[float] = []
+    monkeypatch.setattr("time.sleep", delays.append)
+    redis_cache = FastApiRedisCache()
+    assert redis_cache.backend
+    for number in range(6):
+        redis_cache.backend.set_entry(f"func(n={number})", {"data": "x"}, 60)
+    progress = [
+        (report.scanned, report.complete)
+        for report in redis_cache.scan_memory(
+            batch_size=2, max_keys_per_second=10
+        )
+    ]
+    assert progress[-1] == (6, True)
+    assert [scanned for scanned, _ in progress] == sorted(
+        scanned for scanned, _ in progress
+    )
+    assert delays == sorted(delays)
+    assert 0.5 < delays[-1] <= 0.6  # noqa: PLR2004
+
+
+def test_scan_memory_async(monkeypatch) -> None:
+    """Test the async scan pauses with `asyncio.sleep`, not `time.sleep`."""
+    delays: list[float] = []
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr("asyncio.sleep", sleep)
+    monkeypatch.setattr("time.sleep", pytest.fail)
+    redis_cache = FastApiRedisCache()
+    for user_id in (1, 2, 3):
+        client.get(f"/users/{user_id}")
+
+    async def scan() -> list[int]:
+        return [
+            report.scanned
+            async for report in redis_cache.scan_memory_async(
+                batch_size=1, max_keys_per_second=10
+            )
+        ]
+
+    progress = asyncio.run(scan())
+    assert progress == [1, 2, 3, 3]
+    assert len(delays) == 3  # noqa: PLR2004
+    report = asyncio.run(
+        redis_cache.memory_report_async(max_keys_per_second=None)
+    )
+    assert report.complete
+    assert ("tests.main.get_user", "user:3") in report.groups
+
+
+def test_memory_report_not_connected() -> None:
+    """Test the report is empty if the cache isn't connected."""
+    redis_cache = FastApiRedisCache("not_connected")
+    for report in (
+        redis_cache.memory_report(),
+        asyncio.run(redis_cache.memory_report_async()),
+    ):
+        assert report.scanned == 0
+        assert not report.groups
+
+
+def test_cli_report(capsys) -> None:
+    """Test the `report` command prints a table, or JSON."""
+    client.get("/users/1")
+    assert main(["report", "--rate", "0"]) == 0
+    out = capsys.readouterr().out
+    assert "tests.main.get_user [user:1]" in out
+    assert "Scanned" in out
+    assert main(["report", "--json", "--top", "1"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["complete"]
+    assert any(group["tag"] == "user:1" for group in report["groups"])
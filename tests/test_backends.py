@@ -0,0 +1,236 @@
+"""Test the storage backends against the same behavior."""
+
+import time
+
+import pytest
+from fakeredis import FakeRedis
+from fastapi.testclient import TestClient
+
+from fastapi_redis_cache import (
+    FastApiRedisCache,
+    MemoryBackend,
+    PackedRedisBackend,
+    RedisBackend,
+    SQLiteBackend,
+)
+from fastapi_redis_cache.backends import Backend
+from fastapi_redis_cache.backends.base import (
+    TTL_MISSING,
+    TTL_PERSISTENT,
+    pack_entry,
+)
+from fastapi_redis_cache.backends.packed import EXPIRES_AT
+from tests.main import app
+
+client = TestClient(app)
+
+FIELDS = ["data", "etag"]
+
+
+@pytest.fixture(params=["redis", "packed", "memory", "sqlite"])
+def backend(request, tmp_path) -> Backend:
+    """Return an empty backend of each type."""
+    if request.param == "redis":
+        return RedisBackend(FakeRedis())
+    if request.param == "packed":
+        return PackedRedisBackend(FakeRedis(), buckets=8)
+    if request.param == "memory":
+        return MemoryBackend()
+    return SQLiteBackend(tmp_path / "cache.db")
+
+
+def test_set_and_get_entry(backend) -> None:
+    """Test an entry is returned with its TTL, leaving out missing fields."""
+    assert backend.ping()
+    assert backend.set_entry("key", {"data": "{}", "etag": b"W/1"}, 60)
+    ttl, entry = backend.get_entry("key", [*FIELDS, "headers"])
+    assert 0 < ttl <= 60  # noqa: PLR2004
+    assert entry == {"data": b"{}", "etag": b"W/1"}
+    assert backend.get_entry("missing", FIELDS) == (TTL_MISSING, {})
+
+
+def test_set_entry_replaces_fields(backend) -> None:
+    """Test fields of the previous entry are removed."""
+    backend.set_entry("key", {"data": "1", "etag": "a"}, 60)
+    backend.set_entry("key", {"data": "2"}, 60)
+    assert backend.get_entry("key", FIELDS)[1] == {"data": b"2"}
+
+
+def test_get_entries(backend) -> None:
+    """Test several entries are returned in the order of their keys."""
+    backend.set_entry("a", {"data": "1"}, 60)
+    backend.set_entry("c", {"data": "3"}, 60)
+    results = backend.get_entries(["a", "b", "c"], FIELDS)
+    assert [entry for _, entry in results] == [
+        {"data": b"1"},
+        {},
+        {"data": b"3"},
+    ]
+
+
+def test_entry_expires(backend) -> None:
+    """Test an entry is gone once its expiry time has passed."""
+    backend.set_entry("key", {"data": "1"}, 1)
+    time.sleep(1.1)
+    assert backend.get_entry("key", FIELDS) == (TTL_MISSING, {})
+
+
+def test_update_entry(backend) -> None:
+    """Test fields are added without an expiry if there was no entry."""
+    backend.update_entry("hash", {"a": "1"})
+    backend.update_entry("hash", {"b": "2"})
+    assert backend.get_entry("hash", ["a", "b"]) == (
+        TTL_PERSISTENT,
+        {"a": b"1", "b": b"2"},
+    )
+
+
+def test_tags(backend) -> None:
+    """Test deleting a tag deletes the entries of its keys."""
+    backend.set_entry("a", {"data": "1"}, 60, "tag")
+    backend.set_entry("b", {"data": "2"}, 60)
+    backend.add_to_tag("tag", "b")
+    assert backend.get_tag("tag") == {b"a", b"b"}
+    assert backend.delete_tags(["tag"]) == 2  # noqa: PLR2004
+    assert backend.get_tag("tag") == set()
+    assert backend.get_entry("a", FIELDS) == (TTL_MISSING, {})
+
+
+def test_delete_tags(backend) -> None:
+    """Test several tags and keys are deleted together."""
+    backend.set_entry("a", {"data": "1"}, 60, "tag1")
+    backend.set_entry("b", {"data": "2"}, 60, "tag2")
+    backend.set_entry("c", {"data": "3"}, 60)
+    backend.set_entry("d", {"data": "4"}, 60)
+    assert backend.delete_tags(["tag1", "tag2", "tag3"], ["c"]) == 3  # noqa: PLR2004
+    assert backend.get_tag("tag1") == set()
+    assert [entry for _, entry in backend.get_entries("abcd", FIELDS)] == [
+        {},
+        {},
+        {},
+        {"data": b"4"},
+    ]
+    assert backend.delete_tags([]) == 0
+
+
+def test_delete(backend) -> None:
+    """Test only existing entries are counted as deleted."""
+    backend.set_entry("a", {"data": "1"}, 60)
+    assert backend.delete("a", "b") == 1
+    assert backend.delete() == 0
+
+
+def test_scan_and_inspect(backend) -> None:
+    """Test matching keys are scanned in batches, with their size and TTL."""
+    for number in range(5):
+        backend.set_entry(f"app:{number}", {"data": "x" * number}, 60)
+    backend.set_entry("other:1", {"data": "1"}, 60)
+    backend.add_to_tag("app:tag", "app:0")
+    batches = list(backend.scan("app:*", 2))
+    keys = sorted(key for batch in batches for key in batch)
+    assert keys == [f"app:{number}" for number in range(5)]
+    assert all(len(batch) <= 2 for batch in batches)  # noqa: PLR2004
+    results = backend.inspect(["app:0", "app:4", "missing"])
+    assert [ttl > 0 for _, ttl in results] == [True, True, False]
+    assert results[0][0] < results[1][0]
+    assert results[2] == (0, TTL_MISSING)
+
+
+def test_memory_backend_max_entries() -> None:
+    """Test the least recently used entry is removed when full."""
+    backend = MemoryBackend(max_entries=2)
+    backend.set_entry("a", {"data": "1"}, 60)
+    backend.set_entry("b", {"data": "2"}, 60)
+    backend.get_entry("a", FIELDS)
+    backend.set_entry("c", {"data": "3"}, 60)
+    assert backend.get_entry("b", FIELDS) == (TTL_MISSING, {})
+    assert backend.get_entry("a", FIELDS)[1] == {"data": b"1"}
+
+
+def test_sqlite_backend_persists(tmp_path) -> None:
+    """Test entries are still cached after the database is reopened."""
+    backend = SQLiteBackend(tmp_path / "cache.db")
+    backend.set_entry("a", {"data": "1"}, 60)
+    backend.set_entry("b", {"data": "2"}, -1)
+    backend.close()
+    backend = SQLiteBackend(tmp_path / "cache.db")
+    assert backend.purge_expired() == 1
+    assert backend.get_entry("a", FIELDS)[1] == {"data": b"1"}
+
+
+@pytest.mark.parametrize("field_expiry", [False, True])
+def test_packed_backend_layouts(field_expiry) -> None:
+    """Test small entries are packed, and large ones stored as plain hashes."""
+    redis = FakeRedis()
+    backend = PackedRedisBackend(redis, buckets=4, field_expiry=field_expiry)
+    bucket = backend.bucket("key")
+    backend.set_entry("key", {"data": "1", "etag": "a"}, 60, "tag")
+    assert not redis.exists("key")
+    assert redis.hexists(bucket, "key")
+    if field_expiry:
+        assert redis.execute_command("HTTL", bucket, "FIELDS", 1, "key")[0] > 0
+    else:
+        assert 0 < redis.ttl(bucket) <= 60  # noqa: PLR2004
+    ttl, entry = backend.get_entry("key", FIELDS)
+    assert 0 < ttl <= 60  # noqa: PLR2004
+    assert entry == {"data": b"1", "etag": b"a"}
+    backend.set_entry("key", {"data": "x" * 500}, 60)
+    assert redis.exists("key")
+    assert not redis.hexists(bucket, "key")
+    assert backend.get_entry("key", ["data"])[1] == {"data": b"x" * 500}
+    backend.set_entry("key", {"data": "2"}, 60)
+    assert not redis.exists("key")
+    assert backend.get_entry("key", ["data"])[1] == {"data": b"2"}
+
+
+def test_packed_backend_expiry() -> None:
+    """Test an expired packed entry is not returned, even if still stored."""
+    redis = FakeRedis()
+    backend = PackedRedisBackend(redis, buckets=1)
+    backend.set_entry("short", {"data": "1"}, 1)
+    backend.set_entry("long", {"data": "2"}, 60)
+    time.sleep(1.1)
+    assert redis.hexists(backend.bucket("short"), "short")
+    assert backend.get_entry("short", FIELDS) == (TTL_MISSING, {})
+    assert backend.get_entry("long", FIELDS)[1] == {"data": b"2"}
+    assert backend.inspect(["short"]) == [(0, TTL_MISSING)]
+    assert backend.purge_expired() == 1
+    assert redis.hkeys(backend.bucket("long")) == [b"long"]
+
+
+def test_packed_backend_prunes_on_write() -> None:
+    """Test the expired entries of a bucket are removed when it's written."""
+    redis = FakeRedis()
+    expired = EXPIRES_AT.pack(time.time() - 1) + pack_entry({"data": "1"})
+    backend = PackedRedisBackend(redis, buckets=1, prune_interval=0)
+    redis.hset(backend.bucket("short"), "short", expired)
+    backend.set_entry("long", {"data": "2"}, 60)
+    assert redis.hkeys(backend.bucket("long")) == [b"long"]
+    redis.hset(backend.bucket("short"), "short", expired)
+    backend.prune_interval = 60
+    backend.set_entry("other", {"data": "3"}, 60)
+    # the bucket was pruned less than `prune_interval` ago.
+    assert redis.hexists(backend.bucket("short"), "short")
+
+
+@pytest.mark.parametrize(
+    "backend_type", [MemoryBackend, SQLiteBackend, PackedRedisBackend]
+)
+def test_cache_with_backend(backend_type, tmp_path) -> None:
+    """Test responses are cached using a backend other than the default."""
+    backend = (
+        MemoryBackend()
+        if backend_type is MemoryBackend
+        else PackedRedisBackend(FakeRedis())
+        if backend_type is PackedRedisBackend
+        else SQLiteBackend(tmp_path / "cache.db")
+    )
+    FastApiRedisCache().init(host_url="", backend=backend)
+    response = client.get("/cache_never_expire")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    response = client.get("/cache_never_expire")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json() == {
+        "success": True,
+        "message": "this data can be cached indefinitely",
+    }
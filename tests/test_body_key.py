@@ -0,0 +1,115 @@
+"""Test caching POST requests, keyed by a digest of the request body."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fastapi_redis_cache import FastApiRedisCache
+from tests.main import app, search_queries
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _reset_queries() -> None:
+    """Reset the count of search queries before each test."""
+    search_queries["count"] = 0
+
+
+def test_post_cached_by_body_model() -> None:
+    """Test equal body models share a cached response, whatever the JSON."""
+    response = client.post("/search", json={"text": "cats"})
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.json() == {"text": "cats", "limit": 10, "page": 1}
+    response = client.post("/search", json={"limit": 10, "text": "cats"})
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json() == {"text": "cats", "limit": 10, "page": 1}
+    assert search_queries["count"] == 1
+    (key,) = FastApiRedisCache().get_tagged_keys("search")
+    assert "(query=#" in key.decode()
+    assert "cats" not in key.decode()
+
+
+@pytest.mark.parametrize(
+    ("url", "body"),
+    [
+        ("/search", {"text": "dogs"}),
+        ("/search", {"text": "cats", "limit": 5}),
+        ("/search?page=2", {"text": "cats"}),
+    ],
+)
+def test_post_cached_separately(url: str, body: dict[str, str]) -> None:
+    """Test a different body, or query argument, is cached separately."""
+    client.post("/search", json={"text": "cats"})
+    response = client.post(url, json=body)
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert search_queries["count"] == 2  # noqa: PLR2004
+
+
+def test_post_keyed_by_body_by_default() -> None:
+    """Test POST requests are keyed by their body without `body_key`."""
+    response = client.post("/search_default", json={"a": 1})
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    response = client.post("/search_default", json={"b": 1})
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.json() == {"fields": ["b"]}
+    response = client.post("/search_default", json={"a": 1})
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json() == {"fields": ["a"]}
+    assert search_queries["count"] == 2  # noqa: PLR2004
+
+
+def test_post_cached_by_raw_body() -> None:
+    """Test the JSON body is canonicalized for routes that read it directly."""
+    response = client.post("/search_raw", content=b'{"b": 1, "a": [2]}')
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.json() == {"fields": ["a", "b"]}
+    response = client.post("/search_raw", content=b'{"a":[2],"b":1}')
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    response = client.post("/search_raw", content=b'{"a": [3], "b": 1}')
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert search_queries["count"] == 2  # noqa: PLR2004
+
+
+def test_post_cached_by_body_dict() -> None:
+    """Test a `dict` from the body is only in the key as a digest."""
+    response = client.post("/search_dict", json={"b": "1", "a": "2"})
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    response = client.post("/search_dict", json={"a": "2", "b": "1"})
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json() == {"fields": ["a", "b"]}
+    assert search_queries["count"] == 1
+    (key,) = FastApiRedisCache().get_tagged_keys("search")
+    assert "(query=#" in key.decode()
+    assert "__body__" not in key.decode()
+
+
+def test_post_cached_by_upload() -> None:
+    """Test uploaded files are cached by their name and content."""
+    response = client.post("/upload", files={"file": ("a.txt", b"abc")})
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.json() == {"filename": "a.txt", "size": 3}
+    response = client.post("/upload", files={"file": ("a.txt", b"abc")})
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    response = client.post("/upload", files={"file": ("a.txt", b"abcd")})
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.json() == {"filename": "a.txt", "size": 4}
+    response = client.post("/upload", files={"file": ("b.txt", b"abc")})
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert search_queries["count"] == 3  # noqa: PLR2004
+
+
+def test_post_invalidated_by_tag() -> None:
+    """Test cached POST responses are invalidated by their tag."""
+    client.post("/search", json={"text": "cats"})
+    assert FastApiRedisCache().invalidate(tags=["search"]) == 1
+    response = client.post("/search", json={"text": "cats"})
+    assert response.headers["x-fastapi-cache"] == "Miss"
+
+
+def test_post_not_cached_by_default() -> None:
+    """Test POST requests are only cached when the decorator allows them."""
+    for _ in range(2):
+        response = client.post("/search_uncached", json={"text": "cats"})
+        assert "x-fastapi-cache" not in response.headers
+    assert search_queries["count"] == 2  # noqa: PLR2004
@@ -1,18 +1,39 @@
 """Test suite for the FastAPI-Cache package."""
 
+import asyncio
 import datetime
 import json
+import logging
 import re
 import time
 from decimal import Decimal
 
 import pytest
 from fastapi import status
+from fastapi.responses import FileResponse
 from fastapi.testclient import TestClient
 
-from fastapi_redis_cache.client import HTTP_TIME
+from fastapi_redis_cache import CompressedJsonCodec, FastApiRedisCache, cache
+from fastapi_redis_cache.cache import get_response_codec
+from fastapi_redis_cache.client import (
+    ENTRY_DATA,
+    ENTRY_DELTA,
+    ENTRY_ETAG,
+    HTTP_TIME,
+)
+from fastapi_redis_cache.responses import (
+    DEFAULT_MAX_CACHEABLE_SIZE,
+    cache_raw_response,
+)
 from fastapi_redis_cache.util import ONE_HOUR_IN_SECONDS, deserialize_json
-from tests.main import app
+from tests.main import (
+    app,
+    cache_analytics,
+    cache_early_refresh,
+    cache_file,
+    dependency_calls,
+    served_file,
+)
 
 client = TestClient(app)
 MAX_AGE_REGEX = re.compile(r"max-age=(?P<ttl>\d+)")
@@ -138,9 +159,9 @@ def test_cache_expires() -> None:
 def test_cache_json_encoder() -> None:
     """Test the custom JSON encoder and object_hook functions."""
     # In order to verify that our custom BetterJsonEncoder is working correctly,
-    # the  /cache_json_encoder endpoint returns a dict containing
+    # the  /cache_json_encoder_untyped endpoint returns a dict containing
     # datetime.datetime, datetime.date and decimal.Decimal objects.
-    response = client.get("/cache_json_encoder")
+    response = client.get("/cache_json_encoder_untyped")
     assert response.status_code == status.HTTP_200_OK
     response_json = response.json()
     assert response_json == {
@@ -170,6 +191,64 @@ def test_cache_json_encoder() -> None:
     assert json_dict["final_calc"] == Decimal(3.14)
 
 
+def test_cache_return_type() -> None:
+    """Test typed responses are cached as the JSON FastAPI would send."""
+    expected = {
+        "success": True,
+        "start_time": "2021-04-20T07:17:17Z",
+        "finish_by": "2021-04-21",
+        "final_calc": "3.140000000000000124344978758017532527446746826171875",
+    }
+    response = client.get("/cache_json_encoder")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.json() == expected
+    etag = response.headers["etag"]
+    response = client.get("/cache_json_encoder")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.headers["etag"] == etag
+    assert response.json() == expected
+
+
+def test_cache_response_model() -> None:
+    """Test a cached model is sent with its aliases, as FastAPI sends it."""
+    response = client.get("/cache_model/1")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.json() == {"itemId": 1, "name": "item"}
+    response = client.get("/cache_model/1")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json() == {"itemId": 1, "name": "item"}
+
+
+def test_cache_response_model_filters_fields() -> None:
+    """Test fields left out of the response model are never cached."""
+    for cache_result in ("Miss", "Hit"):
+        response = client.get("/cache_model_filtered")
+        assert response.headers["x-fastapi-cache"] == cache_result
+        assert response.json() == {"itemId": 1, "name": "item"}
+
+
+def test_get_response_codec() -> None:
+    """Test only types Pydantic can handle get a schema codec."""
+
+    def untyped():  # noqa: ANN202
+        """Return nothing."""
+
+    def raw() -> bytes:
+        """Return nothing."""
+        return b""
+
+    def logger() -> logging.Logger:
+        """Return a logger."""
+        return logging.getLogger()
+
+    assert get_response_codec(untyped) is None
+    assert get_response_codec(raw) is None
+    assert get_response_codec(logger) is None
+    codec = get_response_codec(untyped, list[int])
+    assert codec is not None
+    assert codec.loads(b"[1]") == [1]
+
+
 def test_cache_control_no_cache() -> None:
     """Test the cache-control header field containing "no-cache"."""
     # Simple test that verifies if a request is recieved with the cache-control
@@ -296,3 +375,253 @@ def test_cache_invalid_type() -> None:
     # note: I removed all the other assertions from this test, since after the
     # excepion is raised, the response is not returned and in fact none of the
     # assertions are actually executed.
+
+
+def test_head_request(mocker) -> None:
+    """Test a HEAD request is answered from the metadata alone."""
+    response = client.get("/cache_head")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    etag = response.headers["etag"]
+
+    fetch_entry = mocker.spy(FastApiRedisCache, "fetch_entry")
+    response = client.head("/cache_head")
+    assert response.status_code == status.HTTP_200_OK
+    assert not response.content
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.headers["etag"] == etag
+    fetch_entry.assert_called_once()
+    assert ENTRY_DATA not in fetch_entry.call_args.args[2]
+
+
+def test_if_none_match_skips_cached_body(mocker) -> None:
+    """Test a matching If-None-Match request does not fetch the cached body."""
+    response = client.get("/cache_never_expire")
+    etag = response.headers["etag"]
+
+    fetch_entry = mocker.spy(FastApiRedisCache, "fetch_entry")
+    response = client.get(
+        "/cache_never_expire", headers={"if-none-match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    fetch_entry.assert_called_once()
+    assert ENTRY_DATA not in fetch_entry.call_args.args[2]
+
+
+def test_if_modified_since() -> None:
+    """Test the If-Modified-Since header field."""
+    response = client.get("/cache_last_modified")
+    assert response.status_code == status.HTTP_200_OK
+    last_modified = response.headers["last-modified"]
+    assert last_modified == "Tue, 20 Apr 2021 07:17:17 GMT"
+
+    response = client.get(
+        "/cache_last_modified", headers={"if-modified-since": last_modified}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+    assert response.headers["x-fastapi-cache"] == "Hit"
+
+    response = client.get(
+        "/cache_last_modified",
+        headers={"if-modified-since": "Mon, 19 Apr 2021 07:17:17 GMT"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["success"] is True
+
+
+def test_cache_html_response() -> None:
+    """Test an HTML response is cached and replayed as is."""
+    response = client.get("/cache_html")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.text == "<h1>this data is not JSON</h1>"
+    etag = response.headers["etag"]
+
+    response = client.get("/cache_html")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.headers["content-type"].startswith("text/html")
+    assert response.headers["etag"] == etag
+    assert response.text == "<h1>this data is not JSON</h1>"
+
+
+def test_cache_bytes_response() -> None:
+    """Test raw bytes are cached and sent as an octet stream."""
+    for cache_status in ["Miss", "Hit"]:
+        response = client.get("/cache_bytes")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["x-fastapi-cache"] == cache_status
+        assert response.headers["content-type"] == "application/octet-stream"
+        assert response.content == b"\x00\x01\x02\xff"
+
+
+def test_cache_file_response(tmp_path, monkeypatch) -> None:
+    """Test a file is cached, with the ETag of the response first sent."""
+    path = tmp_path / "data.txt"
+    path.write_text("file data")
+    monkeypatch.setitem(served_file, "path", str(path))
+    response = client.get("/cache_file")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.text == "file data"
+    etag = response.headers["etag"]
+    redis_cache = FastApiRedisCache()
+    key = redis_cache.get_cache_key(None, cache_file.__wrapped__)
+    assert redis_cache.fetch_entry(key)[1][ENTRY_ETAG] == etag
+
+    response = client.get("/cache_file")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.headers["etag"] == etag
+    assert response.text == "file data"
+
+
+def test_cache_missing_file_response(tmp_path) -> None:
+    """Test a file that can't be read is not cached, without an error."""
+    redis_cache = FastApiRedisCache()
+    response = asyncio.run(
+        cache_raw_response(
+            redis_cache,
+            "missing",
+            FileResponse(tmp_path / "missing.txt"),
+            60,
+            None,
+            DEFAULT_MAX_CACHEABLE_SIZE,
+        )
+    )
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert redis_cache.fetch_entry("missing") == (-2, {})
+
+
+def test_cache_streaming_response() -> None:
+    """Test a streamed response is cached once it has been sent."""
+    expected = "".join(f"chunk {chunk}\n" for chunk in range(5))
+    response = client.get("/cache_stream")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.text == expected
+
+    response = client.get("/cache_stream")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text == expected
+
+
+def test_cache_streaming_response_too_large() -> None:
+    """Test a streamed response larger than `max_size` is not cached."""
+    for _ in range(2):
+        response = client.get("/cache_stream_too_large")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["x-fastapi-cache"] == "Miss"
+        assert response.text.startswith("chunk 0")
+
+
+def test_cache_vary() -> None:
+    """Test the `vary` headers and `unordered_args` of the cache key."""
+    response = client.get(
+        "/cache_vary?ids=2&ids=1", headers={"Accept-Language": "en"}
+    )
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.headers["vary"] == "Accept-Language"
+
+    response = client.get(
+        "/cache_vary?ids=2&ids=1", headers={"Accept-Language": "fr"}
+    )
+    assert response.headers["x-fastapi-cache"] == "Miss"
+
+    response = client.get(
+        "/cache_vary?ids=1&ids=2", headers={"Accept-Language": "fr"}
+    )
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json() == {"ids": [2, 1]}
+
+
+def test_cache_jitter() -> None:
+    """Test the TTL is reduced by no more than the `jitter` fraction."""
+    response = client.get("/cache_jitter")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    match = MAX_AGE_REGEX.search(response.headers["cache-control"])
+    assert match
+    ttl = int(match["ttl"])
+    assert 50 <= ttl <= 100  # noqa: PLR2004
+
+
+def test_cache_jitter_must_be_a_fraction() -> None:
+    """Test an invalid `jitter` is rejected when the route is decorated."""
+    with pytest.raises(ValueError, match="jitter"):
+        cache(jitter=1)
+
+
+def test_cache_early_refresh() -> None:
+    """Test a cached response is recomputed early, storing its compute time."""
+    for _ in range(2):
+        response = client.get("/cache_early_refresh")
+        assert response.headers["x-fastapi-cache"] == "Miss"
+    key = FastApiRedisCache().get_cache_key(
+        None, cache_early_refresh.__wrapped__
+    )
+    _, entry = FastApiRedisCache().fetch_entry(key, [ENTRY_DELTA])
+    assert float(entry[ENTRY_DELTA]) > 0
+
+
+def test_cache_negative_error() -> None:
+    """Test selected errors are cached, and replayed, as negative entries."""
+    response = client.get("/cache_negative/7")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    calls = dependency_calls["count"]
+
+    response = client.get("/cache_negative/7")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json() == {"detail": "Item not found"}
+    assert dependency_calls["count"] == calls
+
+    redis_cache = FastApiRedisCache()
+    assert not redis_cache.get_tagged_keys("items")
+    assert redis_cache.clear_negative_entries("items") == 1
+    response = client.get("/cache_negative/7")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+
+
+def test_cache_negative_other_errors() -> None:
+    """Test errors with other status codes are not cached."""
+    for _ in range(2):
+        response = client.get("/cache_negative/0")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "x-fastapi-cache" not in response.headers
+
+
+def test_cache_negative_empty_result() -> None:
+    """Test an empty result is cached using the negative TTL."""
+    response = client.get("/cache_empty")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    response = client.get("/cache_empty")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json() == []
+    match = MAX_AGE_REGEX.search(response.headers["cache-control"])
+    assert match
+    ttl = int(match["ttl"])
+    assert ttl <= 30  # noqa: PLR2004
+
+
+def test_cache_named_instance() -> None:
+    """Test a route uses the cache instance given to the decorator."""
+    analytics = FastApiRedisCache("analytics")
+    analytics.init(
+        host_url="",
+        prefix="analytics",
+        codec=CompressedJsonCodec(),
+        default_expire=60,
+    )
+    response = client.get("/cache_analytics")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    response = client.get("/cache_analytics")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json() == {"totals": [1, 2, 3]}
+    match = MAX_AGE_REGEX.search(response.headers["cache-control"])
+    assert match
+    ttl = int(match["ttl"])
+    assert ttl <= 60  # noqa: PLR2004
+
+    key = analytics.get_cache_key(None, cache_analytics.__wrapped__)
+    assert key.startswith("analytics:")
+    assert analytics.check_cache(key)[1]
+    assert not FastApiRedisCache().check_cache(key)[1]
@@ -0,0 +1,81 @@
+"""Test the FastApiRedisCache client directly."""
+
+import json
+
+import pytest
+
+from fastapi_redis_cache import CompressedJsonCodec, FastApiRedisCache
+from fastapi_redis_cache.util import deserialize_json, serialize_json
+
+
+@pytest.fixture(params=[False, True], ids=["pipeline", "scripts"])
+def redis_cache(request) -> FastApiRedisCache:
+    """Return the cache client, using both pipelines and Lua scripts."""
+    redis_cache = FastApiRedisCache()
+    redis_cache.init(host_url="", use_scripts=request.param)
+    return redis_cache
+
+
+def test_add_to_cache_sets_value_ttl_and_tag(redis_cache) -> None:
+    """Test the value, expiry and tag membership are all written."""
+    key = "test_client.add(a=1)::tagged"
+    assert redis_cache.add_to_cache(key, {"a": 1}, 60, "tagged")
+
+    ttl, in_cache = redis_cache.check_cache(key)
+    assert 0 < ttl <= 60  # noqa: PLR2004
+    assert deserialize_json(in_cache) == {"a": 1}
+    assert key.encode() in redis_cache.get_tagged_keys("tagged")
+
+
+def test_check_cache_missing_key(redis_cache) -> None:
+    """Test a key that is not in the cache returns no value."""
+    ttl, in_cache = redis_cache.check_cache("test_client.missing()")
+    assert ttl < 0
+    assert not in_cache
+
+
+def test_scripts_are_registered_only_when_enabled(redis_cache) -> None:
+    """Test the Lua scripts are only registered when `use_scripts` is set."""
+    fetch_script = redis_cache.backend._fetch_script  # noqa: SLF001
+    store_script = redis_cache.backend._store_script  # noqa: SLF001
+    assert bool(fetch_script) is redis_cache.use_scripts
+    assert bool(store_script) is redis_cache.use_scripts
+
+
+def get_report(filters: str, page: int = 1) -> None:
+    """An example path function."""
+
+
+def test_hash_keys(redis_cache) -> None:
+    """Test hashed keys have a fixed length and keep the name and tag."""
+    redis_cache.init(host_url="", prefix="api", hash_keys=True, key_debug=True)
+    short_key = redis_cache.get_cache_key("reports", get_report, "a")
+    long_key = redis_cache.get_cache_key("reports", get_report, "a" * 5000)
+    assert len(short_key) == len(long_key)
+    assert short_key != long_key
+    assert short_key.startswith("api:tests.test_client.get_report(#")
+    assert short_key.endswith(")::reports")
+    assert redis_cache.lookup_key(short_key) == (
+        "api:tests.test_client.get_report(filters=a,page=1)::reports"
+    )
+
+
+def test_compressed_json_codec(redis_cache) -> None:
+    """Test values are compressed in Redis and decoded when read."""
+    redis_cache.init(host_url="", codec=CompressedJsonCodec())
+    key = "test_client.compressed()"
+    value = {"numbers": list(range(100))}
+    assert redis_cache.add_to_cache(key, value, 60)
+
+    _, in_cache = redis_cache.check_cache(key)
+    assert len(in_cache) < len(serialize_json(value))
+    assert redis_cache.codec.loads(in_cache) == value
+    assert json.loads(redis_cache.codec.to_json(in_cache)) == value
+
+
+def test_named_instances() -> None:
+    """Test named instances are separate singletons from the default one."""
+    analytics = FastApiRedisCache("analytics")
+    assert analytics is FastApiRedisCache("analytics")
+    assert analytics is not FastApiRedisCache()
+    assert analytics.name == "analytics"
@@ -0,0 +1,102 @@
+"""Test the cache shared by the processes on one host."""
+
+import re
+import time
+
+import pytest
+from fastapi import Response
+from fastapi.testclient import TestClient
+
+from fastapi_redis_cache import FastApiRedisCache, HostCache
+from fastapi_redis_cache.util import ONE_HOUR_IN_SECONDS
+from tests.main import app, cache_expires, partial_cache_one_hour
+
+client = TestClient(app)
+
+
+@pytest.fixture()
+def host_cache(tmp_path) -> HostCache:
+    """Return a small host cache."""
+    return HostCache(tmp_path / "host-cache", slots=8, slot_size=1024)
+
+
+def test_set_and_get(host_cache) -> None:
+    """Test an entry is returned with its TTL until it is deleted."""
+    assert host_cache.set("key", {"data": b"{}", "etag": "W/1"}, 60)
+    ttl, entry = host_cache.get("key")
+    assert 30 < ttl <= 60  # noqa: PLR2004
+    assert entry == {"data": b"{}", "etag": b"W/1"}
+    host_cache.delete("key")
+    assert host_cache.get("key") is None
+    assert host_cache.get("missing") is None
+
+
+def test_entries_evicted_after_max_age(host_cache, monkeypatch) -> None:
+    """Test an entry is evicted after `max_age`, though it hasn't expired."""
+    now = time.time()
+    monkeypatch.setattr("time.time", lambda: now)
+    host_cache.set("key", {"data": b"{}"}, 3600)
+    monkeypatch.setattr("time.time", lambda: now + 29)
+    found = host_cache.get("key")
+    assert found is not None
+    assert found[0] == 3600 - 29
+    monkeypatch.setattr("time.time", lambda: now + 30)
+    assert host_cache.get("key") is None
+
+
+def test_entries_that_do_not_fit(host_cache) -> None:
+    """Test entries too large for a slot, or already expired, are skipped."""
+    assert not host_cache.set("key", {"data": b"x" * 1024}, 60)
+    assert not host_cache.set("key", {"data": b"{}"}, 0)
+    assert host_cache.get("key") is None
+
+
+def test_shared_between_mappings(host_cache, tmp_path) -> None:
+    """Test an entry written through one mapping is read through another."""
+    other = HostCache(tmp_path / "host-cache", slots=8, slot_size=1024)
+    host_cache.set("key", {"data": b"1"}, 60)
+    found = other.get("key")
+    assert found is not None
+    assert found[1] == {"data": b"1"}
+    other.close()
+
+
+def test_layout_mismatch(host_cache, tmp_path) -> None:
+    """Test a file created with a different layout is rejected."""
+    with pytest.raises(ValueError, match="different number or size"):
+        HostCache(tmp_path / "host-cache", slots=16, slot_size=1024)
+
+
+def test_cache_reads_host_cache_first(host_cache) -> None:
+    """Test an entry in the host cache is used without reading Redis."""
+    redis_cache = FastApiRedisCache()
+    redis_cache.init(host_url="", host_cache=host_cache)
+    response = client.get("/cache_expires")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+
+    key = redis_cache.get_cache_key(None, cache_expires.__wrapped__)
+    assert redis_cache.backend is not None
+    redis_cache.backend.delete(key)
+    response = client.get("/cache_expires")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json()["success"]
+
+
+def test_host_cache_hit_reports_backend_ttl(host_cache) -> None:
+    """Test a host cache hit sends the TTL left in the backend."""
+    redis_cache = FastApiRedisCache()
+    redis_cache.init(host_url="", host_cache=host_cache)
+    client.get("/cache_one_hour")
+
+    key = redis_cache.get_cache_key(
+        None, partial_cache_one_hour.__wrapped__, response=Response()
+    )
+    assert redis_cache.backend is not None
+    redis_cache.backend.delete(key)
+    response = client.get("/cache_one_hour")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    match = re.search(
+        r"max-age=(?P<ttl>\d+)", response.headers["cache-control"]
+    )
+    assert match
+    assert int(match["ttl"]) > ONE_HOUR_IN_SECONDS - 10
@@ -0,0 +1,90 @@
+"""Test hot key tracking, pinning and adaptive TTLs."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from fastapi_redis_cache import FastApiRedisCache, HotKeyTracker
+from fastapi_redis_cache.hot_keys import CountMinSketch
+from tests.main import app, cache_expires
+
+client = TestClient(app)
+
+
+def test_count_min_sketch() -> None:
+    """Test the estimates are never less than the true counts."""
+    sketch = CountMinSketch(width=8, depth=2)
+    for number in range(20):
+        for _ in range(number):
+            sketch.add(f"key{number}")
+    assert all(sketch.estimate(f"key{n}") >= n for n in range(20))
+    sketch.decay()
+    assert sketch.estimate("key19") >= 19 // 2
+
+
+def test_top_keys() -> None:
+    """Test only keys over the threshold are reported, most popular first."""
+    tracker = HotKeyTracker(threshold=3, max_tracked=2)
+    for key, count in [("a", 2), ("b", 3), ("c", 5), ("d", 4)]:
+        for _ in range(count):
+            tracker.record(key)
+    assert tracker.top_keys() == [("c", 5), ("d", 4)]
+    assert not tracker.is_hot("a")
+
+
+def test_tracker_shared_by_threads() -> None:
+    """Test lookups recorded from several threads are all counted."""
+    tracker = HotKeyTracker(threshold=1, pin_seconds=5, max_pinned=4)
+
+    def look_up(number: int) -> None:
+        key = f"key{number % 8}"
+        tracker.record(key)
+        tracker.pin(key, 60, {"data": b"1"})
+        tracker.get_pinned(key)
+        tracker.unpin(key)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(look_up, range(2000)))
+    assert tracker.lookups == 2000  # noqa: PLR2004
+    assert len(tracker.pinned) <= 4  # noqa: PLR2004
+
+
+def test_pinned_entries_expire(mocker) -> None:
+    """Test a pinned entry is only used for `pin_seconds`."""
+    monotonic = mocker.patch("time.monotonic", return_value=100.0)
+    tracker = HotKeyTracker(threshold=1, pin_seconds=5)
+    tracker.record("key")
+    tracker.pin("key", 60, {"data": b"1"})
+    monotonic.return_value = 102.0
+    assert tracker.get_pinned("key") == (58, {"data": b"1"})
+    monotonic.return_value = 105.0
+    assert tracker.get_pinned("key") is None
+
+
+def test_adapt_ttl() -> None:
+    """Test TTLs are scaled by popularity within the bounds."""
+    tracker = HotKeyTracker(threshold=4, ttl_bounds=(10, 1000))
+    tracker.record("rare")
+    for _ in range(8):
+        tracker.record("popular")
+    assert tracker.adapt_ttl("rare", 100) == 25  # noqa: PLR2004
+    assert tracker.adapt_ttl("popular", 100) == 200  # noqa: PLR2004
+    assert tracker.adapt_ttl("popular", 800) == 1000  # noqa: PLR2004
+    assert tracker.adapt_ttl("unseen", 100) == 10  # noqa: PLR2004
+
+
+def test_hot_key_served_from_memory(mocker) -> None:
+    """Test a hot key is served from memory without reading from Redis."""
+    redis_cache = FastApiRedisCache()
+    redis_cache.init(host_url="", hot_keys=HotKeyTracker(threshold=2))
+    read_entry = mocker.spy(redis_cache, "_read_entry")
+    for _ in range(3):
+        client.get("/cache_expires")
+    calls = read_entry.call_count
+
+    response = client.get("/cache_expires")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert read_entry.call_count == calls
+    key = redis_cache.get_cache_key(None, cache_expires.__wrapped__)
+    assert redis_cache.hot_keys
+    assert redis_cache.hot_keys.top_keys(1)[0][0] == key
@@ -0,0 +1,52 @@
+"""Test invalidating cached responses when data changes."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fastapi_redis_cache import FastApiRedisCache, invalidates
+from tests.main import app, dependency_calls
+
+client = TestClient(app)
+
+
+def test_invalidates_tag_from_arguments() -> None:
+    """Test only the responses tagged with the changed user are deleted."""
+    for user_id in [1, 2]:
+        client.get(f"/users/{user_id}")
+    response = client.get("/users/1")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+
+    client.put("/users/1", params={"name": "Ada L."})
+    response = client.get("/users/1")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.json() == {"name": "Ada L."}
+    response = client.get("/users/2")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+
+
+def test_invalidates_in_background() -> None:
+    """Test the responses are deleted by a background task."""
+    client.get("/users/2")
+    response = client.delete("/users/2")
+    assert response.json() == {"deleted": True}
+    response = client.get("/users/2")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.json() == {"name": ""}
+
+
+def test_invalidate_negative_entries() -> None:
+    """Test cached errors are deleted with the other tagged responses."""
+    client.get("/cache_negative/5")
+    calls = dependency_calls["count"]
+    assert FastApiRedisCache().invalidate(tags=["items"]) == 1
+    client.get("/cache_negative/5")
+    assert dependency_calls["count"] == calls + 1
+
+
+def test_invalidates_unknown_argument() -> None:
+    """Test a template using an unknown argument is rejected."""
+    with pytest.raises(ValueError, match="'user_id', which is not an arg"):
+
+        @invalidates(tags=["user:{user_id}"])
+        def update_item(item_id: int) -> None:
+            """Update an item."""
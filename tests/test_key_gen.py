@@ -0,0 +1,192 @@
+"""Test the cache key generation helpers."""
+
+from decimal import Decimal
+from enum import Enum
+from typing import Annotated, Optional
+
+import pytest
+from fastapi import Body, Depends, Query, UploadFile
+from pydantic import BaseModel
+
+from fastapi_redis_cache.key_gen import (
+    UnstableCacheKeyWarning,
+    build_cache_key,
+    canonicalize,
+    get_body_arg_digest,
+    get_body_digest,
+    get_body_params,
+)
+
+
+class Color(str, Enum):
+    """An example enum."""
+
+    RED = "red"
+
+
+class Filters(BaseModel):
+    """An example Pydantic model."""
+
+    name: str
+    limit: int
+
+
+class User:
+    """An example object without a stable string form."""
+
+    def __init__(self, user_id: int) -> None:
+        """Create a user."""
+        self.id = user_id
+
+
+def get_items(ids: list[int], limit: float = 10) -> None:
+    """An example path function."""
+
+
+def get_profile(user: User, verbose: bool = False) -> None:  # noqa: FBT001
+    """An example path function with an object argument."""
+
+
+def get_filters() -> Filters:
+    """An example dependency."""
+    return Filters(name="x", limit=1)
+
+
+def search(  # noqa: PLR0913
+    filters: Filters,
+    extra: Annotated[dict[str, int], Body()],
+    default: Annotated[Filters, Depends(get_filters)],
+    note: str = Body(""),
+    query: Annotated[Optional[str], Query()] = None,
+    page: int = 1,
+) -> None:
+    """An example path function with arguments read from the body."""
+
+
+def upload(file: UploadFile, meta: dict[str, str], name: str = "") -> None:
+    """An example path function with a file and a `dict` from the body."""
+
+
+@pytest.mark.parametrize(
+    ("first", "second"),
+    [
+        (1, 1.0),
+        (1, Decimal("1.00")),
+        (Decimal("1.50"), 1.5),
+        ({"b": 1, "a": 2}, {"a": 2, "b": 1}),
+        ({3, 1, 2}, {2, 3, 1}),
+        (Color.RED, "red"),
+        (Filters(name="x", limit=1), {"limit": 1, "name": "x"}),
+    ],
+)
+def test_canonicalize_equivalent_values(first, second) -> None:
+    """Test equivalent values have the same canonical form."""
+    assert canonicalize(first) == canonicalize(second)
+
+
+@pytest.mark.parametrize(
+    ("first", "second"),
+    [
+        (["a,b"], ["a", "b"]),
+        ({"a": "b:c"}, {"a:b": "c"}),
+        ([1], ["1"]),
+        ({1: "a"}, {"1": "a"}),
+        (['a"', "b"], ['a",', '"b']),
+    ],
+)
+def test_canonicalize_different_values(first, second) -> None:
+    """Test strings inside collections can't run into each other."""
+    assert canonicalize(first) != canonicalize(second)
+    first_key = build_cache_key("", None, [], get_items, (first,), {})
+    second_key = build_cache_key("", None, [], get_items, (second,), {})
+    assert first_key != second_key
+
+
+def test_canonicalize_keeps_list_order() -> None:
+    """Test lists are only sorted when their order does not matter."""
+    assert canonicalize([2, 1]) != canonicalize([1, 2])
+    assert canonicalize([2, 1], sort_items=True) == canonicalize([1, 2])
+
+
+def test_build_cache_key_unordered_args_and_vary() -> None:
+    """Test unordered arguments and vary headers in the cache key."""
+    key = build_cache_key(
+        "prefix",
+        "tag",
+        [],
+        get_items,
+        ([3, 1, 2],),
+        {"limit": 5.0},
+        vary_headers={"accept-language": "en"},
+        unordered_args=["ids"],
+    )
+    assert key == (
+        "prefix:tests.test_key_gen.get_items(ids=[1,2,3],limit=5)"
+        "[accept-language=en]::tag"
+    )
+
+
+def test_build_cache_key_key_args() -> None:
+    """Test `key_args` choose the value used for an argument."""
+    key = build_cache_key(
+        "",
+        None,
+        [User],
+        get_profile,
+        (User(7),),
+        {},
+        key_args={"user": lambda user: user.id},
+    )
+    assert key == "tests.test_key_gen.get_profile(user=7,verbose=False)"
+
+
+def test_build_cache_key_key_builder() -> None:
+    """Test a `key_builder` replaces the arguments in the key."""
+    key = build_cache_key(
+        "prefix",
+        "tag",
+        [],
+        get_profile,
+        (User(7),),
+        {"verbose": True},
+        key_builder=lambda _func, user, verbose: f"{user.id}:{verbose}",
+    )
+    assert key == "prefix:tests.test_key_gen.get_profile(7:True)::tag"
+
+
+def test_build_cache_key_warns_on_memory_address() -> None:
+    """Test a warning is given when an argument's key is never reused."""
+    with pytest.warns(UnstableCacheKeyWarning, match="address for user"):
+        build_cache_key("", None, [], get_profile, (User(7),), {})
+
+
+def test_build_cache_key_body_digest() -> None:
+    """Test the digest of the request body is added after the arguments."""
+    key = build_cache_key(
+        "", None, [], get_items, ([1],), {}, body_digest="abc"
+    )
+    assert key == "tests.test_key_gen.get_items(ids=[1],limit=10,__body__=#abc)"
+
+
+def test_body_digest_ignores_json_formatting() -> None:
+    """Test equivalent JSON bodies have the same digest."""
+    digest = get_body_digest(b'{"a": 1, "b": [1, 2]}')
+    assert digest == get_body_digest(b'{"b":[1,2],"a":1}')
+    assert digest != get_body_digest(b'{"a": "1", "b": [1, 2]}')
+    assert get_body_digest(b"not json") != get_body_digest(b"")
+
+
+def test_body_arg_digest() -> None:
+    """Test arguments from the body are replaced by a digest of their JSON."""
+    digest = get_body_arg_digest(Filters(name="x", limit=1))
+    assert digest.startswith("#")
+    assert digest == get_body_arg_digest({"limit": 1, "name": "x"})
+    assert digest != get_body_arg_digest(Filters(name="x", limit=2))
+
+
+def test_get_body_params() -> None:
+    """Test which arguments are found to be read from the request body."""
+    assert get_body_params(search) == ["filters", "extra", "note"]
+    assert get_body_params(upload) == ["file", "meta"]
+    # FastAPI reads a list from the body, unless it is declared with `Query()`
+    assert get_body_params(get_items) == ["ids"]
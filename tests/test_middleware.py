@@ -0,0 +1,65 @@
+"""Test the CacheMiddleware."""
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from tests.main import app, dependency_calls
+
+client = TestClient(app)
+
+
+def test_middleware_hit_skips_dependencies() -> None:
+    """Test a cache hit is answered before any dependency is resolved."""
+    response = client.get("/middleware/items?page=2&size=5")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    data = response.json()
+    calls = dependency_calls["count"]
+
+    response = client.get("/middleware/items?page=2&size=5")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == data
+    assert dependency_calls["count"] == calls
+
+
+def test_middleware_canonical_query_string() -> None:
+    """Test the order of query parameters does not change the cache key."""
+    response = client.get("/middleware/items?size=7&page=3")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+
+    response = client.get("/middleware/items?page=3&size=7")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json()["page"] == 3  # noqa: PLR2004
+
+
+def test_middleware_vary_headers() -> None:
+    """Test the `vary` headers are included in the cache key."""
+    for language in ["en", "fr"]:
+        response = client.get(
+            "/middleware_vary", headers={"Accept-Language": language}
+        )
+        assert response.headers["x-fastapi-cache"] == "Miss"
+        assert response.json() == {"language": language}
+
+    response = client.get("/middleware_vary", headers={"Accept-Language": "fr"})
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.json() == {"language": "fr"}
+
+
+def test_middleware_ignores_other_paths() -> None:
+    """Test paths without a matching rule are not cached by the middleware."""
+    response = client.get("/docs")
+    assert "x-fastapi-cache" not in response.headers
+
+
+@pytest.mark.parametrize("cache_control", ["", "no-store", "private"])
+def test_middleware_skips_private_responses(cache_control: str) -> None:
+    """Test responses setting a cookie, or marked private, aren't cached."""
+    url = f"/middleware/session?cache_control={cache_control}"
+    first = client.get(url)
+    second = client.get(url)
+    assert "x-fastapi-cache" not in second.headers
+    assert second.json()["calls"] == first.json()["calls"] + 1
@@ -0,0 +1,141 @@
+"""Test serving every page of a paginated route from one cached result."""
+
+from hashlib import blake2b
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fastapi_redis_cache import FastApiRedisCache, Pagination, cache
+from tests.main import app, list_queries
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _reset_queries() -> None:
+    """Reset the count of computed results before each test."""
+    list_queries["count"] = 0
+
+
+def test_pages_share_one_entry() -> None:
+    """Test any page and size is served from the full cached result."""
+    response = client.get("/items", params={"page": 2, "size": 4})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    assert response.headers["x-total-count"] == "11"
+    assert [item["itemId"] for item in response.json()] == [5, 6, 7, 8]
+    for page, size, expected in [
+        (2, 4, [5, 6, 7, 8]),
+        (1, 5, [1, 2, 3, 4, 5]),
+        (3, 5, [11]),
+        (4, 5, []),
+        (1, 20, list(range(1, 12))),
+        (1, 0, []),
+    ]:
+        response = client.get("/items", params={"page": page, "size": size})
+        assert response.headers["x-fastapi-cache"] == "Hit"
+        assert [item["itemId"] for item in response.json()] == expected
+    assert list_queries["count"] == 1
+
+
+def test_page_only_fetches_its_chunks() -> None:
+    """Test the entry holds chunks, and a page only reads the ones it needs."""
+    redis_cache = FastApiRedisCache()
+    assert redis_cache.redis
+    client.get("/items")
+    (key,) = (
+        key.decode()
+        for key in redis_cache.redis.scan_iter()
+        if b"list_items" in key
+    )
+    assert "page" in key
+    assert sorted(redis_cache.redis.hkeys(key)) == [
+        b"chunk:0",
+        b"chunk:1",
+        b"chunk:2",
+        b"chunk:3",
+        b"count",
+        b"delta",
+    ]
+    assert Pagination(chunk_size=3).get_chunk_fields(4, 8) == [
+        "chunk:1",
+        "chunk:2",
+    ]
+
+
+def test_page_etag() -> None:
+    """Test each page has its own ETag, which can be revalidated."""
+    first = client.get("/items", params={"page": 1, "size": 2})
+    second = client.get("/items", params={"page": 2, "size": 2})
+    assert first.headers["etag"] != second.headers["etag"]
+    response = client.get(
+        "/items",
+        params={"page": 1, "size": 2},
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = client.head("/items", params={"page": 2, "size": 2})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["etag"] == second.headers["etag"]
+
+
+def test_page_etag_is_a_digest() -> None:
+    """Test a page's ETag is a digest of its body, the same in every worker."""
+    response = client.get("/items", params={"page": 2, "size": 2})
+    digest = blake2b(response.content, digest_size=16).hexdigest()
+    assert response.headers["etag"] == f"W/{digest}"
+    response = client.get("/items", params={"page": 2, "size": 2})
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.headers["etag"] == f"W/{digest}"
+
+
+def test_untyped_pages() -> None:
+    """Test custom argument names, and other arguments still vary the key."""
+    response = client.get("/numbers", params={"p": 2, "n": 3})
+    assert response.json() == [3, 4, 5]
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    response = client.get("/numbers", params={"p": 3, "n": 7})
+    assert response.json() == [14, 15, 16, 17, 18, 19]
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    response = client.get("/numbers", params={"p": 1, "n": 3, "last": 2})
+    assert response.json() == [0, 1]
+    assert list_queries["count"] == 2  # noqa: PLR2004
+
+
+def test_empty_result_is_negative() -> None:
+    """Test an empty result is cached as a negative entry."""
+    response = client.get("/numbers", params={"last": 0})
+    assert response.json() == []
+    assert response.headers["x-total-count"] == "0"
+    response = client.get("/numbers", params={"last": 0})
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert FastApiRedisCache().clear_negative_entries() == 1
+    client.get("/numbers", params={"last": 0})
+    assert list_queries["count"] == 2  # noqa: PLR2004
+
+
+def test_page_size_limited() -> None:
+    """Test pages larger than `max_size` are reduced, fetching fewer chunks."""
+    client.get("/numbers")
+    response = client.get("/numbers", params={"p": 2, "n": 1_000_000})
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert response.headers["x-total-count"] == "20"
+    assert response.json() == list(range(8, 16))
+    pagination = Pagination(chunk_size=4, max_size=8)
+    start, stop = pagination.get_slice({"page": 1, "size": 10**9})
+    assert pagination.get_chunk_fields(start, stop) == ["chunk:0", "chunk:1"]
+
+
+def test_pagination_arguments_checked() -> None:
+    """Test the page and size must be arguments of the decorated function."""
+    with pytest.raises(ValueError, match="'size' is not an argument"):
+
+        @cache(paginate=Pagination())
+        def no_size(page: int) -> list[int]:
+            return [page]
+
+    with pytest.raises(ValueError, match="chunk_size must be at least 1"):
+        Pagination(chunk_size=0)
+    with pytest.raises(ValueError, match="max_size must be at least 1"):
+        Pagination(max_size=0)
@@ -0,0 +1,109 @@
+"""Test the time limit on reading cached responses."""
+
+import time
+from typing import Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fastapi_redis_cache import FastApiRedisCache, MemoryBackend
+from tests.main import app
+
+client = TestClient(app)
+
+
+class SlowBackend(MemoryBackend):
+    """Memory backend whose reads take `delay` seconds, or fail."""
+
+    def __init__(self, delay: float = 0, *, fail: bool = False) -> None:
+        """Create an empty backend with slow reads."""
+        super().__init__()
+        self.delay = delay
+        self.fail = fail
+
+    def get_entry(self, key, fields):  # noqa: ANN201
+        """Wait before reading the entry, or raise an error."""
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError
+        return super().get_entry(key, fields)
+
+
+def init_cache(
+    backend: SlowBackend,
+    read_timeout: Optional[float] = None,
+    hedge_after: Optional[float] = None,
+) -> FastApiRedisCache:
+    """Return the default cache instance, using `backend`."""
+    redis_cache = FastApiRedisCache()
+    redis_cache.init(
+        host_url="",
+        backend=backend,
+        read_timeout=read_timeout,
+        hedge_after=hedge_after,
+    )
+    return redis_cache
+
+
+def test_read_within_budget() -> None:
+    """Test reads faster than the budget are used as usual."""
+    redis_cache = init_cache(SlowBackend(), read_timeout=1)
+    assert client.get("/cache_expires").headers["x-fastapi-cache"] == "Miss"
+    assert client.get("/cache_expires").headers["x-fastapi-cache"] == "Hit"
+    assert redis_cache.read_timeouts == redis_cache.read_errors == 0
+
+
+def test_read_over_budget() -> None:
+    """Test a slow read is abandoned, and the path function called instead."""
+    backend = SlowBackend()
+    redis_cache = init_cache(backend, read_timeout=0.05)
+    client.get("/cache_expires")
+    backend.delay = 0.2
+    response = client.get("/cache_expires")
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response.json()["success"]
+    assert "x-fastapi-cache" not in response.headers
+    assert redis_cache.read_timeouts == 1
+    assert redis_cache.read_errors == 0
+
+
+@pytest.mark.parametrize(
+    "url", ["/items?page=2&size=2", "/middleware/items?page=2"]
+)
+def test_read_over_budget_for_pages_and_middleware(url: str) -> None:
+    """Test paginated and middleware reads are limited by the budget too."""
+    backend = SlowBackend()
+    redis_cache = init_cache(backend, read_timeout=0.05)
+    assert client.get(url).headers["x-fastapi-cache"] == "Miss"
+    assert client.get(url).headers["x-fastapi-cache"] == "Hit"
+    backend.delay = 0.2
+    response = client.get(url)
+    assert response.status_code == 200  # noqa: PLR2004
+    assert "x-fastapi-cache" not in response.headers
+    assert redis_cache.read_timeouts == 1
+
+
+def test_read_failure() -> None:
+    """Test a failed read is counted apart from timeouts."""
+    redis_cache = init_cache(SlowBackend(fail=True), read_timeout=1)
+    response = client.get("/cache_expires")
+    assert response.json()["success"]
+    assert redis_cache.read_errors == 1
+    assert redis_cache.read_timeouts == 0
+
+
+def test_hedged_read() -> None:
+    """Test the path function is started while a slow read is pending."""
+    backend = SlowBackend(0.05)
+    redis_cache = init_cache(backend, read_timeout=1, hedge_after=0.01)
+    response = client.get("/cache_expires")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+    response = client.get("/cache_expires")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    assert redis_cache.hedged_reads == 2  # noqa: PLR2004
+    backend.delay = 0.2
+    redis_cache.read_timeout = 0.1
+    response = client.get("/cache_expires")
+    assert response.json()["success"]
+    assert redis_cache.hedged_reads == 3  # noqa: PLR2004
+    assert redis_cache.read_timeouts == 1
@@ -0,0 +1,67 @@
+"""Test importing the package and connecting to Redis are fast."""
+
+import asyncio
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from fastapi_redis_cache import FastApiRedisCache
+from tests.main import app
+
+client = TestClient(app)
+
+LAZY_MODULES = [
+    "fakeredis",
+    "dateutil",
+    "tzlocal",
+    "sqlite3",
+    "mmap",
+    "fastapi_redis_cache.backends.memory",
+    "fastapi_redis_cache.backends.packed",
+    "fastapi_redis_cache.backends.sqlite",
+    "fastapi_redis_cache.host_cache",
+]
+
+
+def test_import_does_not_load_lazy_modules() -> None:
+    """Test rarely needed modules are not imported with the package."""
+    code = (
+        "import logging, sys, fastapi_redis_cache; "
+        f"print([m for m in {LAZY_MODULES} if m in sys.modules]); "
+        "print(logging.getLogger().handlers)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],  # noqa: S603
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert result.stdout.splitlines() == ["[]", "[]"]
+
+
+def test_init_without_connecting() -> None:
+    """Test responses are not cached until the cache is connected."""
+    redis_cache = FastApiRedisCache()
+    redis_cache.init(host_url="", connect=False)
+    assert redis_cache.not_connected
+    response = client.get("/cache_never_expire")
+    assert "x-fastapi-cache" not in response.headers
+
+    redis_cache.connect()
+    response = client.get("/cache_never_expire")
+    assert response.headers["x-fastapi-cache"] == "Miss"
+
+
+def test_init_async() -> None:
+    """Test `init_async` returns before the connection is made."""
+    redis_cache = FastApiRedisCache()
+
+    async def start() -> None:
+        connecting = await redis_cache.init_async("", prefix="async")
+        assert redis_cache.not_connected
+        await connecting
+        assert redis_cache.connected
+
+    asyncio.run(start())
+    assert redis_cache.prefix == "async"
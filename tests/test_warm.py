@@ -0,0 +1,65 @@
+"""Test warming the cache before any requests are received."""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from fastapi_redis_cache import WarmTarget, cache, warm_cache
+from fastapi_redis_cache.cli import main
+from tests.main import app, cache_never_expire, cache_vary
+
+client = TestClient(app)
+
+TARGETS = [
+    WarmTarget(cache_never_expire),
+    WarmTarget(cache_vary, {"ids": [1, 2]}, {"Accept-Language": "en"}),
+]
+
+running = {"now": 0, "most": 0}
+
+
+@cache()
+async def slow_route(number: int) -> dict[str, int]:
+    """Path function that records how many calls are running at once."""
+    running["now"] += 1
+    running["most"] = max(running["most"], running["now"])
+    await asyncio.sleep(0.01)
+    running["now"] -= 1
+    return {"number": number}
+
+
+@cache()
+def failing_route() -> dict[str, bool]:
+    """Path function that can't be warmed."""
+    raise RuntimeError
+
+
+def test_warm_cache() -> None:
+    """Test warmed routes are cached under the same keys as live requests."""
+    assert asyncio.run(warm_cache(TARGETS)) == len(TARGETS)
+
+    response = client.get("/cache_never_expire")
+    assert response.headers["x-fastapi-cache"] == "Hit"
+    response = client.get(
+        "/cache_vary?ids=2&ids=1", headers={"Accept-Language": "en"}
+    )
+    assert response.headers["x-fastapi-cache"] == "Hit"
+
+
+def test_warm_cache_concurrency() -> None:
+    """Test no more than `concurrency` targets are warmed at once."""
+    targets = [WarmTarget(slow_route, {"number": n}) for n in range(6)]
+    assert asyncio.run(warm_cache(targets, concurrency=2)) == len(targets)
+    assert running["most"] == 2  # noqa: PLR2004
+
+
+def test_warm_cache_failure() -> None:
+    """Test a target that raises an exception is skipped."""
+    targets = [WarmTarget(failing_route), *TARGETS]
+    assert asyncio.run(warm_cache(targets)) == len(TARGETS)
+
+
+def test_cli_warm(capsys) -> None:
+    """Test the `warm` command of the command line interface."""
+    assert main(["warm", "tests.test_warm:TARGETS"]) == 0
+    assert "Warmed 2 of 2 targets." in capsys.readouterr().out